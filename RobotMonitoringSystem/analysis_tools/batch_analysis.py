@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+批量日志分析
+
+功能：
+1. 扫描 logs/ 目录下所有 match_*/robot_* 日志（.jsonl、.binlog 及其 .chunks 形式）
+   和 LogWriter 写出的 match_metadata.json
+2. 用进程池并行做流式统计（每个文件一个任务，大文件先提交）
+3. 输出三张表：robots（每个日志文件一行）、matches（按比赛汇总）、teams（按队伍汇总），
+   格式为 CSV 或 Parquet（需要 pyarrow）
+4. 结果按文件大小和修改时间缓存在输出目录，新增比赛后重跑只解析新文件
+
+用法：
+    python3 log_parser.py --batch ../monitor_daemon/logs --workers 8
+"""
+
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from log_parser import EVENT_NAMES, LogParser
+from streaming_stats import MotionAggregator, StreamingStatistics
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+LOG_SUFFIXES = ('.jsonl', '.binlog', '.jsonl.chunks', '.binlog.chunks')
+METADATA_FILE = 'match_metadata.json'
+CACHE_FILE = '.batch_cache.json'
+CACHE_VERSION = 1  # robots 表的列变化时递增，使旧缓存失效
+
+ROBOT_COLUMNS = (
+    ['match', 'robot_id', 'team', 'file', 'frames', 'duration_s',
+     'battery_initial', 'battery_final', 'battery_consumed', 'battery_average',
+     'ball_visible_frames', 'ball_visible_rate', 'superb_rate', 'okay_rate', 'poor_rate']
+    + [f'motion_{name.lower()}' for name in MotionAggregator.MOTION_NAMES]
+    + ['events']
+    + [f'event_{name.lower()}' for name in EVENT_NAMES]
+    + ['error']
+)
+SUMMARY_COLUMNS = ['robot_logs', 'failed', 'frames', 'duration_s', 'battery_consumed_avg',
+                   'ball_visible_rate', 'superb_rate', 'falls', 'kicks', 'events']
+MATCH_COLUMNS = ['match', 'start_time', 'log_format', 'compression', 'robots_expected'] + SUMMARY_COLUMNS
+TEAM_COLUMNS = ['team', 'matches'] + SUMMARY_COLUMNS
+
+
+def discover_logs(root):
+    """返回 [(比赛目录名, robot_id, 路径), ...] 和 {比赛目录名: 元数据}"""
+    root = Path(root)
+    logs = []
+    metadata = {}
+    for match_dir in sorted(root.glob('match_*')):
+        if not match_dir.is_dir():
+            continue
+        metadata_file = match_dir / METADATA_FILE
+        if metadata_file.exists():
+            try:
+                with open(metadata_file) as f:
+                    metadata[match_dir.name] = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Failed to read {metadata_file}: {e}")
+        for path in sorted(match_dir.glob('robot_*')):
+            suffix = next((s for s in LOG_SUFFIXES if path.name.endswith(s)), None)
+            if suffix is None:
+                continue
+            robot_id = path.name[len('robot_'):-len(suffix)]
+            logs.append((match_dir.name, robot_id, path))
+    return logs, metadata
+
+
+def _team_of(robot_id, first_state):
+    """队伍编号：优先取日志中的 decision.team_number，其次取 robot_id 的 <队伍>_<球员> 前缀"""
+    decision = (first_state or {}).get('decision', {})
+    if 'team_number' in decision:
+        return str(decision['team_number'])
+    team, sep, _ = robot_id.partition('_')
+    if sep and team.isdigit():
+        return team
+    return 'unknown'
+
+
+def analyze_log(match, robot_id, path):
+    """流式统计一个日志文件，返回 robots 表的一行（在工作进程中运行）"""
+    row = dict.fromkeys(ROBOT_COLUMNS)
+    row.update(match=match, robot_id=robot_id, file=str(path))
+    stats = StreamingStatistics()
+    try:
+        stats.consume(LogParser(path).iter_states())
+        result = stats.result()
+        row['team'] = _team_of(robot_id, stats.general.first)
+        row['frames'] = stats.frames
+        if not result:
+            return row
+        row['duration_s'] = result['duration_ms'] / 1000
+        battery = result['battery']
+        if battery:
+            row.update(battery_initial=battery['initial'], battery_final=battery['final'],
+                       battery_consumed=battery['consumed'], battery_average=battery['average'])
+        row.update(ball_visible_frames=result['ball_perception']['visible_frames'],
+                   ball_visible_rate=result['ball_perception']['visible_rate'],
+                   **result['localization'])
+        for name in MotionAggregator.MOTION_NAMES:
+            row[f'motion_{name.lower()}'] = result['motion'].get(name, 0.0)
+        row['events'] = sum(result['events'].values())
+        for event_type, name in enumerate(EVENT_NAMES):
+            row[f'event_{name.lower()}'] = result['events'].get(event_type, 0)
+    except Exception as e:
+        row['team'] = row['team'] or _team_of(robot_id, stats.general.first)
+        row['frames'] = stats.frames
+        row['error'] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _summarize(rows):
+    """汇总若干 robots 行（失败的行只计入 failed）"""
+    ok = [r for r in rows if r['error'] is None and r['frames']]
+    frames = sum(r['frames'] for r in ok)
+    consumed = [r['battery_consumed'] for r in ok if r['battery_consumed'] is not None]
+
+    def weighted(column):
+        return sum(r[column] * r['frames'] for r in ok) / frames if frames else None
+
+    return {
+        'robot_logs': len(ok),
+        'failed': len(rows) - len(ok),
+        'frames': frames,
+        'duration_s': max((r['duration_s'] for r in ok), default=None),
+        'battery_consumed_avg': sum(consumed) / len(consumed) if consumed else None,
+        'ball_visible_rate': weighted('ball_visible_rate'),
+        'superb_rate': weighted('superb_rate'),
+        'falls': sum(r['event_fallen'] for r in ok),
+        'kicks': sum(r['event_kick_executed'] for r in ok),
+        'events': sum(r['events'] for r in ok),
+    }
+
+
+def summarize_matches(rows, metadata):
+    """按比赛汇总"""
+    by_match = defaultdict(list)
+    for row in rows:
+        by_match[row['match']].append(row)
+    summary = []
+    for match, match_rows in sorted(by_match.items()):
+        meta = metadata.get(match, {})
+        summary.append({
+            'match': match,
+            'start_time': meta.get('start_time'),
+            'log_format': meta.get('log_format'),
+            'compression': meta.get('compression'),
+            'robots_expected': len(meta['robots']) if 'robots' in meta else None,
+            **_summarize(match_rows),
+        })
+    return summary
+
+
+def summarize_teams(rows):
+    """按队伍汇总（跨比赛）；队伍内各比赛时长相加"""
+    by_team = defaultdict(list)
+    for row in rows:
+        by_team[row['team']].append(row)
+    summary = []
+    for team, team_rows in sorted(by_team.items()):
+        totals = _summarize(team_rows)
+        per_match = defaultdict(list)
+        for row in team_rows:
+            if row['error'] is None and row['duration_s'] is not None:
+                per_match[row['match']].append(row['duration_s'])
+        totals['duration_s'] = sum(max(d) for d in per_match.values()) if per_match else None
+        summary.append({'team': team, 'matches': len({r['match'] for r in team_rows}), **totals})
+    return summary
+
+
+def load_cache(cache_file):
+    """读取缓存 {路径: {'size', 'mtime_ns', 'row'}}，版本不符时返回空缓存"""
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(cache_file, files):
+    tmp = Path(str(cache_file) + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f)
+    os.replace(tmp, cache_file)
+
+
+def write_table(rows, columns, path, table_format):
+    """写出一张表，返回文件路径"""
+    path = Path(f"{path}.{table_format}")
+    if table_format == 'parquet':
+        if pyarrow is None:
+            raise ValueError("Parquet output requires the 'pyarrow' package")
+        table = pyarrow.table({c: [r.get(c) for r in rows] for c in columns})
+        pyarrow.parquet.write_table(table, path)
+        return path
+
+    import csv
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def run_batch(root, output_dir=None, table_format='csv', workers=None, use_cache=True):
+    """分析 root 下的全部日志并写出汇总表，返回 (robots, matches, teams) 三个行列表"""
+    root = Path(root)
+    if not root.is_dir():
+        raise ValueError(f"Not a directory: {root}")
+    output_dir = Path(output_dir) if output_dir else root / 'summary'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if table_format == 'parquet' and pyarrow is None:
+        raise ValueError("Parquet output requires the 'pyarrow' package")
+
+    logs, metadata = discover_logs(root)
+    cache_file = output_dir / CACHE_FILE
+    cache = load_cache(cache_file) if use_cache else {}
+
+    rows = {}
+    todo = []
+    fingerprints = {}
+    for match, robot_id, path in logs:
+        key = str(path.resolve())
+        st = path.stat()
+        fingerprints[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        entry = cache.get(key)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            rows[key] = entry['row']
+        else:
+            todo.append((st.st_size, key, match, robot_id, path))
+
+    print(f"Found {len(logs)} log files in {len({m for m, _, _ in logs})} matches "
+          f"({len(rows)} cached, {len(todo)} to parse)")
+
+    if todo:
+        start = time.perf_counter()
+        # 大文件先提交，避免最后剩一个大文件拖长总时间
+        todo.sort(reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(analyze_log, match, robot_id, path): key
+                       for _, key, match, robot_id, path in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                row = future.result()
+                rows[futures[future]] = row
+                status = f"error: {row['error']}" if row['error'] else f"{row['frames']} frames"
+                print(f"  [{done}/{len(todo)}] {row['match']}/{Path(row['file']).name}: {status}")
+        print(f"Parsed {len(todo)} files in {time.perf_counter() - start:.1f}s")
+
+    # 只保留仍然存在的文件
+    save_cache(cache_file, {key: dict(fingerprints[key], row=rows[key]) for key in fingerprints})
+
+    robot_rows = sorted(rows.values(), key=lambda r: (r['match'], r['robot_id']))
+    match_rows = summarize_matches(robot_rows, metadata)
+    team_rows = summarize_teams(robot_rows)
+
+    for name, table, columns in (('robots', robot_rows, ROBOT_COLUMNS),
+                                 ('matches', match_rows, MATCH_COLUMNS),
+                                 ('teams', team_rows, TEAM_COLUMNS)):
+        path = write_table(table, columns, output_dir / name, table_format)
+        print(f"Wrote {len(table)} rows to {path}")
+
+    return robot_rows, match_rows, team_rows
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+LogParser 基准测试
+
+生成合成 JSONL 日志（默认 100 万行），分别用列表、流式和列式模式解析并打印报告：
+1. 耗时（解析 + 统计）；列式模式分别测量首次载入和读取 .columns.npz 缓存
+2. 峰值内存（每种模式在独立子进程中运行，读取 ru_maxrss）
+3. 各模式的 print_report 输出是否逐字节相同
+4. 只比较统计本身：同一批已载入的状态上，逐字典循环（get_statistics）与向量化（ColumnarLog）的耗时
+
+用法：
+    python3 bench_log_parser.py --lines 1000000
+    python3 bench_log_parser.py --log-file existing.jsonl
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# 导入 log_parser 时会把 monitor_daemon 加入 sys.path
+from log_parser import LogParser
+from fast_json import dumps
+from columnar_stats import COLUMNS_SUFFIX, ColumnarLog
+
+
+def make_state(i, rng, charge):
+    state = {
+        'system': {
+            'timestamp_ms': i * 16, 'frame_number': i, 'cycle_time_ms': 12,
+            'battery_charge': charge, 'battery_current': -1.2, 'cpu_temperature': 55.0,
+            'orientation': {'roll': 0.01, 'pitch': -0.03, 'yaw': 1.57}, 'is_upright': True,
+        },
+        'perception': {
+            'ball': {'visible': rng.random() < 0.6, 'pos_x': 1250.3, 'pos_y': -310.8},
+            'localization': {'pos_x': -1520.0, 'pos_y': 830.5, 'rotation': 1.57,
+                             'quality': rng.choice((0, 1, 2, 2))},
+            'teammates_seen': [1, 2, 4], 'opponents_count': 3,
+        },
+        'decision': {
+            'game_state': 3, 'team_number': 5, 'player_number': 3, 'role': 'striker',
+            'active_behavior': 'WalkToBall', 'motion_type': rng.choice((0, 1, 1, 1, 2, 3)),
+        },
+        'robot_id': 'bhuman_3',
+    }
+    if rng.random() < 0.01:
+        state['events'] = [{'type': rng.randrange(11), 'timestamp_ms': i * 16}]
+    return state
+
+
+def write_synthetic_log(path, lines, seed=0):
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        for i in range(lines):
+            f.write(dumps(make_state(i, rng, 100.0 - 50.0 * i / lines)) + '\n')
+
+
+MODES = [
+    ('list', {}),
+    ('streaming', {'streaming': True}),
+    ('columnar', {'columnar': True}),          # 首次：解析 JSON 并写 .columns.npz
+    ('columnar*', {'columnar': True}),         # 再次：读取缓存
+]
+
+
+def run_mode(log_file, options):
+    """在子进程中运行：返回 (耗时, 峰值 RSS MB, 全部输出)"""
+    out = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        parser = LogParser(log_file, **options)
+        parser.parse()
+        parser.print_report()
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return elapsed, peak_mb, out.getvalue()
+
+
+def run_aggregation(log_file):
+    """在子进程中运行：同一批状态上逐字典统计与向量化统计的耗时"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser = LogParser(log_file)
+        parser.parse()
+
+    start = time.perf_counter()
+    dict_stats = parser.get_statistics()
+    dict_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = ColumnarLog.from_states(parser.states)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columnar_stats = columns.statistics()
+    stats_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns.battery_drain()
+    columns.localization_over_time()
+    columns.ball_visibility_streaks()
+    timeline_time = time.perf_counter() - start
+
+    # 电量平均值的求和顺序不同，不参与比较
+    dict_stats['battery'].pop('average', None)
+    columnar_stats['battery'].pop('average', None)
+    return dict_time, build_time, stats_time, timeline_time, dict_stats == columnar_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LogParser list vs streaming vs columnar benchmark')
+    parser.add_argument('--lines', type=int, default=1_000_000, help='Synthetic log lines')
+    parser.add_argument('--log-file', help='Use an existing log file instead of a synthetic one')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = args.log_file
+        if log_file is None:
+            log_file = os.path.join(tmp, 'robot_bench.jsonl')
+            start = time.perf_counter()
+            write_synthetic_log(log_file, args.lines)
+            print(f"Generated {args.lines} lines ({os.path.getsize(log_file) / 1e6:.0f} MB) "
+                  f"in {time.perf_counter() - start:.1f}s")
+
+        # 已存在的列缓存会让首次列式载入失真，先移开，结束后恢复
+        cache_file = Path(log_file + COLUMNS_SUFFIX)
+        saved_cache = cache_file.with_name(cache_file.name + '.bench') if cache_file.exists() else None
+        if saved_cache:
+            cache_file.rename(saved_cache)
+
+        try:
+            reports = {}
+            print(f"{'mode':<10} {'time s':>8} {'peak RSS MB':>12}")
+            for name, options in MODES:
+                # 每种模式一个新进程，峰值内存互不影响
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    elapsed, peak_mb, report = pool.submit(run_mode, log_file, options).result()
+                reports[name] = report
+                print(f"{name:<10} {elapsed:8.2f} {peak_mb:12.1f}")
+            print("(columnar* = columns loaded from the .columns.npz cache)")
+
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                dict_time, build_time, stats_time, timeline_time, same = \
+                    pool.submit(run_aggregation, log_file).result()
+        finally:
+            cache_file.unlink(missing_ok=True)
+            if saved_cache:
+                saved_cache.rename(cache_file)
+
+    identical = all(report == reports['list'] for report in reports.values())
+    print(f"Reports identical: {'yes' if identical else 'NO'}")
+
+    print("\nStatistics over already-loaded states:")
+    print(f"  per-dict loops (get_statistics): {dict_time:8.3f}s")
+    print(f"  columnar statistics():           {stats_time:8.3f}s  "
+          f"({dict_time / stats_time:.0f}x, statistics equal: {'yes' if same else 'NO'})")
+    print(f"  columnar timelines:              {timeline_time:8.3f}s")
+    print(f"  building columns from dicts:     {build_time:8.3f}s (one-off, cached in .columns.npz)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+二进制日志读取器
+
+功能：
+1. 流式读取 LogWriter raw 模式写出的 .binlog 文件（及其分块压缩形式 .binlog.chunks）
+2. 按需解析为 RobotState（惰性，不整体载入内存）
+3. 转换为与 JSONL 模式完全相同的 .jsonl 文件（兼容现有分析工具）
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# binlog 格式定义和编译后的 robot_state_pb2 都在 monitor_daemon 目录
+MONITOR_DAEMON_DIR = Path(__file__).resolve().parent.parent / 'monitor_daemon'
+if str(MONITOR_DAEMON_DIR) not in sys.path:
+    sys.path.append(str(MONITOR_DAEMON_DIR))
+
+from binlog import iter_records
+from chunked_log import CHUNKS_SUFFIX, ChunkedLogReader
+
+
+def _robot_state_class():
+    try:
+        from robot_state_pb2 import RobotState
+    except ImportError:
+        print("Error: robot_state_pb2 module not found.")
+        print("Please compile the .proto file first:")
+        print("  protoc --python_out=../monitor_daemon ../bhuman_integration/proto/robot_state.proto")
+        sys.exit(1)
+    return RobotState
+
+
+def read_records(log_file):
+    """逐条产出 (received_ms, payload)，不解析 Protobuf"""
+    if str(log_file).endswith(CHUNKS_SUFFIX):
+        yield from ChunkedLogReader(log_file).iter_records()
+        return
+    with open(log_file, 'rb') as f:
+        yield from iter_records(f)
+
+
+def read_states(log_file):
+    """逐条产出 (received_ms, RobotState)"""
+    RobotState = _robot_state_class()
+    for received_ms, payload in read_records(log_file):
+        state = RobotState()
+        state.ParseFromString(payload)
+        yield received_ms, state
+
+
+def read_state_dicts(log_file):
+    """逐条产出与 JSONL 日志中每行相同的字典"""
+    from google.protobuf.json_format import MessageToDict
+
+    for _, state in read_states(log_file):
+        yield MessageToDict(state, preserving_proto_field_name=True)
+
+
+def convert_to_jsonl(log_file, output_file=None):
+    """把 .binlog 转换为 .jsonl，返回 (输出路径, 记录数)"""
+    log_file = Path(log_file)
+    if output_file is None:
+        stem = log_file.name.removesuffix(CHUNKS_SUFFIX).removesuffix('.binlog')
+        output_file = log_file.with_name(stem + '.jsonl')
+    output_file = Path(output_file)
+
+    count = 0
+    with open(output_file, 'w') as out:
+        for state_dict in read_state_dicts(log_file):
+            out.write(json.dumps(state_dict, ensure_ascii=False) + '\n')
+            count += 1
+    return output_file, count
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Read or convert binary robot logs (.binlog)')
+    parser.add_argument('log_files', nargs='+', help='Path(s) to .binlog or .binlog.chunks file(s)')
+    parser.add_argument('--to-jsonl', action='store_true',
+                        help='Convert each file to .jsonl next to the input')
+    parser.add_argument('--output', help='Output path (only with a single input file)')
+
+    args = parser.parse_args()
+    if args.output and len(args.log_files) > 1:
+        parser.error('--output requires a single input file')
+
+    for log_file in args.log_files:
+        if args.to_jsonl or args.output:
+            output_file, count = convert_to_jsonl(log_file, args.output)
+            print(f"{log_file} -> {output_file}: {count} records")
+        else:
+            count = sum(1 for _ in read_records(log_file))
+            print(f"{log_file}: {count} records")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,46 +3,94 @@
 日志解析器
 
 功能：
-1. 解析 JSON Lines 日志文件
+1. 解析 JSON Lines 日志文件（也支持 raw 模式的 .binlog 和分块压缩的 .chunks）
 2. 提取关键指标
 3. 生成统计报告
+4. 流式模式：单遍读取，增量更新统计（见 streaming_stats.py），不保留状态列表
+5. 批量模式：分析整个 logs/ 目录，输出按比赛和按队伍汇总的表格（见 batch_analysis.py）
+6. 列式模式：载入为 NumPy 列后向量化统计，另有时间窗统计（见 columnar_stats.py）
 """
 
-import json
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+# 导入 binlog_reader 时会把 monitor_daemon 加入 sys.path
+from binlog_reader import read_records, read_state_dicts
+from fast_json import DecodeError, loads
+from streaming_stats import StreamingStatistics
+
+# 事件类型编号 -> 名称（与 robot_state.proto 中 EventType 一致）
+EVENT_NAMES = [
+    'BEHAVIOR_CHANGED', 'ROLE_CHANGED', 'FALLEN', 'GOT_UP',
+    'BALL_LOST', 'BALL_FOUND', 'PENALIZED', 'UNPENALIZED',
+    'COMMUNICATION_ERROR', 'LOCALIZATION_LOST', 'KICK_EXECUTED'
+]
+
 
 class LogParser:
     """日志解析器"""
     
-    def __init__(self, log_file):
+    def __init__(self, log_file, streaming=False, columnar=False, cache=True):
         self.log_file = Path(log_file)
+        self.streaming = streaming
+        self.columnar = columnar
+        self.cache = cache  # 列式模式是否读写 .columns.npz
         self.states = []
         self.events = []
+        self.streaming_stats = None
+        self.columns = None
         
     def parse(self):
         """解析日志文件"""
         print(f"Parsing {self.log_file}...")
         
-        with open(self.log_file, 'r') as f:
+        if self.streaming:
+            # 流式模式只保留聚合器，内存占用与日志长度无关
+            self.streaming_stats = StreamingStatistics().consume(self.iter_states())
+            print(f"Parsed {self.streaming_stats.frames} states, {self.streaming_stats.events} events")
+            return
+            
+        if self.columnar:
+            from columnar_stats import ColumnarLog
+            self.columns = ColumnarLog.from_file(self.log_file, cache=self.cache)
+            print(f"Parsed {self.columns.frames} states, {len(self.columns.event_type)} events")
+            return
+            
+        for state in self.iter_states():
+            self.states.append(state)
+            
+            # 提取事件
+            if 'events' in state:
+                for event in state['events']:
+                    self.events.append(event)
+                    
+        print(f"Parsed {len(self.states)} states, {len(self.events)} events")
+        
+    def iter_states(self):
+        """逐条产出状态字典"""
+        name = self.log_file.name
+        if name.endswith('.binlog') or name.endswith('.binlog.chunks'):
+            yield from read_state_dicts(self.log_file)
+            return
+        if name.endswith('.jsonl.chunks'):
+            for _, payload in read_records(self.log_file):
+                yield loads(payload)
+            return
+            
+        with open(self.log_file, 'rb') as f:
             for line in f:
                 try:
-                    state = json.loads(line.strip())
-                    self.states.append(state)
-                    
-                    # 提取事件
-                    if 'events' in state:
-                        for event in state['events']:
-                            self.events.append(event)
-                except json.JSONDecodeError as e:
+                    yield loads(line.strip())
+                except DecodeError as e:
                     print(f"Warning: Failed to parse line: {e}")
                     
-        print(f"Parsed {len(self.states)} states, {len(self.events)} events")
-        
     def get_statistics(self):
         """生成统计报告"""
+        if self.streaming_stats is not None:
+            return self.streaming_stats.result()
+        if self.columns is not None:
+            return self.columns.statistics()
         if not self.states:
             return {}
             
@@ -155,13 +203,8 @@ class LogParser:
             
         print(f"\n📋 Events:")
         events = stats['events']
-        event_names = [
-            'BEHAVIOR_CHANGED', 'ROLE_CHANGED', 'FALLEN', 'GOT_UP',
-            'BALL_LOST', 'BALL_FOUND', 'PENALIZED', 'UNPENALIZED',
-            'COMMUNICATION_ERROR', 'LOCALIZATION_LOST', 'KICK_EXECUTED'
-        ]
         for event_type, count in events.items():
-            event_name = event_names[event_type] if event_type < len(event_names) else f'UNKNOWN_{event_type}'
+            event_name = EVENT_NAMES[event_type] if event_type < len(EVENT_NAMES) else f'UNKNOWN_{event_type}'
             print(f"  {event_name}: {count}")
             
         print("\n" + "="*60)
@@ -171,13 +214,40 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Parse robot log files')
-    parser.add_argument('log_file', help='Path to log file (.jsonl)')
+    parser.add_argument('log_file', help='Path to log file (.jsonl, .binlog or .chunks), '
+                                         'or the logs/ root with --batch')
+    parser.add_argument('--stream', action='store_true',
+                        help='Single-pass streaming statistics (constant memory, same report)')
+    parser.add_argument('--columnar', action='store_true',
+                        help='Vectorized NumPy statistics plus battery drain, localization '
+                             'and ball streak timelines')
+    parser.add_argument('--window', type=float, default=60.0,
+                        help='Timeline window in seconds for --columnar')
+    parser.add_argument('--batch', action='store_true',
+                        help='Analyze every match_*/robot_* log under the given logs/ root')
+    parser.add_argument('--output', help='Batch output directory (default: <logs root>/summary)')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help='Batch summary table format (parquet requires pyarrow)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Batch worker processes (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-parse every file instead of reusing cached results '
+                             '(batch summary cache, --columnar .columns.npz)')
     
     args = parser.parse_args()
     
-    parser = LogParser(args.log_file)
+    if args.batch:
+        from batch_analysis import run_batch
+        run_batch(args.log_file, output_dir=args.output, table_format=args.format,
+                  workers=args.workers, use_cache=not args.no_cache)
+        return
+    
+    parser = LogParser(args.log_file, streaming=args.stream, columnar=args.columnar,
+                       cache=not args.no_cache)
     parser.parse()
     parser.print_report()
+    if parser.columns is not None:
+        parser.columns.print_timeline_report(args.window)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+单遍增量统计
+
+功能：
+1. 每个统计项一个聚合器，逐条 update(state)，内存占用与日志长度无关
+2. StreamingStatistics 组合全部聚合器，result() 与 LogParser.get_statistics() 返回相同的字典
+3. 计数字典按首次出现顺序插入，与原实现的报告顺序一致
+
+注意：电量平均值按顺序累加，与内置 sum() 在最后一位上可能不同（print_report 不输出平均值）。
+"""
+
+from collections import defaultdict
+
+
+class GeneralAggregator:
+    """总帧数和时长"""
+
+    def __init__(self):
+        self.count = 0
+        self.first = None
+        self.last = None
+
+    def update(self, state):
+        if self.first is None:
+            self.first = state
+        self.last = state
+        self.count += 1
+
+    def result(self):
+        return {
+            'total_frames': self.count,
+            'duration_ms': self.last['system']['timestamp_ms'] - self.first['system']['timestamp_ms'],
+        }
+
+
+class BatteryAggregator:
+    """电量（初始、最终、消耗、平均）"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.initial = None
+        self.final = None
+
+    def update(self, state):
+        if 'system' not in state:
+            return
+        charge = state['system']['battery_charge']
+        if self.count == 0:
+            self.initial = charge
+        self.final = charge
+        self.total += charge
+        self.count += 1
+
+    def result(self):
+        if not self.count:
+            return {}
+        return {
+            'initial': self.initial,
+            'final': self.final,
+            'consumed': self.initial - self.final,
+            'average': self.total / self.count,
+        }
+
+
+class BallPerceptionAggregator:
+    """球可见帧数和可见率"""
+
+    def __init__(self):
+        self.frames = 0
+        self.visible = 0
+
+    def update(self, state):
+        self.frames += 1
+        if state.get('perception', {}).get('ball', {}).get('visible', False):
+            self.visible += 1
+
+    def result(self):
+        return {
+            'visible_frames': self.visible,
+            'visible_rate': self.visible / self.frames if self.frames else 0,
+        }
+
+
+class LocalizationAggregator:
+    """定位质量分布"""
+
+    def __init__(self):
+        self.frames = 0
+        self.quality_counts = defaultdict(int)
+
+    def update(self, state):
+        self.frames += 1
+        self.quality_counts[state.get('perception', {}).get('localization', {}).get('quality', 0)] += 1
+
+    def result(self):
+        n = self.frames
+        return {
+            'superb_rate': self.quality_counts[2] / n if n else 0,
+            'okay_rate': self.quality_counts[1] / n if n else 0,
+            'poor_rate': self.quality_counts[0] / n if n else 0,
+        }
+
+
+class MotionAggregator:
+    """运动类型分布"""
+
+    MOTION_NAMES = ['STAND', 'WALK', 'KICK', 'GET_UP', 'SPECIAL']
+
+    def __init__(self):
+        self.frames = 0
+        self.motion_counts = defaultdict(int)
+
+    def update(self, state):
+        self.frames += 1
+        self.motion_counts[state.get('decision', {}).get('motion_type', 0)] += 1
+
+    def result(self):
+        return {
+            self.MOTION_NAMES[m]: count / self.frames if self.frames else 0
+            for m, count in self.motion_counts.items()
+        }
+
+
+class EventAggregator:
+    """事件类型计数"""
+
+    def __init__(self):
+        self.total = 0
+        self.event_counts = defaultdict(int)
+
+    def update(self, state):
+        if 'events' not in state:
+            return
+        for event in state['events']:
+            self.event_counts[event['type']] += 1
+            self.total += 1
+
+    def result(self):
+        return dict(self.event_counts)
+
+
+class StreamingStatistics:
+    """组合全部聚合器的单遍统计"""
+
+    def __init__(self):
+        self.general = GeneralAggregator()
+        self.aggregators = {
+            'battery': BatteryAggregator(),
+            'ball_perception': BallPerceptionAggregator(),
+            'localization': LocalizationAggregator(),
+            'motion': MotionAggregator(),
+            'events': EventAggregator(),
+        }
+
+    @property
+    def frames(self):
+        return self.general.count
+
+    @property
+    def events(self):
+        return self.aggregators['events'].total
+
+    def update(self, state):
+        self.general.update(state)
+        for aggregator in self.aggregators.values():
+            aggregator.update(state)
+
+    def consume(self, states):
+        """消费一个状态迭代器，返回 self"""
+        for state in states:
+            self.update(state)
+        return self
+
+    def result(self):
+        """与 LogParser.get_statistics() 相同的统计字典"""
+        if not self.general.count:
+            return {}
+        stats = self.general.result()
+        for name, aggregator in self.aggregators.items():
+            stats[name] = aggregator.result()
+        return stats
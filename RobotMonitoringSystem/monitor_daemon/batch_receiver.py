@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+批量 UDP 接收
+
+功能：
+1. 预分配可复用的接收缓冲池（recvfrom_into，避免每包分配内存）
+2. 每次唤醒一次性读空 socket 缓冲区中的所有数据报
+3. 从 /proc/net/udp 读取内核丢包计数
+"""
+
+import socket
+import sys
+from pathlib import Path
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_BUFFER_SIZE = 65536
+
+PROC_NET_UDP = (Path('/proc/net/udp'), Path('/proc/net/udp6'))
+
+
+class DatagramPool:
+    """预分配的数据报缓冲池
+
+    drain() 返回的 memoryview 指向池内缓冲区，下一次 drain() 时会被覆盖，
+    调用方必须在此之前处理完（或自行复制）整批数据。
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.buffers = [bytearray(buffer_size) for _ in range(batch_size)]
+        self.views = [memoryview(buf) for buf in self.buffers]
+
+    def drain(self, sock):
+        """读空非阻塞 socket，返回 [(memoryview, addr), ...]（最多 batch_size 个）"""
+        batch = []
+        for view in self.views:
+            try:
+                nbytes, addr = sock.recvfrom_into(view)
+            except (BlockingIOError, InterruptedError):
+                break
+            batch.append((view[:nbytes], addr))
+        return batch
+
+
+def set_receive_buffer(sock, size):
+    """设置 SO_RCVBUF，返回内核实际分配的大小
+
+    Linux 会把请求值翻倍并受 net.core.rmem_max 限制，因此实际值可能与请求不同。
+    """
+    if size:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    return sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+
+def read_udp_drops(port):
+    """读取绑定在指定本地端口上的 UDP socket 的内核丢包计数
+
+    返回 (drops, rx_queue_bytes)；非 Linux 系统或读取失败时返回 (None, None)。
+    """
+    if not sys.platform.startswith('linux'):
+        return None, None
+
+    drops = 0
+    rx_queue = 0
+    found = False
+    for proc_file in PROC_NET_UDP:
+        try:
+            lines = proc_file.read_text().splitlines()[1:]
+        except OSError:
+            continue
+        for line in lines:
+            fields = line.split()
+            # sl local_address rem_address st tx_queue:rx_queue ... drops
+            if len(fields) < 13:
+                continue
+            local_port = int(fields[1].rsplit(':', 1)[1], 16)
+            if local_port != port:
+                continue
+            found = True
+            rx_queue += int(fields[4].split(':')[1], 16)
+            drops += int(fields[-1])
+
+    if not found:
+        return None, None
+    return drops, rx_queue
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+WebSocket 广播扇出负载测试
+
+用模拟客户端驱动 web_monitor 的 ClientManager + SnapshotEncoder：
+1. 大部分客户端发送耗时很短，少数客户端故意很慢（每条消息阻塞 --slow-delay 秒）
+2. 按 --rate Hz 广播增量快照，统计每次 broadcast() 的耗时
+3. 检查每个客户端收到的 seq 是否连续（被跳过的增量帧应由关键帧补齐）
+
+用法：
+    python3 bench_fanout.py --clients 100 --slow 10 --rate 20 --seconds 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import web_monitor
+from snapshot_delta import SnapshotEncoder
+
+
+class SimulatedWebSocket:
+    """只实现 sender_loop 用到的接口，记录收到的 seq 并检查连续性"""
+
+    client = None
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.received = 0
+        self.keyframes = 0
+        self.gaps = 0
+        self.last_seq = None
+
+    async def send_bytes(self, data):
+        await asyncio.sleep(self.delay)
+        msg = json.loads(data)
+        if msg["type"] == "snapshot":
+            self.keyframes += 1
+        elif self.last_seq is None or msg["seq"] != self.last_seq + 1:
+            self.gaps += 1
+        self.last_seq = msg["seq"]
+        self.received += 1
+
+
+def make_robots(count):
+    return {
+        str(i): {"robot_id": str(i), "online": True, "battery": 100.0, "temperature": 40.0,
+                 "behavior": "striker", "motion": "walk", "fallen": False, "ball_visible": False,
+                 "timestamp": 0, "pos_x": 0.0, "pos_y": 0.0, "rotation": 0.0, "last_update": 0.0}
+        for i in range(count)
+    }
+
+
+async def run(args):
+    manager = web_monitor.ClientManager()
+    encoder = SnapshotEncoder(args.keyframe_interval)
+    robots = make_robots(args.robots)
+
+    sockets = []
+    tasks = []
+    for i in range(args.clients):
+        ws = SimulatedWebSocket(args.slow_delay if i < args.slow else args.fast_delay)
+        client = web_monitor.WebSocketClient(ws)
+        manager.add(client)
+        sockets.append((ws, client))
+        tasks.append(asyncio.create_task(client.sender_loop()))
+
+    broadcast_times = []
+    interval = 1.0 / args.rate
+    ticks = int(args.seconds * args.rate)
+    for tick in range(ticks):
+        await asyncio.sleep(interval)
+        now = time.time()
+        for robot in robots.values():
+            robot["timestamp"] += int(interval * 1000)
+            robot["last_update"] = now
+            robot["pos_x"] += random.uniform(-0.01, 0.01)
+            robot["battery"] = round(robot["battery"] - random.random() * 0.01, 1)
+
+        start = time.perf_counter()
+        message = encoder.encode({robot_id: dict(state) for robot_id, state in robots.items()}, now)
+        if message is not None:
+            manager.broadcast(message, resync=encoder.keyframe)
+        broadcast_times.append(time.perf_counter() - start)
+
+    await asyncio.sleep(args.slow_delay + 0.2)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return ticks, encoder, sockets, broadcast_times
+
+
+def summarize(name, group):
+    if not group:
+        return
+    received = [ws.received for ws, _ in group]
+    dropped = [client.dropped for _, client in group]
+    avg_lag = [client.total_lag / client.sent * 1000 for _, client in group if client.sent]
+    max_lag = [client.max_lag * 1000 for _, client in group]
+    print(f"{name:<6} clients: {len(group):4d}   received/client: {statistics.mean(received):7.1f}   "
+          f"dropped/client: {statistics.mean(dropped):7.1f}   "
+          f"avg lag: {statistics.mean(avg_lag) if avg_lag else 0:7.2f} ms   "
+          f"max lag: {max(max_lag):7.2f} ms   "
+          f"seq gaps: {sum(ws.gaps for ws, _ in group)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='WebSocket fan-out load test')
+    parser.add_argument('--clients', type=int, default=100, help='Number of simulated clients')
+    parser.add_argument('--slow', type=int, default=10, help='How many of them are slow')
+    parser.add_argument('--fast-delay', type=float, default=0.001, help='Send time of a fast client (s)')
+    parser.add_argument('--slow-delay', type=float, default=0.5, help='Send time of a slow client (s)')
+    parser.add_argument('--robots', type=int, default=10, help='Number of robots in the snapshot')
+    parser.add_argument('--rate', type=float, default=20.0, help='Broadcast rate (Hz)')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Test duration')
+    parser.add_argument('--keyframe-interval', type=float, default=5.0, help='Keyframe interval (s)')
+    args = parser.parse_args()
+
+    ticks, encoder, sockets, broadcast_times = asyncio.run(run(args))
+
+    print(f"{args.clients} clients ({args.slow} slow), {args.robots} robots, "
+          f"{args.rate:.0f} Hz for {args.seconds:.0f}s: {ticks} ticks, "
+          f"{encoder.keyframes} keyframes, {encoder.deltas} deltas")
+    print(f"broadcast() avg: {statistics.mean(broadcast_times) * 1e6:8.1f} us   "
+          f"max: {max(broadcast_times) * 1e6:8.1f} us")
+    summarize("fast", [s for s in sockets if s[0].delay == args.fast_delay])
+    summarize("slow", [s for s in sockets if s[0].delay == args.slow_delay])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+JSON 后端微基准
+
+对每个可用后端（orjson / msgspec / 标准库 json）测量单条消息的编码和解码耗时：
+1. sim_packet：SimRobot UDP 消息（web_monitor / daemon_json 收包）
+2. log_line：Protobuf 转 JSON 的日志行（LogParser.parse）
+3. snapshot：10 个机器人的广播关键帧（broadcast_worker）
+
+安装了 msgspec 时另外测量解码为 robot_state_schema 类型化结构体的耗时。
+
+用法：
+    python3 bench_json.py --iterations 20000
+"""
+
+import argparse
+import time
+
+import fast_json
+
+SIM_PACKET = {
+    "timestamp": 123456, "robot_id": "bhuman_3", "battery": 87.5, "temperature": 41.2,
+    "fallen": False, "behavior": "WalkToBall", "motion": "walk", "ball_visible": True,
+    "ball_x": 1250.3, "ball_y": -310.8, "pos_x": -1520.0, "pos_y": 830.5, "rotation": 1.57,
+    "events": [{"type": "behavior_changed", "from": "SearchForBall", "to": "WalkToBall"}],
+}
+
+LOG_LINE = {
+    "system": {
+        "timestamp_ms": "123456", "frame_number": 7407, "cycle_time_ms": 12,
+        "battery_charge": 87.5, "battery_current": -1.2, "cpu_temperature": 55.0,
+        "orientation": {"roll": 0.01, "pitch": -0.03, "yaw": 1.57}, "is_upright": True,
+    },
+    "perception": {
+        "ball": {"visible": True, "pos_x": 1250.3, "pos_y": -310.8, "last_seen_ms": "123440",
+                 "velocity_x": 12.0, "velocity_y": -3.5},
+        "localization": {"pos_x": -1520.0, "pos_y": 830.5, "rotation": 1.57, "quality": "SUPERB"},
+        "teammates_seen": [1, 2, 4], "opponents_count": 3,
+    },
+    "decision": {
+        "game_state": "PLAYING", "team_number": 5, "player_number": 3, "role": "striker",
+        "active_behavior": "WalkToBall", "motion_type": "WALK", "walk_speed_x": 200.0,
+    },
+    "robot_id": "bhuman_3",
+}
+
+SNAPSHOT = {
+    "type": "snapshot", "keyframe": True, "seq": 42, "timestamp": 1700000000.123,
+    "robots": [dict(SIM_PACKET, robot_id=f"bhuman_{i}", online=True, last_update=1700000000.1)
+               for i in range(10)],
+}
+
+MESSAGES = {'sim_packet': SIM_PACKET, 'log_line': LOG_LINE, 'snapshot': SNAPSHOT}
+
+
+def per_op_us(func, arg, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON backend micro-benchmark')
+    parser.add_argument('--iterations', type=int, default=20000, help='Iterations per measurement')
+    args = parser.parse_args()
+
+    print(f"Available backends: {', '.join(fast_json.available_backends())} "
+          f"(selected: {fast_json.BACKEND})")
+    print(f"{'message':<12} {'backend':<16} {'bytes':>6} {'encode us':>10} {'decode us':>10}")
+
+    for name, message in MESSAGES.items():
+        for backend in fast_json.available_backends():
+            codec = fast_json.get_codec(backend)
+            data = codec.dumps_bytes(message)
+            encode = per_op_us(codec.dumps_bytes, message, args.iterations)
+            decode = per_op_us(codec.loads, data, args.iterations)
+            print(f"{name:<12} {backend:<16} {len(data):6d} {encode:10.2f} {decode:10.2f}")
+
+        schema = {'sim_packet': 'SimRobotState', 'log_line': 'RobotState'}.get(name)
+        if schema and fast_json.msgspec is not None:
+            decoder = fast_json.state_decoder(schema)
+            data = fast_json.get_codec('msgspec').dumps_bytes(message)
+            decode = per_op_us(decoder, data, args.iterations)
+            print(f"{name:<12} {'msgspec (typed)':<16} {len(data):6d} {'':>10} {decode:10.2f}")
+
+
+if __name__ == '__main__':
+    main()
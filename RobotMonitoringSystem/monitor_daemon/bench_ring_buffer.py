@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+环形缓冲区基准测试
+
+对比 MonitorDaemon 原来的 defaultdict(queue.Queue) 与 RingBuffer：
+1. 写入（接收线程每包一次，含写满后丢弃最旧）
+2. 读取最新状态（WebSocket get_state）
+3. 读取最近 k 帧
+
+用法：
+    python3 bench_ring_buffer.py --robots 20 --frames 60000 --capacity 1000
+"""
+
+import argparse
+import queue
+import time
+from collections import defaultdict
+
+from ring_buffer import RingBuffer
+
+
+def bench_queue_store(robot_ids, frames, capacity):
+    states = defaultdict(lambda: queue.Queue(maxsize=capacity))
+    start = time.perf_counter()
+    for i in range(frames):
+        robot_id = robot_ids[i % len(robot_ids)]
+        q = states[robot_id]
+        if q.full():
+            q.get_nowait()
+        q.put_nowait(i)
+    return time.perf_counter() - start, states
+
+
+def bench_ring_store(robot_ids, frames, capacity):
+    states = defaultdict(lambda: RingBuffer(capacity))
+    start = time.perf_counter()
+    for i in range(frames):
+        states[robot_ids[i % len(robot_ids)]].append(i)
+    return time.perf_counter() - start, states
+
+
+def bench_queue_latest(states, robot_ids, reads):
+    start = time.perf_counter()
+    for i in range(reads):
+        q = states[robot_ids[i % len(robot_ids)]]
+        if not q.empty():
+            list(q.queue)[-1]
+    return time.perf_counter() - start
+
+
+def bench_ring_latest(states, robot_ids, reads):
+    start = time.perf_counter()
+    for i in range(reads):
+        states[robot_ids[i % len(robot_ids)]].latest()
+    return time.perf_counter() - start
+
+
+def bench_queue_recent(states, robot_ids, reads, k):
+    start = time.perf_counter()
+    for i in range(reads):
+        list(states[robot_ids[i % len(robot_ids)]].queue)[-k:]
+    return time.perf_counter() - start
+
+
+def bench_ring_recent(states, robot_ids, reads, k):
+    start = time.perf_counter()
+    for i in range(reads):
+        states[robot_ids[i % len(robot_ids)]].recent(k)
+    return time.perf_counter() - start
+
+
+def report(name, baseline, candidate, ops):
+    print(f"{name:<16} queue: {baseline / ops * 1e6:8.3f} us/op   "
+          f"ring: {candidate / ops * 1e6:8.3f} us/op   "
+          f"speedup: {baseline / candidate if candidate else float('inf'):6.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RingBuffer vs queue.Queue benchmark')
+    parser.add_argument('--robots', type=int, default=20, help='Number of robots')
+    parser.add_argument('--frames', type=int, default=60000, help='Total frames to store')
+    parser.add_argument('--capacity', type=int, default=1000, help='Frames kept per robot')
+    parser.add_argument('--reads', type=int, default=10000, help='Number of read requests')
+    parser.add_argument('--k', type=int, default=30, help='Frames per recent-k read')
+    args = parser.parse_args()
+
+    robot_ids = [f"robot_{i}" for i in range(args.robots)]
+
+    t_queue, queue_states = bench_queue_store(robot_ids, args.frames, args.capacity)
+    t_ring, ring_states = bench_ring_store(robot_ids, args.frames, args.capacity)
+
+    print(f"{args.robots} robots, {args.frames} frames, capacity {args.capacity}")
+    report("store", t_queue, t_ring, args.frames)
+    report("latest", bench_queue_latest(queue_states, robot_ids, args.reads),
+           bench_ring_latest(ring_states, robot_ids, args.reads), args.reads)
+    report(f"recent({args.k})", bench_queue_recent(queue_states, robot_ids, args.reads, args.k),
+           bench_ring_recent(ring_states, robot_ids, args.reads, args.k), args.reads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+二进制日志格式（.binlog）
+
+文件结构：
+    MAGIC（5 字节）+ 若干条记录
+每条记录：
+    varint 负载长度 | uint64 小端接收时间戳（ms） | 原始 Protobuf 字节（RobotState）
+
+与 JSONL 相比省去了 MessageToDict + json.dumps，磁盘占用接近线上数据量。
+"""
+
+import struct
+
+MAGIC = b'RSBL\x01'
+BINLOG_SUFFIX = '.binlog'
+
+_TIMESTAMP = struct.Struct('<Q')
+
+
+class BinlogError(ValueError):
+    """文件不是 binlog 或记录损坏"""
+
+
+def encode_varint(value):
+    """编码无符号 varint（与 Protobuf 相同）"""
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_record(payload, received_ms):
+    """编码一条记录"""
+    return encode_varint(len(payload)) + _TIMESTAMP.pack(received_ms) + payload
+
+
+def _read_varint(f):
+    """从文件读取 varint，文件结束时返回 None"""
+    result = 0
+    shift = 0
+    while True:
+        byte = f.read(1)
+        if not byte:
+            if shift == 0:
+                return None
+            raise BinlogError("Truncated varint")
+        b = byte[0]
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result
+        shift += 7
+        if shift > 63:
+            raise BinlogError("Varint too long")
+
+
+def iter_records(f):
+    """逐条读取记录，产出 (received_ms, payload)
+
+    f 为以二进制模式打开的文件对象，读取位置须在文件开头。
+    末尾不完整的记录（写入中途崩溃）会被忽略。
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise BinlogError("Not a binlog file")
+    yield from iter_record_stream(f)
+
+
+def iter_record_stream(f):
+    """从当前位置逐条读取记录（不检查文件头），产出 (received_ms, payload)"""
+    while True:
+        length = _read_varint(f)
+        if length is None:
+            return
+        header = f.read(_TIMESTAMP.size)
+        payload = f.read(length)
+        if len(header) < _TIMESTAMP.size or len(payload) < length:
+            return
+        yield _TIMESTAMP.unpack(header)[0], payload
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+分块压缩日志（.chunks）与帧索引（.chunks.idx）
+
+功能：
+1. 记录按块缓冲，每块独立压缩后追加到数据文件
+2. 旁路索引记录每块的文件偏移、首帧序号和时间戳范围
+3. 尾部读取、时间区间读取和随机访问只解压需要的块
+
+块内记录使用 binlog 的记录格式（varint 长度 + 8 字节接收时间戳 + 负载），
+负载是 JSON 行（jsonl）或原始 Protobuf 字节（raw）。
+
+压缩算法：安装了 zstandard 时可用 zstd，否则使用标准库 zlib。
+"""
+
+import io
+import os
+import struct
+import time
+import zlib
+from bisect import bisect_left, bisect_right
+
+from binlog import encode_record, iter_record_stream
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHUNKS_SUFFIX = '.chunks'
+INDEX_SUFFIX = '.idx'
+
+INDEX_MAGIC = b'RSCI\x01'
+_CODEC_NAME = struct.Struct('8s')
+# 偏移 u64 | 压缩后大小 u32 | 记录数 u32 | 首帧序号 u64 | 首/末接收时间戳 u64
+_INDEX_ENTRY = struct.Struct('<QIIQQQ')
+
+DEFAULT_CHUNK_BYTES = 256 * 1024
+DEFAULT_CHUNK_SECONDS = 5.0
+
+
+def available_codecs():
+    """当前环境可用的压缩算法"""
+    return ['zstd', 'zlib'] if zstandard is not None else ['zlib']
+
+
+def _compressor(codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=3).compress
+    if codec == 'zlib':
+        return lambda data: zlib.compress(data, 6)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def _decompressor(codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress
+    if codec == 'zlib':
+        return zlib.decompress
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+class ChunkedLogWriter:
+    """分块压缩日志写入器
+
+    与文件对象一样提供 flush()/close()，由 LogWriter 的写入线程独占使用。
+    """
+
+    def __init__(self, path, codec='zlib', chunk_bytes=DEFAULT_CHUNK_BYTES,
+                 chunk_seconds=DEFAULT_CHUNK_SECONDS):
+        self.path = str(path)
+        self.index_path = self.path + INDEX_SUFFIX
+        self.codec = codec
+        self.compress = _compressor(codec)
+        self.chunk_bytes = chunk_bytes
+        self.chunk_seconds = chunk_seconds
+
+        self.data_file = open(self.path, 'ab')
+        self.index_file = open(self.index_path, 'ab')
+        if self.index_file.tell() == 0:
+            self.index_file.write(INDEX_MAGIC + _CODEC_NAME.pack(codec.encode()))
+            self.records_written = 0
+        else:
+            # 追加到已有日志：从索引恢复帧计数
+            self.records_written = sum(entry[2] for entry in read_index(self.index_path)[1])
+
+        self.pending = []  # [(received_ms, payload), ...]
+        self.pending_bytes = 0
+        self.chunk_started = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def write_record(self, payload, received_ms):
+        """追加一条记录，块满或超时后压缩落盘"""
+        if not self.pending:
+            self.chunk_started = time.monotonic()
+        self.pending.append((received_ms, payload))
+        self.pending_bytes += len(payload)
+        if (self.pending_bytes >= self.chunk_bytes or
+                time.monotonic() - self.chunk_started >= self.chunk_seconds):
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        if not self.pending:
+            return
+        raw = b''.join(encode_record(payload, received_ms) for received_ms, payload in self.pending)
+        compressed = self.compress(raw)
+        offset = self.data_file.tell()
+        self.data_file.write(compressed)
+        self.data_file.flush()
+        # 数据先落盘再写索引，崩溃时索引不会指向不完整的块
+        self.index_file.write(_INDEX_ENTRY.pack(
+            offset, len(compressed), len(self.pending), self.records_written,
+            self.pending[0][0], self.pending[-1][0]))
+        self.index_file.flush()
+
+        self.records_written += len(self.pending)
+        self.bytes_in += len(raw)
+        self.bytes_out += len(compressed)
+        self.pending = []
+        self.pending_bytes = 0
+
+    def pending_records(self):
+        """尚未落盘的记录（从旧到新）"""
+        return list(self.pending)
+
+    def total_records(self):
+        """已写入的记录数（含未落盘的）"""
+        return self.records_written + len(self.pending)
+
+    def flush(self):
+        """当前块已超时则压缩落盘
+
+        LogWriter 会频繁调用 flush()；为避免产生大量小块，未超时的块继续缓冲，
+        因此数据最多在内存中停留 chunk_seconds（加上调用间隔）。
+        """
+        if self.pending and time.monotonic() - self.chunk_started >= self.chunk_seconds:
+            self._flush_chunk()
+
+    def close(self):
+        self._flush_chunk()
+        self.data_file.close()
+        self.index_file.close()
+
+
+def read_index(index_path):
+    """读取索引，返回 (codec, [(offset, size, count, first_record, first_ms, last_ms), ...])"""
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(INDEX_MAGIC):
+        raise ValueError(f"Not a chunk index: {index_path}")
+    pos = len(INDEX_MAGIC)
+    codec = _CODEC_NAME.unpack_from(data, pos)[0].rstrip(b'\0').decode()
+    pos += _CODEC_NAME.size
+    # 末尾不完整的索引项（写入中途崩溃）被忽略
+    n = (len(data) - pos) // _INDEX_ENTRY.size
+    entries = [_INDEX_ENTRY.unpack_from(data, pos + i * _INDEX_ENTRY.size) for i in range(n)]
+    return codec, entries
+
+
+class ChunkedLogReader:
+    """分块压缩日志读取器（只解压需要的块）"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.codec, self.entries = read_index(self.path + INDEX_SUFFIX)
+        self.decompress = _decompressor(self.codec)
+        self._first_records = [entry[3] for entry in self.entries]
+        self._first_ms = [entry[4] for entry in self.entries]
+
+    def __len__(self):
+        if not self.entries:
+            return 0
+        last = self.entries[-1]
+        return last[3] + last[2]
+
+    def _read_chunk(self, f, entry):
+        offset, size = entry[0], entry[1]
+        f.seek(offset)
+        raw = self.decompress(f.read(size))
+        return list(iter_record_stream(io.BytesIO(raw)))
+
+    def iter_chunks(self, chunk_indices):
+        """按顺序解压指定的块，逐块产出 (首帧序号, [(received_ms, payload), ...])"""
+        with open(self.path, 'rb') as f:
+            for i in chunk_indices:
+                entry = self.entries[i]
+                yield entry[3], self._read_chunk(f, entry)
+
+    def iter_records(self, start=0, stop=None):
+        """产出帧序号区间 [start, stop) 的 (received_ms, payload)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        first = bisect_right(self._first_records, start) - 1
+        last = bisect_right(self._first_records, stop - 1) - 1
+        for first_record, records in self.iter_chunks(range(first, last + 1)):
+            lo = max(start - first_record, 0)
+            hi = min(stop - first_record, len(records))
+            yield from records[lo:hi]
+
+    def record(self, index):
+        """随机访问第 index 帧"""
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return next(self.iter_records(index, index + 1))
+
+    def tail(self, n):
+        """最后 n 帧（从旧到新）"""
+        total = len(self)
+        return list(self.iter_records(max(total - n, 0), total))
+
+    def time_range(self, since_ms=None, until_ms=None):
+        """产出接收时间在 [since_ms, until_ms) 内的记录
+
+        依赖接收时间单调递增（同一写入线程按接收顺序写入）。
+        """
+        first = 0
+        if since_ms is not None:
+            first = max(bisect_left(self._first_ms, since_ms) - 1, 0)
+        last = len(self.entries)
+        if until_ms is not None:
+            last = bisect_left(self._first_ms, until_ms)
+        for _, records in self.iter_chunks(range(first, last)):
+            for received_ms, payload in records:
+                if since_ms is not None and received_ms < since_ms:
+                    continue
+                if until_ms is not None and received_ms >= until_ms:
+                    return
+                yield received_ms, payload
+
+    def stats(self):
+        """压缩后数据文件大小、块数和帧数"""
+        return {
+            'codec': self.codec,
+            'chunks': len(self.entries),
+            'records': len(self),
+            'compressed_bytes': os.path.getsize(self.path),
+        }
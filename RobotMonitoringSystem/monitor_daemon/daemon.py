@@ -11,9 +11,9 @@
 """
 
 import socket
+import select
 import struct
 import threading
-import queue
 import argparse
 import sys
 import time
@@ -29,24 +29,49 @@ except ImportError:
     print("  protoc --python_out=. ../bhuman_integration/proto/robot_state.proto")
     sys.exit(1)
 
+from batch_receiver import DatagramPool, DEFAULT_BATCH_SIZE, read_udp_drops, set_receive_buffer
+from chunked_log import available_codecs
+from group_commit import FSYNC_POLICIES
 from log_writer import LogWriter
+from ring_buffer import RingBuffer
+from sharded_receiver import ShardedReceiver
+from telemetry_store import TelemetryStore, row_from_state
 from websocket_server import WebSocketServer
 
+# 每个机器人缓存的最近帧数（内存上限 = 帧数 × 机器人数）
+STATE_BUFFER_CAPACITY = 1000
+
 
 class MonitorDaemon:
     """监控守护进程"""
     
-    def __init__(self, port=10020, multicast_group='239.0.0.1', log_dir='logs', ws_port=8765):
+    def __init__(self, port=10020, multicast_group='239.0.0.1', log_dir='logs', ws_port=8765,
+                 batch=False, batch_size=DEFAULT_BATCH_SIZE, rcvbuf=0, workers=0,
+                 log_format='jsonl', compression=None, fsync='never'):
         self.port = port
         self.multicast_group = multicast_group
         self.log_dir = Path(log_dir)
         self.ws_port = ws_port
         
-        # 机器人状态缓存（robot_id -> queue）
-        self.robot_states = defaultdict(lambda: queue.Queue(maxsize=1000))
+        # 批量接收模式
+        self.batch = batch
+        self.batch_size = batch_size
+        self.rcvbuf = rcvbuf
+        
+        # 多进程分片接收（0 表示在本进程内接收）
+        self.workers = workers
+        self.sharded_receiver = None
+        
+        # 机器人状态缓存（robot_id -> RingBuffer；分片模式下元素为原始 Protobuf 字节）
+        # 只有接收线程（或收集线程）写入，读取无需加锁
+        self.robot_states = defaultdict(lambda: RingBuffer(STATE_BUFFER_CAPACITY))
+        
+        # 列式遥测（电量、姿态、球、定位等数值字段的时间序列）
+        self.telemetry = TelemetryStore()
         
         # 日志写入器
-        self.log_writer = LogWriter(log_dir=self.log_dir)
+        self.log_writer = LogWriter(log_dir=self.log_dir, log_format=log_format,
+                                    compression=compression, fsync=fsync)
         
         # WebSocket 服务器
         self.ws_server = WebSocketServer(port=ws_port, daemon=self)
@@ -56,15 +81,22 @@ class MonitorDaemon:
             'packets_received': 0,
             'packets_dropped': 0,
             'parse_errors': 0,
+            'batches': 0,
+            'kernel_drops': None,
         }
         
     def start(self):
         """启动守护进程"""
         self.running = True
         
+        if self.workers > 0:
+            self._start_sharded()
+            return
+        
         # 创建 UDP socket
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        actual_rcvbuf = set_receive_buffer(sock, self.rcvbuf)
         
         # 绑定到多播地址
         sock.bind(('', self.port))
@@ -76,12 +108,16 @@ class MonitorDaemon:
         print(f"[MonitorDaemon] Listening on {self.multicast_group}:{self.port}")
         print(f"[MonitorDaemon] Log directory: {self.log_dir.absolute()}")
         print(f"[MonitorDaemon] WebSocket server on port {self.ws_port}")
+        print(f"[MonitorDaemon] SO_RCVBUF: {actual_rcvbuf} bytes")
+        if self.batch:
+            print(f"[MonitorDaemon] Batch receive enabled (batch size {self.batch_size})")
         
         # 启动 WebSocket 服务器
         self.ws_server.start()
         
         # 启动接收线程
-        receiver_thread = threading.Thread(target=self._receive_loop, args=(sock,), daemon=True)
+        receive_loop = self._receive_loop_batched if self.batch else self._receive_loop
+        receiver_thread = threading.Thread(target=receive_loop, args=(sock,), daemon=True)
         receiver_thread.start()
         
         # 启动统计输出线程
@@ -90,6 +126,62 @@ class MonitorDaemon:
         
         print("[MonitorDaemon] Started successfully")
         
+    def _start_sharded(self):
+        """以多进程分片模式启动（解析和编码在接收子进程中完成）"""
+        self.sharded_receiver = ShardedReceiver(
+            num_workers=self.workers,
+            port=self.port,
+            multicast_group=self.multicast_group,
+            rcvbuf=self.rcvbuf,
+            batch_size=self.batch_size,
+            encode_log_lines=self.log_writer.log_format == 'jsonl',
+        )
+        
+        print(f"[MonitorDaemon] Listening on {self.multicast_group}:{self.port} "
+              f"with {self.workers} receiver processes (SO_REUSEPORT)")
+        print(f"[MonitorDaemon] Log directory: {self.log_dir.absolute()}")
+        print(f"[MonitorDaemon] WebSocket server on port {self.ws_port}")
+        
+        # 先启动子进程，再启动本进程的 WebSocket 线程
+        self.sharded_receiver.start()
+        self.ws_server.start()
+        
+        collect_thread = threading.Thread(target=self._collect_loop, daemon=True)
+        collect_thread.start()
+        
+        stats_thread = threading.Thread(target=self._stats_loop, daemon=True)
+        stats_thread.start()
+        
+        print("[MonitorDaemon] Started successfully")
+        
+    def _collect_loop(self):
+        """收集接收子进程的结果（独立线程）"""
+        while self.running:
+            try:
+                result = self.sharded_receiver.get_batch()
+                if result is None:
+                    continue
+                    
+                worker_index, received, parse_errors, batch = result
+                self.stats['packets_received'] += received
+                self.stats['parse_errors'] += parse_errors
+                self.stats['batches'] += 1
+                if not batch:
+                    continue
+                
+                for robot_id, game_state, raw, log_line, ws_message, row in batch:
+                    self._store_state(robot_id, raw, row)
+                    
+                # raw 格式直接写原始字节，jsonl 格式写子进程编码好的行
+                raw_log = self.log_writer.log_format == 'raw'
+                self.log_writer.write_encoded(
+                    [(robot_id, game_state, raw if raw_log else log_line)
+                     for robot_id, game_state, raw, log_line, _, _ in batch])
+                self.ws_server.broadcast_messages([ws_message for _, _, _, _, ws_message, _ in batch])
+                
+            except Exception as e:
+                print(f"[ERROR] Error in collect loop: {e}")
+                
     def _receive_loop(self, sock):
         """接收循环（独立线程）"""
         while self.running:
@@ -97,29 +189,12 @@ class MonitorDaemon:
                 data, addr = sock.recvfrom(65536)
                 self.stats['packets_received'] += 1
                 
-                # 解析 Protobuf
-                state = RobotState()
-                try:
-                    state.ParseFromString(data)
-                except Exception as e:
-                    self.stats['parse_errors'] += 1
-                    print(f"[ERROR] Failed to parse protobuf: {e}")
+                state = self._parse_packet(data)
+                if state is None:
                     continue
-                
                 robot_id = state.robot_id
-                if not robot_id:
-                    print("[WARNING] Received state without robot_id")
-                    continue
                 
-                # 存入队列（限制队列长度，避免内存溢出）
-                try:
-                    if self.robot_states[robot_id].full():
-                        self.robot_states[robot_id].get_nowait()  # 丢弃最旧的
-                        self.stats['packets_dropped'] += 1
-                    
-                    self.robot_states[robot_id].put_nowait(state)
-                except queue.Full:
-                    self.stats['packets_dropped'] += 1
+                self._store_state(robot_id, state)
                 
                 # 写入日志
                 self.log_writer.write_state(robot_id, state)
@@ -127,14 +202,80 @@ class MonitorDaemon:
                 # 广播到 WebSocket 客户端
                 self.ws_server.broadcast_state(robot_id, state)
                 
-                # 打印事件
-                for event in state.events:
-                    event_type_name = RobotState.Event.EventType.Name(event.type)
-                    print(f"[EVENT] [{robot_id}] {event_type_name}: {event.description}")
+                self._print_events(robot_id, state)
                     
             except Exception as e:
                 print(f"[ERROR] Error in receive loop: {e}")
                 
+    def _receive_loop_batched(self, sock):
+        """批量接收循环（独立线程）
+
+        每次唤醒读空 socket 缓冲区，整批解析后一次性交给日志和 WebSocket。
+        """
+        sock.setblocking(False)
+        pool = DatagramPool(batch_size=self.batch_size)
+        
+        while self.running:
+            try:
+                # 带超时等待，保证 stop() 后能退出
+                readable, _, _ = select.select([sock], [], [], 1.0)
+                if not readable:
+                    continue
+                    
+                datagrams = pool.drain(sock)
+                if not datagrams:
+                    continue
+                self.stats['packets_received'] += len(datagrams)
+                self.stats['batches'] += 1
+                
+                # 缓冲区会在下一次 drain 时被覆盖，必须在此之前解析完
+                batch = []
+                for data, addr in datagrams:
+                    state = self._parse_packet(data)
+                    if state is None:
+                        continue
+                    self._store_state(state.robot_id, state)
+                    batch.append((state.robot_id, state))
+                    
+                if not batch:
+                    continue
+                    
+                self.log_writer.write_states(batch)
+                self.ws_server.broadcast_states(batch)
+                
+                for robot_id, state in batch:
+                    self._print_events(robot_id, state)
+                    
+            except Exception as e:
+                print(f"[ERROR] Error in batched receive loop: {e}")
+                
+    def _parse_packet(self, data):
+        """解析 Protobuf 数据包，失败或缺少 robot_id 时返回 None"""
+        state = RobotState()
+        try:
+            state.ParseFromString(data)
+        except Exception as e:
+            self.stats['parse_errors'] += 1
+            print(f"[ERROR] Failed to parse protobuf: {e}")
+            return None
+            
+        if not state.robot_id:
+            print("[WARNING] Received state without robot_id")
+            return None
+        return state
+        
+    def _store_state(self, robot_id, state, row=None):
+        """存入环形缓冲区（容量固定，写满后覆盖最旧的）和列式遥测"""
+        if self.robot_states[robot_id].append(state):
+            self.stats['packets_dropped'] += 1
+        self.telemetry.append(robot_id, row if row is not None else row_from_state(state))
+            
+    def _print_events(self, robot_id, state):
+        """打印事件"""
+        for event in state.events:
+            event_type_name = RobotState.Event.EventType.Name(event.type)
+            print(f"[EVENT] [{robot_id}] {event_type_name}: {event.description}")
+                
     def _stats_loop(self):
         """统计输出循环"""
         last_packets = 0
@@ -145,16 +286,50 @@ class MonitorDaemon:
             rate = (packets - last_packets) / 10.0
             last_packets = packets
             
-            print(f"[STATS] Packets: {packets}, Rate: {rate:.1f}/s, "
-                  f"Dropped: {self.stats['packets_dropped']}, "
-                  f"Errors: {self.stats['parse_errors']}")
+            kernel_drops, rx_queue = read_udp_drops(self.port)
+            self.stats['kernel_drops'] = kernel_drops
+            
+            line = (f"[STATS] Packets: {packets}, Rate: {rate:.1f}/s, "
+                    f"Dropped: {self.stats['packets_dropped']}, "
+                    f"Errors: {self.stats['parse_errors']}")
+            if kernel_drops is not None:
+                line += f", Kernel drops: {kernel_drops}, RX queue: {rx_queue} B"
+            if self.batch or self.workers:
+                batches = self.stats['batches']
+                line += f", Avg batch: {packets / batches if batches else 0:.1f}"
+            writer = self.log_writer.group_writer.stats()
+            if writer['records']:
+                line += (f", Log records/write: {writer['records_per_write']}, "
+                         f"Log latency p99: {writer['record_latency']['p99_ms']} ms")
+            print(line)
                 
     def get_latest_state(self, robot_id):
         """获取指定机器人的最新状态"""
-        if robot_id in self.robot_states and not self.robot_states[robot_id].empty():
-            # 返回队列中最新的（不移除）
-            return list(self.robot_states[robot_id].queue)[-1]
-        return None
+        buffer = self.robot_states.get(robot_id)
+        if buffer is None:
+            return None
+        return self._decode_state(buffer.latest())
+        
+    def get_recent_states(self, robot_id, count):
+        """获取指定机器人最近 count 帧状态（从旧到新）"""
+        buffer = self.robot_states.get(robot_id)
+        if buffer is None:
+            return []
+        return [self._decode_state(state) for state in buffer.recent(count)]
+        
+    def get_telemetry(self, robot_id, fields, seconds=None):
+        """获取指定机器人若干遥测列（最近 seconds 秒，None 表示全部）"""
+        if seconds is None:
+            return self.telemetry.query(robot_id, fields)
+        return self.telemetry.last(robot_id, fields, seconds)
+        
+    @staticmethod
+    def _decode_state(state):
+        """分片模式下只缓存原始字节，按需解析"""
+        if isinstance(state, bytes):
+            raw, state = state, RobotState()
+            state.ParseFromString(raw)
+        return state
         
     def get_all_robot_ids(self):
         """获取所有活跃的机器人 ID"""
@@ -164,6 +339,8 @@ class MonitorDaemon:
         """停止守护进程"""
         print("[MonitorDaemon] Stopping...")
         self.running = False
+        if self.sharded_receiver is not None:
+            self.sharded_receiver.stop()
         self.log_writer.close_all()
         self.ws_server.stop()
         print("[MonitorDaemon] Stopped")
@@ -175,6 +352,19 @@ def main():
     parser.add_argument('--multicast', type=str, default='239.0.0.1', help='Multicast group address')
     parser.add_argument('--log-dir', type=str, default='logs', help='Log directory')
     parser.add_argument('--ws-port', type=int, default=8765, help='WebSocket server port')
+    parser.add_argument('--batch', action='store_true', help='Drain the socket buffer in batches per wakeup')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='Max datagrams per batch (pre-allocated buffers)')
+    parser.add_argument('--rcvbuf', type=int, default=0,
+                        help='SO_RCVBUF in bytes (0 = system default)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Number of receiver processes sharded by robot_id (0 = receive in-process)')
+    parser.add_argument('--log-format', choices=['jsonl', 'raw'], default='jsonl',
+                        help='Log format: JSON Lines or raw protobuf .binlog')
+    parser.add_argument('--compress', choices=available_codecs(), default=None,
+                        help='Write logs as independently compressed chunks with a frame index')
+    parser.add_argument('--fsync', choices=FSYNC_POLICIES, default='never',
+                        help='fsync policy for uncompressed logs: never, after every group commit, or at match end')
     
     args = parser.parse_args()
     
@@ -182,7 +372,14 @@ def main():
         port=args.port,
         multicast_group=args.multicast,
         log_dir=args.log_dir,
-        ws_port=args.ws_port
+        ws_port=args.ws_port,
+        batch=args.batch,
+        batch_size=args.batch_size,
+        rcvbuf=args.rcvbuf,
+        workers=args.workers,
+        log_format=args.log_format,
+        compression=args.compress,
+        fsync=args.fsync
     )
     
     daemon.start()
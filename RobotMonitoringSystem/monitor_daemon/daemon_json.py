@@ -10,7 +10,6 @@
 """
 
 import socket
-import json
 import threading
 import queue
 import argparse
@@ -20,16 +19,19 @@ from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 
+from fast_json import DecodeError, loads
+from group_commit import FSYNC_POLICIES, GroupCommitWriter
+
 
 class LogWriter:
-    """简化的日志写入器"""
+    """简化的日志写入器（组提交，见 group_commit.py）"""
     
-    def __init__(self, log_dir='logs'):
+    def __init__(self, log_dir='logs', fsync='never'):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.current_match_dir = None
-        self.log_files = {}
-        self.lock = threading.Lock()
+        self.log_files = {}  # robot_id -> 日志文件路径
+        self.group_writer = GroupCommitWriter(fsync=fsync)
         
     def start_match(self):
         """开始新的比赛日志"""
@@ -39,31 +41,28 @@ class LogWriter:
         print(f"[LogWriter] Started new match: {self.current_match_dir}")
         
     def write_state(self, robot_id, state_json):
-        """写入机器人状态"""
+        """写入机器人状态（state_json 为 UTF-8 编码的 JSON bytes）"""
         if not self.current_match_dir:
             self.start_match()
             
-        with self.lock:
-            if robot_id not in self.log_files:
-                log_file = self.current_match_dir / f"robot_{robot_id}.jsonl"
-                self.log_files[robot_id] = open(log_file, 'a')
-                print(f"[LogWriter] Created log file: {log_file}")
-            
-            self.log_files[robot_id].write(state_json + '\n')
-            self.log_files[robot_id].flush()
+        log_file = self.log_files.get(robot_id)
+        if log_file is None:
+            log_file = self.log_files[robot_id] = self.current_match_dir / f"robot_{robot_id}.jsonl"
+            print(f"[LogWriter] Created log file: {log_file}")
+        
+        # 只追加到内存缓冲区，由写入线程每 50 ms / 256 KB 提交一次
+        self.group_writer.write(log_file, state_json + b'\n')
     
     def close(self):
-        """关闭所有日志文件"""
-        with self.lock:
-            for f in self.log_files.values():
-                f.close()
-            self.log_files.clear()
+        """提交剩余数据并关闭所有日志文件"""
+        self.group_writer.close()
+        self.log_files.clear()
 
 
 class MonitorDaemon:
     """监控守护进程 - JSON 版本"""
     
-    def __init__(self, port=10020, log_dir='logs'):
+    def __init__(self, port=10020, log_dir='logs', fsync='never'):
         self.port = port
         self.log_dir = Path(log_dir)
         
@@ -76,7 +75,7 @@ class MonitorDaemon:
         }
         
         # 日志写入器
-        self.log_writer = LogWriter(log_dir=self.log_dir)
+        self.log_writer = LogWriter(log_dir=self.log_dir, fsync=fsync)
         
         # UDP socket
         self.sock = None
@@ -121,15 +120,14 @@ class MonitorDaemon:
     def _handle_packet(self, data, addr):
         """处理接收到的数据包"""
         try:
-            # 解析 JSON
-            state_json = data.decode('utf-8')
-            state = json.loads(state_json)
+            # 解析 JSON（直接解析 bytes，日志原样写入收到的字节）
+            state = loads(data)
             
             # 提取 robot_id
             robot_id = state.get('robot_id', 'unknown')
             
             # 写入日志
-            self.log_writer.write_state(robot_id, state_json)
+            self.log_writer.write_state(robot_id, data)
             
             # 更新统计
             self.stats['packets_received'] += 1
@@ -139,7 +137,7 @@ class MonitorDaemon:
                 self._display_state(robot_id, state)
                 self.stats['last_display'] = time.time()
                 
-        except json.JSONDecodeError as e:
+        except DecodeError as e:
             self.stats['parse_errors'] += 1
             print(f"[ERROR] JSON parse error: {e}")
         except Exception as e:
@@ -171,10 +169,13 @@ class MonitorDaemon:
             elapsed = time.time() - self.stats['last_report_time']
             rate = self.stats['packets_received'] / elapsed if elapsed > 0 else 0
             
+            writer = self.log_writer.group_writer.stats()
             print(f"\n[STATS] Packets: {self.stats['packets_received']}, "
                   f"Rate: {rate:.1f}/s, "
                   f"Dropped: {self.stats['packets_dropped']}, "
-                  f"Errors: {self.stats['parse_errors']}\n")
+                  f"Errors: {self.stats['parse_errors']}, "
+                  f"Records/write: {writer['records_per_write']}, "
+                  f"Log latency p99: {writer['record_latency']['p99_ms']} ms\n")
             
             # 重置计数器
             self.stats['packets_received'] = 0
@@ -193,10 +194,12 @@ def main():
     parser = argparse.ArgumentParser(description='Robot Monitoring Daemon (JSON version)')
     parser.add_argument('--port', type=int, default=10020, help='UDP port to listen on')
     parser.add_argument('--log-dir', type=str, default='logs', help='Directory for log files')
+    parser.add_argument('--fsync', choices=FSYNC_POLICIES, default='never',
+                        help='fsync policy: never, after every batch, or when log files are closed')
     
     args = parser.parse_args()
     
-    daemon = MonitorDaemon(port=args.port, log_dir=args.log_dir)
+    daemon = MonitorDaemon(port=args.port, log_dir=args.log_dir, fsync=args.fsync)
     daemon.start()
 
 
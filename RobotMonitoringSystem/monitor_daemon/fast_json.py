@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+JSON 编解码层
+
+功能：
+1. 热路径（UDP 收包、写日志、WebSocket 广播、日志解析）统一使用本模块的 loads/dumps
+2. 自动选择最快的可用后端：orjson > msgspec > 标准库 json
+3. 可用环境变量 MONITOR_JSON_BACKEND=orjson|msgspec|json 强制指定后端
+
+后端在导入时确定；调用方可以直接 `from fast_json import loads, dumps_bytes`。
+安装了 msgspec 时，state_decoder() 可把消息直接解析为 robot_state_schema 中的类型化结构。
+
+注意各后端输出不逐字节相同：orjson/msgspec 输出紧凑格式（无空格），
+NaN/Infinity 编码为 null；解析结果相同。
+"""
+
+import json
+import os
+from collections import namedtuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# 所有后端的解析错误都是 ValueError 的子类（json.JSONDecodeError、orjson.JSONDecodeError、msgspec.DecodeError）
+DecodeError = ValueError
+
+# loads(bytes | str) -> 对象；dumps(对象) -> str；dumps_bytes(对象) -> UTF-8 bytes
+Codec = namedtuple('Codec', ['name', 'loads', 'dumps', 'dumps_bytes'])
+
+
+def _stdlib_codec():
+    return Codec(
+        name='json',
+        loads=json.loads,
+        dumps=json.dumps,
+        dumps_bytes=lambda obj: json.dumps(obj).encode('utf-8'),
+    )
+
+
+def _orjson_codec():
+    return Codec(
+        name='orjson',
+        loads=orjson.loads,
+        dumps=lambda obj: orjson.dumps(obj).decode('utf-8'),
+        dumps_bytes=orjson.dumps,
+    )
+
+
+def _msgspec_codec():
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    return Codec(
+        name='msgspec',
+        loads=decoder.decode,
+        dumps=lambda obj: encoder.encode(obj).decode('utf-8'),
+        dumps_bytes=encoder.encode,
+    )
+
+
+def available_backends():
+    """当前环境可用的后端（按优先级排列）"""
+    backends = []
+    if orjson is not None:
+        backends.append('orjson')
+    if msgspec is not None:
+        backends.append('msgspec')
+    backends.append('json')
+    return backends
+
+
+def get_codec(name=None):
+    """按名称获取编解码器，name 为 None 时返回最快的可用后端"""
+    if name is None:
+        name = available_backends()[0]
+    if name == 'orjson' and orjson is not None:
+        return _orjson_codec()
+    if name == 'msgspec' and msgspec is not None:
+        return _msgspec_codec()
+    if name == 'json':
+        return _stdlib_codec()
+    raise ValueError(f"JSON backend not available: {name} (available: {', '.join(available_backends())})")
+
+
+def state_decoder(schema='RobotState'):
+    """返回把 JSON 解析为 msgspec 结构体的函数
+
+    schema 为 'RobotState'（Protobuf 日志行）或 'SimRobotState'（SimRobot UDP 消息）。
+    """
+    if msgspec is None:
+        raise ImportError("Typed decoding requires the 'msgspec' package")
+    import robot_state_schema
+    return msgspec.json.Decoder(getattr(robot_state_schema, schema), strict=False).decode
+
+
+codec = get_codec(os.environ.get('MONITOR_JSON_BACKEND') or None)
+
+BACKEND = codec.name
+loads = codec.loads
+dumps = codec.dumps
+dumps_bytes = codec.dumps_bytes
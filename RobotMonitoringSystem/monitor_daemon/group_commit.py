@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+组提交日志写入器（group commit）
+
+功能：
+1. 所有机器人、所有日志文件共用一个写入线程
+2. 写入只追加到内存缓冲区（非阻塞）；缓冲区每 max_delay 秒或累计 max_bytes 字节
+   提交一次，每个文件每次提交只有一次 write
+3. fsync 策略：never（只交给操作系统）、batch（每次提交后 fsync）、
+   match_end（关闭文件时 fsync，即比赛结束或进程退出时）
+4. 统计写放大和延迟直方图
+
+数据在内存中停留的时间上限为 max_delay 加一次提交的耗时；
+需要立即落盘时（例如读取文件尾部前）调用 flush()。
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_MAX_DELAY = 0.05          # 50 ms
+DEFAULT_MAX_BYTES = 256 * 1024    # 256 KB
+FSYNC_POLICIES = ('never', 'batch', 'match_end')
+
+# 直方图桶上限（毫秒），最后一个桶收集超过最大上限的样本
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LatencyHistogram:
+    """固定桶延迟直方图（只由写入线程更新）"""
+
+    def __init__(self, buckets_ms=HISTOGRAM_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p):
+        """估计第 p 百分位（返回所在桶的上限，不超过最大值，毫秒）"""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and i < len(self.buckets_ms):
+                return round(min(float(self.buckets_ms[i]), self.max), 3)
+        return round(self.max, 3)
+
+    def to_dict(self):
+        labels = [f"<={b}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max, 3),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class GroupCommitWriter:
+    """组提交写入器：多个追加写文件共用一个后台写入线程
+
+    write() 可以从任意线程调用；文件的打开、写入、fsync 和关闭都只在写入线程中进行。
+    """
+
+    def __init__(self, max_delay=DEFAULT_MAX_DELAY, max_bytes=DEFAULT_MAX_BYTES, fsync='never'):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync} (choose from {', '.join(FSYNC_POLICIES)})")
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+
+        self._cond = threading.Condition()
+        self._pending = {}          # path -> [bytes, ...]
+        self._pending_times = []    # 每条记录的入缓冲时间（monotonic）
+        self._pending_bytes = 0
+        self._first_pending = None  # 最早一条未提交记录的时间
+        self._close_requests = set()
+        self._flush_requested = False
+        self._committing = False
+        self._generation = 0        # 已完成的提交次数
+        self._stopping = False
+
+        self._files = {}            # path -> 文件对象（只在写入线程中使用）
+
+        # 统计
+        self.records = 0
+        self.bytes_written = 0
+        self.commits = 0
+        self.write_calls = 0
+        self.fsyncs = 0
+        self.commit_latency = LatencyHistogram()   # 一次提交（write + fsync）的耗时
+        self.record_latency = LatencyHistogram()   # 单条记录从 write() 到提交完成
+
+        self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+        self._thread.start()
+
+    def write(self, path, data):
+        """追加 data（bytes）到文件 path（非阻塞）"""
+        path = str(path)
+        with self._cond:
+            if self._stopping:
+                raise ValueError("GroupCommitWriter is closed")
+            chunks = self._pending.get(path)
+            if chunks is None:
+                chunks = self._pending[path] = []
+            chunks.append(data)
+            now = time.monotonic()
+            self._pending_times.append(now)
+            self._pending_bytes += len(data)
+            if self._first_pending is None:
+                self._first_pending = now
+                self._cond.notify_all()
+            elif self._pending_bytes >= self.max_bytes:
+                self._cond.notify_all()
+
+    def pending_bytes(self):
+        """尚未提交的字节数"""
+        return self._pending_bytes
+
+    def flush(self):
+        """立即提交已写入的数据并等待完成"""
+        with self._cond:
+            self._flush_requested = True
+            self._wait_for_commit()
+
+    def close_file(self, path):
+        """提交并关闭一个文件（fsync 策略为 batch 或 match_end 时先 fsync）"""
+        with self._cond:
+            self._close_requests.add(str(path))
+            self._wait_for_commit()
+
+    def close(self):
+        """提交全部数据，关闭所有文件并停止写入线程"""
+        with self._cond:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _wait_for_commit(self):
+        """等待一次包含调用前所有数据的提交（调用时须持有 _cond）"""
+        # 正在进行的提交不一定包含刚写入的数据，需要再等一次
+        target = self._generation + (2 if self._committing else 1)
+        self._cond.notify_all()
+        while self._generation < target and self._thread.is_alive():
+            self._cond.wait()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending or self._close_requests or self._flush_requested or self._stopping:
+                        if (self._stopping or self._flush_requested or self._close_requests or
+                                self._pending_bytes >= self.max_bytes):
+                            break
+                        timeout = self._first_pending + self.max_delay - time.monotonic()
+                        if timeout <= 0:
+                            break
+                        self._cond.wait(timeout)
+                    else:
+                        self._cond.wait()
+
+                pending, self._pending = self._pending, {}
+                times, self._pending_times = self._pending_times, []
+                closes, self._close_requests = self._close_requests, set()
+                self._pending_bytes = 0
+                self._first_pending = None
+                self._flush_requested = False
+                stopping = self._stopping
+                self._committing = True
+
+            try:
+                self._commit(pending, times, closes, close_all=stopping)
+            except Exception as e:
+                print(f"[ERROR] Group commit failed: {e}")
+
+            with self._cond:
+                self._committing = False
+                self._generation += 1
+                self._cond.notify_all()
+                if stopping:
+                    return
+
+    def _commit(self, pending, times, closes, close_all=False):
+        start = time.monotonic()
+        touched = []
+        for path, chunks in pending.items():
+            f = self._files.get(path)
+            if f is None:
+                f = self._files[path] = open(path, 'ab')
+            data = b''.join(chunks)
+            f.write(data)
+            f.flush()
+            touched.append(f)
+            self.write_calls += 1
+            self.bytes_written += len(data)
+
+        if self.fsync == 'batch':
+            for f in touched:
+                os.fsync(f.fileno())
+                self.fsyncs += 1
+
+        for path in (list(self._files) if close_all else closes):
+            f = self._files.pop(path, None)
+            if f is None:
+                continue
+            if self.fsync != 'never':
+                os.fsync(f.fileno())
+                self.fsyncs += 1
+            f.close()
+
+        if not pending and not closes and not close_all:
+            return
+        done = time.monotonic()
+        self.commits += 1
+        self.records += len(times)
+        self.commit_latency.record(done - start)
+        for queued_at in times:
+            self.record_latency.record(done - queued_at)
+
+    def stats(self):
+        """写入统计
+
+        write_amplification 为平均每条记录触发的 write/fsync 系统调用次数
+        （逐行写入并 flush 为 1.0，逐行 fsync 为 2.0，组提交远小于 1）。
+        """
+        records = self.records
+        return {
+            'fsync_policy': self.fsync,
+            'records': records,
+            'bytes_written': self.bytes_written,
+            'commits': self.commits,
+            'write_calls': self.write_calls,
+            'fsyncs': self.fsyncs,
+            'records_per_write': round(records / self.write_calls, 1) if self.write_calls else 0.0,
+            'write_amplification': round((self.write_calls + self.fsyncs) / records, 4) if records else 0.0,
+            'pending_bytes': self._pending_bytes,
+            'commit_latency': self.commit_latency.to_dict(),
+            'record_latency': self.record_latency.to_dict(),
+        }
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+JSONL 日志的反向尾部读取
+
+从文件末尾按块向前 seek，只读取包含最后 n 行所需的字节，
+耗时与 n 成正比，与文件总长度（比赛进行了多久）无关。
+"""
+
+import os
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+
+def read_tail_lines(path, n, block_size=DEFAULT_BLOCK_SIZE):
+    """读取文件最后 n 行（从旧到新，不含换行符）
+
+    末尾没有换行符的行（写入中途）也会返回，由调用方决定是否丢弃。
+    """
+    if n <= 0:
+        return []
+
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b''
+        # 多读一行：块边界处的第一行可能不完整
+        while pos > 0 and buf.count(b'\n') <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+
+    lines = buf.split(b'\n')
+    if buf.endswith(b'\n'):
+        lines.pop()
+    if pos > 0:
+        lines = lines[1:]
+    return [line.decode('utf-8', errors='replace') for line in lines[-n:] if line]
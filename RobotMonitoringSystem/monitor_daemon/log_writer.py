@@ -6,30 +6,48 @@
 1. 管理日志文件生命周期（比赛开始/结束）
 2. 异步写入日志（避免阻塞接收线程）
 3. 按机器人分文件存储
-4. JSON Lines 格式
+4. JSON Lines 格式，或原始 Protobuf 二进制格式（raw，见 binlog.py）
+5. 可选分块压缩并生成帧索引（见 chunked_log.py）
+6. 未压缩日志经组提交写入器落盘（见 group_commit.py），fsync 策略可配置
 """
 
 import json
 import threading
 import queue
+import time
 from datetime import datetime
 from pathlib import Path
 from google.protobuf.json_format import MessageToDict
 
+from binlog import MAGIC, BINLOG_SUFFIX, encode_record
+from chunked_log import CHUNKS_SUFFIX, ChunkedLogWriter
+from group_commit import GroupCommitWriter
+
+# 日志格式 -> 文件后缀
+LOG_FORMATS = {
+    'jsonl': '.jsonl',
+    'raw': BINLOG_SUFFIX,
+}
+
 
 class LogWriter:
     """日志写入器"""
     
-    def __init__(self, log_dir='logs'):
+    def __init__(self, log_dir='logs', log_format='jsonl', compression=None, fsync='never'):
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format: {log_format}")
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
+        self.log_format = log_format
+        self.compression = compression  # None 或压缩算法名（zlib / zstd）
         
         # 当前比赛信息
         self.current_match_id = None
         self.current_match_dir = None
-        self.log_files = {}  # robot_id -> file handle
+        self.log_files = {}  # robot_id -> 日志文件路径（组提交）或 ChunkedLogWriter（压缩）
+        self.group_writer = GroupCommitWriter(fsync=fsync)
         
-        # 写入队列（robot_id, state）
+        # 写入队列（每个元素是一批 (接收时间 ms, [(robot_id, state 或已编码的记录), ...])）
         self.write_queue = queue.Queue(maxsize=10000)
         
         # 写入线程
@@ -41,18 +59,39 @@ class LogWriter:
         
     def write_state(self, robot_id, state):
         """写入状态（非阻塞）"""
+        self.write_states([(robot_id, state)])
+        
+    def write_states(self, batch):
+        """批量写入状态（非阻塞），batch 为 [(robot_id, state), ...]
+
+        整批作为一个队列元素入队，每批只付一次队列锁开销。
+        """
         # 检测比赛开始/结束
-        self._check_match_lifecycle(robot_id, state)
+        for robot_id, state in batch:
+            self._check_match_lifecycle(robot_id, state.decision.game_state)
         
-        # 放入写入队列
+        self._enqueue(batch)
+        
+    def write_encoded(self, batch):
+        """批量写入已编码的记录（非阻塞）
+
+        batch 为 [(robot_id, game_state, record), ...]，用于接收子进程已完成编码的情况。
+        record 在 jsonl 格式下是 JSON 行，在 raw 格式下是原始 Protobuf 字节。
+        """
+        for robot_id, game_state, record in batch:
+            self._check_match_lifecycle(robot_id, game_state)
+            
+        self._enqueue([(robot_id, record) for robot_id, _, record in batch])
+        
+    def _enqueue(self, batch):
+        """放入写入队列"""
         try:
-            self.write_queue.put_nowait((robot_id, state))
+            self.write_queue.put_nowait((int(time.time() * 1000), batch))
         except queue.Full:
-            print(f"[WARNING] Write queue full, dropping state for {robot_id}")
+            print(f"[WARNING] Write queue full, dropping {len(batch)} states")
             
-    def _check_match_lifecycle(self, robot_id, state):
+    def _check_match_lifecycle(self, robot_id, current_game_state):
         """检测比赛生命周期"""
-        current_game_state = state.decision.game_state
         last_game_state = self.last_game_states.get(robot_id)
         
         # 比赛开始：INITIAL -> READY
@@ -85,9 +124,12 @@ class LogWriter:
             
         print(f"[LogWriter] Match ended: {self.current_match_id}")
         
-        # 关闭所有日志文件
+        # 关闭所有日志文件（fsync 策略为 match_end 时在此落盘）
         for robot_id, f in self.log_files.items():
-            f.close()
+            if self.compression:
+                f.close()
+            else:
+                self.group_writer.close_file(f)
             print(f"[LogWriter] Closed log file for {robot_id}")
             
         # 生成元数据文件
@@ -107,6 +149,8 @@ class LogWriter:
             'match_id': self.current_match_id,
             'start_time': self.current_match_id,
             'robots': list(self.log_files.keys()),
+            'log_format': self.log_format,
+            'compression': self.compression,
         }
         
         metadata_file = self.current_match_dir / 'match_metadata.json'
@@ -117,38 +161,72 @@ class LogWriter:
         """写入循环（独立线程）"""
         while True:
             try:
-                robot_id, state = self.write_queue.get(timeout=1)
+                received_ms, batch = self.write_queue.get(timeout=1)
                 
                 # 确保比赛已开始
                 if self.current_match_id is None:
                     continue
                     
-                # 打开日志文件（如果尚未打开）
-                if robot_id not in self.log_files:
-                    log_file = self.current_match_dir / f"robot_{robot_id}.jsonl"
-                    self.log_files[robot_id] = open(log_file, 'a')
-                    print(f"[LogWriter] Opened log file: {log_file}")
-                    
-                # 转换为 JSON
-                state_dict = MessageToDict(state, preserving_proto_field_name=True)
-                
-                # 写入一行 JSON
-                json_line = json.dumps(state_dict, ensure_ascii=False)
-                self.log_files[robot_id].write(json_line + '\n')
+                for robot_id, record in batch:
+                    # 打开日志文件（如果尚未打开）
+                    if robot_id not in self.log_files:
+                        self.log_files[robot_id] = self._open_log_file(robot_id)
+                        
+                    if self.log_format == 'raw':
+                        payload = record if isinstance(record, bytes) else record.SerializeToString()
+                        if self.compression:
+                            self.log_files[robot_id].write_record(payload, received_ms)
+                        else:
+                            self.group_writer.write(self.log_files[robot_id], encode_record(payload, received_ms))
+                    else:
+                        # 转换为 JSON（接收子进程可能已完成编码）
+                        if isinstance(record, str):
+                            json_line = record
+                        else:
+                            state_dict = MessageToDict(record, preserving_proto_field_name=True)
+                            json_line = json.dumps(state_dict, ensure_ascii=False)
+                        
+                        # 写入一行 JSON
+                        if self.compression:
+                            self.log_files[robot_id].write_record(json_line.encode('utf-8'), received_ms)
+                        else:
+                            self.group_writer.write(self.log_files[robot_id], (json_line + '\n').encode('utf-8'))
                 
-                # 每 100 条记录 flush 一次
-                if self.write_queue.qsize() % 100 == 0:
-                    self.log_files[robot_id].flush()
+                # 未压缩日志由组提交写入器按时间/大小提交；压缩日志的块超时后落盘
+                if self.compression:
+                    self._flush_chunks()
                     
             except queue.Empty:
-                # 超时，flush 所有文件
-                for f in self.log_files.values():
-                    f.flush()
+                if self.compression:
+                    self._flush_chunks()
             except Exception as e:
                 print(f"[ERROR] Error in write loop: {e}")
                 
+    def _flush_chunks(self):
+        """已超时的压缩块落盘"""
+        for f in list(self.log_files.values()):
+            f.flush()
+                
+    def _open_log_file(self, robot_id):
+        """打开机器人的日志文件（raw 格式的新文件先写入文件头）
+
+        压缩日志返回 ChunkedLogWriter，否则返回交给组提交写入器的文件路径。
+        """
+        log_file = self.current_match_dir / f"robot_{robot_id}{LOG_FORMATS[self.log_format]}"
+        if self.compression:
+            log_file = log_file.with_name(log_file.name + CHUNKS_SUFFIX)
+            f = ChunkedLogWriter(log_file, codec=self.compression)
+        else:
+            f = str(log_file)
+            if self.log_format == 'raw' and not (log_file.exists() and log_file.stat().st_size > 0):
+                self.group_writer.write(f, MAGIC)
+        print(f"[LogWriter] Opened log file: {log_file}")
+        return f
+        
     def close_all(self):
         """关闭所有日志文件"""
-        for f in self.log_files.values():
-            f.close()
+        if self.compression:
+            for f in self.log_files.values():
+                f.close()
+        self.group_writer.close()
         self.log_files.clear()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+固定容量环形缓冲区
+
+功能：
+1. 预分配固定槽位，写满后覆盖最旧的元素（drop-oldest）
+2. O(1) 读取最新元素，O(k) 读取最近 k 个元素
+3. 单写者无锁：只有接收线程写入，其他线程只读
+
+线程模型：
+写入只修改一个槽位再递增计数器，两步在 GIL 下各自原子。读者先取计数器快照再按下标读取，
+因此 latest() 总是返回完整写入的元素；recent(k) 在写者正好覆盖最旧槽位时，
+最旧的一个元素可能已被更新的元素替换，对监控展示来说可以接受。
+"""
+
+
+class RingBuffer:
+    """单写者、多读者的固定容量环形缓冲区"""
+
+    __slots__ = ('capacity', '_items', '_count')
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self._count = 0  # 累计写入次数（只增不减）
+
+    def append(self, item):
+        """写入一个元素，返回是否覆盖了最旧的元素"""
+        count = self._count
+        self._items[count % self.capacity] = item
+        self._count = count + 1
+        return count >= self.capacity
+
+    def latest(self):
+        """最新的元素，缓冲区为空时返回 None"""
+        count = self._count
+        if count == 0:
+            return None
+        return self._items[(count - 1) % self.capacity]
+
+    def recent(self, k):
+        """最近 k 个元素，按时间从旧到新排列"""
+        count = self._count
+        k = min(k, count, self.capacity)
+        if k <= 0:
+            return []
+        start = (count - k) % self.capacity
+        end = start + k
+        if end <= self.capacity:
+            return self._items[start:end]
+        return self._items[start:] + self._items[:end - self.capacity]
+
+    def full(self):
+        """是否已写满（再写入将覆盖最旧的元素）"""
+        return self._count >= self.capacity
+
+    @property
+    def total_written(self):
+        """累计写入的元素数"""
+        return self._count
+
+    @property
+    def overwritten(self):
+        """累计被覆盖（丢弃）的元素数"""
+        return max(0, self._count - self.capacity)
+
+    def __len__(self):
+        return min(self._count, self.capacity)
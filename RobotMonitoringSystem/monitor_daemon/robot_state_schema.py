@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+机器人状态的 msgspec 类型定义（需要 msgspec）
+
+1. RobotState：与 robot_state.proto 一致，对应 JSONL 日志中的
+   MessageToDict(preserving_proto_field_name=True) 输出
+   （枚举为名称字符串，默认值字段被省略，uint64 编码为字符串，用 strict=False 解码）
+2. SimRobotState：RobotStateReporter_SimRobot 发送的扁平 JSON 消息
+
+用法见 fast_json.state_decoder()。
+"""
+
+from typing import List, Optional
+
+import msgspec
+
+
+class Orientation(msgspec.Struct):
+    roll: float = 0.0
+    pitch: float = 0.0
+    yaw: float = 0.0
+
+
+class SystemStatus(msgspec.Struct):
+    timestamp_ms: int = 0
+    frame_number: int = 0
+    cycle_time_ms: int = 0
+    battery_charge: float = 0.0
+    battery_current: float = 0.0
+    cpu_temperature: float = 0.0
+    orientation: Orientation = msgspec.field(default_factory=Orientation)
+    is_upright: bool = False
+    is_fallen: bool = False
+
+
+class BallInfo(msgspec.Struct):
+    visible: bool = False
+    pos_x: float = 0.0
+    pos_y: float = 0.0
+    last_seen_ms: int = 0
+    velocity_x: float = 0.0
+    velocity_y: float = 0.0
+
+
+class LocalizationInfo(msgspec.Struct):
+    pos_x: float = 0.0
+    pos_y: float = 0.0
+    rotation: float = 0.0
+    quality: str = 'POOR'
+
+
+class PerceptionStatus(msgspec.Struct):
+    ball: BallInfo = msgspec.field(default_factory=BallInfo)
+    localization: LocalizationInfo = msgspec.field(default_factory=LocalizationInfo)
+    teammates_seen: List[int] = []
+    opponents_count: int = 0
+
+
+class DecisionStatus(msgspec.Struct):
+    game_state: str = 'INITIAL'
+    team_number: int = 0
+    player_number: int = 0
+    is_penalized: bool = False
+    role: str = ''
+    active_behavior: str = ''
+    motion_type: str = 'STAND'
+    walk_speed_x: float = 0.0
+    walk_speed_y: float = 0.0
+    walk_speed_rot: float = 0.0
+
+
+class Event(msgspec.Struct):
+    type: str = 'BEHAVIOR_CHANGED'
+    description: str = ''
+    timestamp_ms: int = 0
+
+
+class RobotState(msgspec.Struct):
+    system: SystemStatus = msgspec.field(default_factory=SystemStatus)
+    perception: PerceptionStatus = msgspec.field(default_factory=PerceptionStatus)
+    decision: DecisionStatus = msgspec.field(default_factory=DecisionStatus)
+    events: List[Event] = []
+    robot_id: str = ''
+
+
+class SimRobotEvent(msgspec.Struct):
+    type: str
+    to: Optional[str] = None
+    # "from" 是 Python 关键字，用 field(name=...) 映射
+    from_: Optional[str] = msgspec.field(default=None, name='from')
+
+
+class SimRobotState(msgspec.Struct):
+    robot_id: str
+    timestamp: int = 0
+    battery: float = 0.0
+    temperature: float = 0.0
+    fallen: bool = False
+    behavior: str = ''
+    motion: str = ''
+    ball_visible: bool = False
+    ball_x: float = 0.0
+    ball_y: float = 0.0
+    pos_x: float = 0.0
+    pos_y: float = 0.0
+    rotation: float = 0.0
+    events: List[SimRobotEvent] = []
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+多进程分片接收
+
+功能：
+1. N 个接收进程通过 SO_REUSEPORT 绑定同一端口
+2. 每个进程按 robot_id 哈希负责一个分片
+3. 在子进程中完成 Protobuf 解析和 JSON 编码（绕开主进程 GIL）
+4. 通过管道（multiprocessing.Queue）把编码结果整批发回主进程
+
+分片说明：
+- 多播：内核把每个数据报复制给所有绑定的 socket，每个进程只保留自己分片的 robot_id。
+  分片前只扫描顶层字段读出 robot_id，完整解析只在所属进程中进行；
+  收包数和解析错误数也只由所属进程上报，避免按进程数重复计数
+- 单播（multicast_group 为空）：内核按源地址/端口哈希分发，同一机器人总是落到同一进程，
+  其他进程看不到该数据报，因此不做分片过滤，由内核哈希充当分片
+"""
+
+import json
+import multiprocessing
+import queue
+import select
+import socket
+import struct
+import zlib
+
+from google.protobuf.json_format import MessageToDict
+
+from batch_receiver import DatagramPool, DEFAULT_BATCH_SIZE, set_receive_buffer
+from telemetry_store import row_from_state
+
+# 主进程等待一批结果的超时（秒），保证 stop() 后能退出
+COLLECT_TIMEOUT = 1.0
+
+# RobotState.robot_id 的字段号（见 bhuman_integration/proto/robot_state.proto）
+ROBOT_ID_FIELD = 5
+
+
+def shard_of(robot_id, num_shards):
+    """robot_id 所属分片（跨进程稳定，不受 PYTHONHASHSEED 影响）"""
+    return zlib.crc32(robot_id.encode('utf-8')) % num_shards
+
+
+def _decode_varint(data, pos):
+    """从 data[pos:] 解码 varint，返回 (值, 新位置)，数据截断时抛出 IndexError"""
+    result = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("Varint too long")
+
+
+def peek_robot_id(data):
+    """只扫描 RobotState 的顶层字段读出 robot_id，不做完整解析
+
+    子消息按长度整体跳过。robot_id 缺失时返回空字符串，
+    数据损坏（或含不支持的 group 字段）时返回 None。
+    """
+    robot_id = ''
+    pos = 0
+    end = len(data)
+    try:
+        while pos < end:
+            key, pos = _decode_varint(data, pos)
+            wire_type = key & 0x07
+            if wire_type == 0:
+                _, pos = _decode_varint(data, pos)
+            elif wire_type == 1:
+                pos += 8
+            elif wire_type == 2:
+                length, pos = _decode_varint(data, pos)
+                if key >> 3 == ROBOT_ID_FIELD:
+                    # 与 Protobuf 一致：重复出现时以最后一次为准
+                    robot_id = bytes(data[pos:pos + length]).decode('utf-8')
+                pos += length
+            elif wire_type == 5:
+                pos += 4
+            else:
+                return None
+    except (IndexError, ValueError):
+        return None
+    return robot_id if pos == end else None
+
+
+def owner_shard(data, num_shards):
+    """数据报所属分片：按 robot_id 哈希，读不出 robot_id 的数据报归 0 号分片
+
+    损坏的数据报因此只在 0 号分片完整解析一次并计入解析错误。
+    """
+    robot_id = peek_robot_id(data)
+    if not robot_id:
+        return 0
+    return shard_of(robot_id, num_shards)
+
+
+def _open_socket(port, multicast_group, rcvbuf):
+    """创建带 SO_REUSEPORT 的 UDP socket"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    set_receive_buffer(sock, rcvbuf)
+    sock.bind(('', port))
+
+    if multicast_group:
+        mreq = struct.pack('4sl', socket.inet_aton(multicast_group), socket.INADDR_ANY)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+
+    sock.setblocking(False)
+    return sock
+
+
+def receiver_worker(index, num_workers, port, multicast_group, rcvbuf, batch_size,
+                    encode_log_lines, out_queue, stop_event):
+    """接收子进程入口
+
+    每批向 out_queue 发送 (index, received, parse_errors, batch)，
+    received 和 parse_errors 只统计本分片负责的数据报；
+    batch 为 [(robot_id, game_state, raw_bytes, log_line, ws_message, telemetry_row), ...]。
+    encode_log_lines 为 False（raw 日志格式）时 log_line 为 None。
+    """
+    from robot_state_pb2 import RobotState
+
+    sock = _open_socket(port, multicast_group, rcvbuf)
+    pool = DatagramPool(batch_size=batch_size)
+    filter_shards = bool(multicast_group) and num_workers > 1
+
+    print(f"[ReceiverWorker {index}] Listening on port {port} "
+          f"(shard {index}/{num_workers}{', filtered' if filter_shards else ''})")
+
+    while not stop_event.is_set():
+        try:
+            readable, _, _ = select.select([sock], [], [], COLLECT_TIMEOUT)
+            if not readable:
+                continue
+
+            datagrams = pool.drain(sock)
+            received = 0
+            parse_errors = 0
+            batch = []
+            for data, addr in datagrams:
+                if filter_shards and owner_shard(data, num_workers) != index:
+                    continue
+                received += 1
+
+                state = RobotState()
+                try:
+                    state.ParseFromString(data)
+                except Exception:
+                    parse_errors += 1
+                    continue
+
+                robot_id = state.robot_id
+                if not robot_id:
+                    continue
+
+                state_dict = MessageToDict(state, preserving_proto_field_name=True)
+                log_line = json.dumps(state_dict, ensure_ascii=False) if encode_log_lines else None
+                ws_message = json.dumps({
+                    'type': 'robot_state',
+                    'robot_id': robot_id,
+                    'data': state_dict
+                })
+                batch.append((robot_id, state.decision.game_state, bytes(data),
+                              log_line, ws_message, row_from_state(state)))
+
+            if received:
+                out_queue.put((index, received, parse_errors, batch))
+
+        except Exception as e:
+            print(f"[ERROR] [ReceiverWorker {index}] {e}")
+
+    sock.close()
+
+
+class ShardedReceiver:
+    """管理 N 个接收子进程，并在主进程中收集结果"""
+
+    def __init__(self, num_workers, port, multicast_group, rcvbuf=0,
+                 batch_size=DEFAULT_BATCH_SIZE, encode_log_lines=True):
+        self.num_workers = num_workers
+        self.port = port
+        self.multicast_group = multicast_group
+        self.rcvbuf = rcvbuf
+        self.batch_size = batch_size
+        self.encode_log_lines = encode_log_lines
+
+        self.out_queue = multiprocessing.Queue(maxsize=10000)
+        self.stop_event = multiprocessing.Event()
+        self.processes = []
+
+    def start(self):
+        """启动所有接收子进程"""
+        for index in range(self.num_workers):
+            proc = multiprocessing.Process(
+                target=receiver_worker,
+                args=(index, self.num_workers, self.port, self.multicast_group,
+                      self.rcvbuf, self.batch_size, self.encode_log_lines,
+                      self.out_queue, self.stop_event),
+                name=f"ReceiverWorker-{index}",
+                daemon=True,
+            )
+            proc.start()
+            self.processes.append(proc)
+
+    def get_batch(self):
+        """取下一批结果，超时返回 None"""
+        try:
+            return self.out_queue.get(timeout=COLLECT_TIMEOUT)
+        except queue.Empty:
+            return None
+
+    def alive_workers(self):
+        """存活的子进程数"""
+        return sum(1 for proc in self.processes if proc.is_alive())
+
+    def stop(self):
+        """停止所有接收子进程"""
+        self.stop_event.set()
+        for proc in self.processes:
+            proc.join(timeout=COLLECT_TIMEOUT * 2)
+            if proc.is_alive():
+                proc.terminate()
+        self.processes.clear()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+快照增量编码（web_monitor 广播协议）
+
+消息类型：
+1. snapshot（关键帧）：所有机器人的完整状态，连接时、客户端请求 resync 时
+   以及每 KEYFRAME_INTERVAL 秒发送一次
+2. delta（增量帧）：与上一次广播相比变化的字段，没有变化时不发送
+
+每条消息带递增的 seq：delta 的 seq 必须等于客户端上一条消息的 seq + 1，
+否则客户端丢弃它并发送 {"type": "resync"} 请求新的关键帧。
+
+delta 格式：
+    {"type": "delta", "seq": n, "timestamp": t,
+     "changed": {robot_id: {字段: 新值, ...}},   # 新机器人包含全部字段
+     "unset": {robot_id: [字段, ...]},           # 可选，被删除的字段
+     "removed": [robot_id, ...]}                 # 可选，被删除的机器人
+
+每个广播周期只编码一次（UTF-8 bytes），所有客户端共享同一份数据。
+"""
+
+import time
+
+from fast_json import dumps_bytes
+
+KEYFRAME_INTERVAL = 5.0  # 秒
+
+_MISSING = object()
+
+
+class SnapshotEncoder:
+    """维护上一次广播的状态，把新快照编码为关键帧或增量帧"""
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self.robots = {}  # robot_id -> 上一次广播的状态
+        self.last_keyframe = None
+        self._keyframe_cache = None  # (seq, message)
+
+        self.keyframes = 0
+        self.deltas = 0
+        self.bytes_encoded = 0
+
+    def encode(self, robots, now=None):
+        """编码一个广播周期的快照 {robot_id: 状态字典}，无变化时返回 None"""
+        if now is None:
+            now = time.time()
+
+        if self.last_keyframe is None or now - self.last_keyframe >= self.keyframe_interval:
+            self.robots = {robot_id: dict(state) for robot_id, state in robots.items()}
+            self.seq += 1
+            self.last_keyframe = now
+            self.keyframes += 1
+            message = self.keyframe(now)
+            self.bytes_encoded += len(message)
+            return message
+
+        changed = {}
+        unset = {}
+        for robot_id, state in robots.items():
+            previous = self.robots.get(robot_id)
+            if previous is None:
+                changed[robot_id] = dict(state)
+                continue
+            fields = {key: value for key, value in state.items()
+                      if previous.get(key, _MISSING) != value}
+            if fields:
+                changed[robot_id] = fields
+            gone = [key for key in previous if key not in state]
+            if gone:
+                unset[robot_id] = gone
+        removed = [robot_id for robot_id in self.robots if robot_id not in robots]
+
+        if not changed and not unset and not removed:
+            return None
+
+        for robot_id, fields in changed.items():
+            self.robots.setdefault(robot_id, {}).update(fields)
+        for robot_id, gone in unset.items():
+            for key in gone:
+                del self.robots[robot_id][key]
+        for robot_id in removed:
+            del self.robots[robot_id]
+
+        self.seq += 1
+        message = {"type": "delta", "seq": self.seq, "timestamp": now, "changed": changed}
+        if unset:
+            message["unset"] = unset
+        if removed:
+            message["removed"] = removed
+        message = dumps_bytes(message)
+        self.deltas += 1
+        self.bytes_encoded += len(message)
+        return message
+
+    def keyframe(self, now=None):
+        """当前 seq 对应的完整快照（同一 seq 只编码一次）"""
+        if self._keyframe_cache is not None and self._keyframe_cache[0] == self.seq:
+            return self._keyframe_cache[1]
+        message = dumps_bytes({
+            "type": "snapshot",
+            "keyframe": True,
+            "seq": self.seq,
+            "timestamp": now if now is not None else time.time(),
+            "robots": [{"robot_id": robot_id, **state} for robot_id, state in self.robots.items()]
+        })
+        self._keyframe_cache = (self.seq, message)
+        return message
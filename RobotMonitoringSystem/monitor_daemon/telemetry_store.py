@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+列式实时遥测存储
+
+功能：
+1. 每个机器人一组预分配、按需倍增的 NumPy 列（追加均摊 O(1)）
+2. 按接收时间做向量化区间查询（如"机器人 X 最近 60 秒的电量"）
+3. 同时支持 Protobuf RobotState（daemon.py）和 SimRobot JSON（web_monitor.py），
+   JSON 消息没有的字段（姿态角、定位质量、比赛状态）不建列
+
+区间查询基于接收时间列 received_at（单调递增，可二分查找）；
+机器人上报的 timestamp_ms 作为普通数据列保存，重启后可能回绕。
+"""
+
+import threading
+import time
+
+import numpy as np
+
+INITIAL_CAPACITY = 1024
+DEFAULT_MAX_FRAMES = 60 * 60 * 60  # 60 Hz 下约一小时
+
+# 列名 -> dtype（缺失值：浮点为 NaN，整数为 -1）
+COLUMNS = {
+    'received_at': np.float64,
+    'timestamp_ms': np.int64,
+    'battery': np.float32,
+    'roll': np.float32,
+    'pitch': np.float32,
+    'yaw': np.float32,
+    'ball_visible': np.bool_,
+    'ball_x': np.float32,
+    'ball_y': np.float32,
+    'pose_x': np.float32,
+    'pose_y': np.float32,
+    'pose_rotation': np.float32,
+    'localization_quality': np.int8,
+    'game_state': np.int8,
+    'motion_type': np.int8,
+}
+
+# SimRobot JSON 消息提供的列（row_from_json 填充的字段）
+JSON_COLUMNS = {
+    name: dtype for name, dtype in COLUMNS.items()
+    if name not in ('roll', 'pitch', 'yaw', 'localization_quality', 'game_state')
+}
+
+# 与 robot_state.proto 中 DecisionStatus.MotionType 一致
+MOTION_TYPES = ['stand', 'walk', 'kick', 'get_up', 'special']
+
+NAN = float('nan')
+
+
+def row_from_state(state):
+    """从 Protobuf RobotState 提取一行"""
+    system = state.system
+    ball = state.perception.ball
+    loc = state.perception.localization
+    return {
+        'timestamp_ms': system.timestamp_ms,
+        'battery': system.battery_charge,
+        'roll': system.orientation.roll,
+        'pitch': system.orientation.pitch,
+        'yaw': system.orientation.yaw,
+        'ball_visible': ball.visible,
+        'ball_x': ball.pos_x,
+        'ball_y': ball.pos_y,
+        'pose_x': loc.pos_x,
+        'pose_y': loc.pos_y,
+        'pose_rotation': loc.rotation,
+        'localization_quality': loc.quality,
+        'game_state': state.decision.game_state,
+        'motion_type': state.decision.motion_type,
+    }
+
+
+# 列名 -> SimRobot JSON 消息中的数值字段
+JSON_NUMBER_FIELDS = {
+    'timestamp_ms': 'timestamp',
+    'battery': 'battery',
+    'ball_x': 'ball_x',
+    'ball_y': 'ball_y',
+    'pose_x': 'pos_x',
+    'pose_y': 'pos_y',
+    'pose_rotation': 'rotation',
+}
+
+
+def row_from_json(msg):
+    """从 SimRobot JSON 消息（RobotStateReporter_SimRobot）提取一行
+
+    缺失、为 null 或类型不对的字段不放入行中，追加时填该列的缺失值。
+    """
+    row = {}
+    for column, field in JSON_NUMBER_FIELDS.items():
+        value = msg.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            row[column] = value
+    ball_visible = msg.get('ball_visible')
+    if isinstance(ball_visible, bool):
+        row['ball_visible'] = ball_visible
+    motion = msg.get('motion')
+    if motion in MOTION_TYPES:
+        row['motion_type'] = MOTION_TYPES.index(motion)
+    return row
+
+
+def column_to_list(column):
+    """转换为可 JSON 序列化的列表，浮点列中的缺失值（NaN）转为 None"""
+    values = column.tolist()
+    if np.issubdtype(column.dtype, np.floating):
+        for i in np.flatnonzero(np.isnan(column)).tolist():
+            values[i] = None
+    return values
+
+
+def _missing(dtype):
+    if np.issubdtype(dtype, np.floating):
+        return NAN
+    if dtype == np.bool_:
+        return False
+    return -1
+
+
+class RobotTelemetry:
+    """单个机器人的列式时间序列"""
+
+    def __init__(self, capacity=INITIAL_CAPACITY, max_frames=DEFAULT_MAX_FRAMES, columns=COLUMNS):
+        self.max_frames = max_frames
+        self.size = 0
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in columns.items()}
+        self.defaults = {name: _missing(dtype) for name, dtype in columns.items()}
+        self.lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return len(self.columns['received_at'])
+
+    def append(self, row, received_at=None):
+        """追加一行（缺失的列填默认值）"""
+        if received_at is None:
+            received_at = time.time()
+        with self.lock:
+            if self.size == self.capacity:
+                self._make_room()
+            i = self.size
+            self.columns['received_at'][i] = received_at
+            for name, column in self.columns.items():
+                if name != 'received_at':
+                    column[i] = row.get(name, self.defaults[name])
+            self.size = i + 1
+
+    def _make_room(self):
+        """倍增容量；超过 max_frames 时丢弃最旧的一半"""
+        if self.max_frames and self.size >= self.max_frames:
+            keep = self.size // 2
+            for column in self.columns.values():
+                column[:keep] = column[self.size - keep:self.size]
+            self.size = keep
+            return
+        new_capacity = self.capacity * 2
+        if self.max_frames:
+            new_capacity = min(new_capacity, self.max_frames)
+        for name, column in self.columns.items():
+            grown = np.empty(new_capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def query(self, fields, since=None, until=None):
+        """按接收时间区间 [since, until) 查询，返回 {列名: 数组副本}"""
+        with self.lock:
+            received_at = self.columns['received_at'][:self.size]
+            lo = 0 if since is None else int(np.searchsorted(received_at, since, side='left'))
+            hi = self.size if until is None else int(np.searchsorted(received_at, until, side='left'))
+            return {name: self.columns[name][lo:hi].copy() for name in fields}
+
+    def nbytes(self):
+        """已分配的内存（字节）"""
+        return sum(column.nbytes for column in self.columns.values())
+
+
+class TelemetryStore:
+    """所有机器人的列式遥测存储
+
+    columns 为要保存的列（列名 -> dtype），默认为 COLUMNS 全部列。
+    """
+
+    def __init__(self, max_frames=DEFAULT_MAX_FRAMES, columns=COLUMNS):
+        self.max_frames = max_frames
+        self.columns = columns
+        self.robots = {}
+        self.lock = threading.Lock()
+
+    def append(self, robot_id, row, received_at=None):
+        """追加一个机器人的一行数据"""
+        telemetry = self.robots.get(robot_id)
+        if telemetry is None:
+            with self.lock:
+                telemetry = self.robots.setdefault(
+                    robot_id, RobotTelemetry(max_frames=self.max_frames, columns=self.columns))
+        telemetry.append(row, received_at)
+
+    def query(self, robot_id, fields, since=None, until=None):
+        """查询一个机器人的若干列，未知机器人返回 None"""
+        unknown = [name for name in fields if name not in self.columns]
+        if unknown:
+            raise KeyError(f"Unknown telemetry fields: {', '.join(unknown)}")
+        telemetry = self.robots.get(robot_id)
+        if telemetry is None:
+            return None
+        return telemetry.query(fields, since, until)
+
+    def last(self, robot_id, fields, seconds):
+        """查询一个机器人最近 seconds 秒的若干列"""
+        return self.query(robot_id, fields, since=time.time() - seconds)
+
+    def robot_ids(self):
+        return list(self.robots.keys())
+
+    def nbytes(self):
+        return sum(telemetry.nbytes() for telemetry in list(self.robots.values()))
@@ -2,16 +2,16 @@
 """
 Web Monitor Daemon - 稳定版
 核心改进：
-1. 节流推送（2 Hz）
-2. 批量聚合
+1. 节流推送（10 Hz）
+2. 批量聚合 + 增量编码（关键帧 + 字段级 delta）
 3. 心跳保活
 4. 异常隔离
 """
 
 import asyncio
-import json
-import socket
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Set
@@ -20,24 +20,46 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
-import threading
+
+from batch_receiver import read_udp_drops, set_receive_buffer
+from chunked_log import CHUNKS_SUFFIX, ChunkedLogReader, ChunkedLogWriter
+from fast_json import BACKEND as JSON_BACKEND, DecodeError, dumps_bytes, loads
+from group_commit import GroupCommitWriter
+from log_tail import read_tail_lines
+from snapshot_delta import SnapshotEncoder
+from telemetry_store import JSON_COLUMNS, TelemetryStore, column_to_list, row_from_json
 
 # ============ 配置 ============
 UDP_PORT = 10020
 HTTP_PORT = 8080
 LOG_DIR = Path("RobotMonitoringSystem/monitor_daemon/logs")
 ROBOT_TIMEOUT = 5.0
+LOG_COMPRESSION = None     # None = 纯 JSONL；'zlib' / 'zstd' = 分块压缩 + 帧索引
+LOG_FSYNC = 'never'        # 'never' / 'batch'（每次组提交后）/ 'match_end'（关闭文件时）
+UDP_RCVBUF = 4 * 1024 * 1024  # 内核接收缓冲区（0 = 系统默认）
+LOG_QUEUE_SIZE = 10000     # 写日志队列上限（满时丢弃并计入 log_drops）
+LOG_BATCH_SIZE = 1000      # 每批最多写入的日志条数
+LATENCY_WINDOW = 1000      # 延迟统计的滑动窗口（样本数）
 
 # 稳定性配置
-BROADCAST_INTERVAL = 0.5  # 500ms = 2 Hz
+BROADCAST_INTERVAL = 0.1  # 100ms = 10 Hz（增量帧只携带变化的字段）
+KEYFRAME_INTERVAL = 5.0    # 每 5 秒广播一次完整关键帧
 HEARTBEAT_INTERVAL = 10.0  # 10 秒心跳
 CLIENT_TIMEOUT = 30.0      # 30 秒无响应断开
-MAX_SEND_QUEUE = 10        # 每个客户端最多缓存 10 条消息
+MAX_SEND_QUEUE = 10        # 每个客户端最多缓存 10 条控制消息（状态消息只保留最新一条）
+LOG_TAIL_SIZE = 200        # 每个机器人在内存中保留的最近日志条数
 
 # ============ 全局状态 ============
 robot_states: Dict[str, dict] = {}
+telemetry = TelemetryStore(columns=JSON_COLUMNS)  # 列式时间序列（robot_states 只保留最新一帧）
 current_match_id = None
-log_files = {}
+log_files = {}                      # robot_id -> 日志路径（组提交）或 ChunkedLogWriter，只在 log_executor 线程中使用
+group_writer = GroupCommitWriter(fsync=LOG_FSYNC)
+log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-writer")
+written_counts: Dict[str, int] = {}  # 每个机器人已写入文件的条数（log_executor 线程更新）
+packet_counts: Dict[str, int] = {}  # 当前比赛每个机器人已写入的日志条数
+log_tails: Dict[str, deque] = {}    # 当前比赛每个机器人最近 LOG_TAIL_SIZE 条日志
+snapshot_encoder = SnapshotEncoder(KEYFRAME_INTERVAL)
 
 
 # ============ ActiveMatch 管理 ============
@@ -95,57 +117,99 @@ active_match = ActiveMatch()
 
 
 class WebSocketClient:
-    """WebSocket 客户端包装器（带缓冲和超时）"""
+    """WebSocket 客户端包装器（latest-wins 发送槽 + 控制消息队列）
+    
+    状态消息（关键帧/增量帧）只保留最新一条：慢客户端直接跳过过期的快照，
+    不会积压，也不会阻塞广播。被跳过的增量帧由关键帧补齐（见 offer）。
+    """
     def __init__(self, websocket: WebSocket):
         self.websocket = websocket
-        self.send_queue = asyncio.Queue(maxsize=MAX_SEND_QUEUE)
+        self.pending = None  # (bytes, 入槽时间)，尚未发送的最新状态消息
+        self.control = deque(maxlen=MAX_SEND_QUEUE)  # ping 等控制消息
+        self.wakeup = asyncio.Event()
         self.last_pong = time.time()
         self.active = True
         self.error_count = 0  # 新增：错误计数
         self.max_errors = 3   # 新增：最大允许错误次数
         
-    async def send_safe(self, message: str):
-        """安全发送（改进版 - 避免竞态条件）"""
-        try:
-            # 使用 put 而不是 put_nowait，带超时
-            await asyncio.wait_for(
-                self.send_queue.put(message),
-                timeout=0.1
-            )
-        except asyncio.TimeoutError:
-            # 队列满，丢弃最旧的消息
+        # 延迟统计
+        self.name = f"{websocket.client.host}:{websocket.client.port}" if websocket.client else "unknown"
+        self.sent = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+    
+    def offer(self, data: bytes, resync=None):
+        """放入状态消息（非阻塞，latest-wins）
+        
+        槽中已有未发送的消息时将其丢弃；如果提供了 resync，改为放入 resync() 返回的关键帧，
+        保证客户端收到的增量帧序号连续。
+        """
+        if self.pending is not None:
+            self.dropped += 1
+            if resync is not None:
+                data = resync()
+        self.pending = (data, time.monotonic())
+        self.wakeup.set()
+    
+    def send_control(self, data: bytes):
+        """放入控制消息（非阻塞，队列满时丢弃最旧的）"""
+        self.control.append(data)
+        self.wakeup.set()
+    
+    def lag(self):
+        """槽中消息已等待的时间（秒），没有待发送消息时为 0"""
+        pending = self.pending
+        return time.monotonic() - pending[1] if pending is not None else 0.0
+    
+    def stats(self):
+        return {
+            "client": self.name,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "bytes_sent": self.bytes_sent,
+            "lag_ms": round(self.lag() * 1000, 1),
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "avg_lag_ms": round(self.total_lag / self.sent * 1000, 1) if self.sent else 0.0,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+        }
+    
+    async def _send(self, data: bytes):
+        """发送一条消息（带重试）"""
+        retry = 0
+        while retry < 3:
             try:
-                self.send_queue.get_nowait()
-                await asyncio.wait_for(
-                    self.send_queue.put(message),
-                    timeout=0.1
-                )
-            except:
-                pass  # 仍然失败，放弃这条消息
-        except Exception as e:
-            print(f"⚠️  send_safe error: {e}")
+                await self.websocket.send_bytes(data)
+                self.error_count = 0  # 成功后重置错误计数
+                self.bytes_sent += len(data)
+                return
+            except Exception:
+                retry += 1
+                if retry >= 3:
+                    raise
+                await asyncio.sleep(0.1 * retry)  # 指数退避
     
     async def sender_loop(self):
-        """发送循环（带重试机制）"""
+        """发送循环：先发控制消息，再发槽中最新的状态消息"""
         while self.active and self.error_count < self.max_errors:
             try:
-                message = await asyncio.wait_for(
-                    self.send_queue.get(), 
-                    timeout=1.0
-                )
+                await asyncio.wait_for(self.wakeup.wait(), timeout=1.0)
+                self.wakeup.clear()
+                
+                while self.control:
+                    await self._send(self.control.popleft())
                 
-                # 发送消息（带重试）
-                retry = 0
-                while retry < 3:
-                    try:
-                        await self.websocket.send_text(message)
-                        self.error_count = 0  # 成功后重置错误计数
-                        break
-                    except Exception as e:
-                        retry += 1
-                        if retry >= 3:
-                            raise
-                        await asyncio.sleep(0.1 * retry)  # 指数退避
+                if self.pending is not None:
+                    data, queued_at = self.pending
+                    self.pending = None
+                    await self._send(data)
+                    lag = time.monotonic() - queued_at
+                    self.sent += 1
+                    self.last_lag = lag
+                    self.total_lag += lag
+                    self.max_lag = max(self.max_lag, lag)
                 
             except asyncio.TimeoutError:
                 # 正常超时，继续
@@ -164,83 +228,135 @@ class WebSocketClient:
 
 
 class ClientManager:
-    """客户端管理器"""
+    """客户端管理器
+    
+    所有操作都是同步的（不 await），在事件循环中天然互斥，无需加锁；
+    广播只把同一份 bytes 放进每个客户端的发送槽，实际发送由各客户端的 sender_loop 完成。
+    """
     def __init__(self):
         self.clients: Set[WebSocketClient] = set()
-        self.lock = asyncio.Lock()
-    
-    async def add(self, client: WebSocketClient):
-        async with self.lock:
-            self.clients.add(client)
-            print(f"🔌 Client connected (total: {len(self.clients)})")
-    
-    async def remove(self, client: WebSocketClient):
-        async with self.lock:
-            self.clients.discard(client)
-            client.active = False
-            print(f"🔌 Client disconnected (total: {len(self.clients)})")
-    
-    async def broadcast(self, message: str):
-        """广播消息（非阻塞）"""
-        async with self.lock:
-            dead_clients = []
-            for client in self.clients:
-                if not client.active:
-                    dead_clients.append(client)
-                else:
-                    await client.send_safe(message)
-            
-            # 清理死连接
-            for client in dead_clients:
+    
+    def add(self, client: WebSocketClient):
+        self.clients.add(client)
+        print(f"🔌 Client connected (total: {len(self.clients)})")
+    
+    def remove(self, client: WebSocketClient):
+        self.clients.discard(client)
+        client.active = False
+        client.wakeup.set()
+        print(f"🔌 Client disconnected (total: {len(self.clients)})")
+    
+    def broadcast(self, data: bytes, resync=None):
+        """广播状态消息（非阻塞，与客户端数量和速度无关）"""
+        for client in list(self.clients):
+            if client.active:
+                client.offer(data, resync)
+            else:
+                # 清理死连接
                 self.clients.discard(client)
     
+    def stats(self):
+        """每个客户端的发送统计"""
+        return [client.stats() for client in list(self.clients)]
+    
     async def heartbeat_loop(self):
         """心跳循环"""
         while True:
             await asyncio.sleep(HEARTBEAT_INTERVAL)
             
-            ping_msg = json.dumps({"type": "ping", "timestamp": time.time()})
-            await self.broadcast(ping_msg)
+            ping_msg = dumps_bytes({"type": "ping", "timestamp": time.time()})
+            for client in list(self.clients):
+                client.send_control(ping_msg)
             
             # 检查超时客户端
             now = time.time()
-            async with self.lock:
-                timeout_clients = [
-                    c for c in self.clients 
-                    if now - c.last_pong > CLIENT_TIMEOUT
-                ]
-                for client in timeout_clients:
-                    print(f"⏱️  Client timeout, removing")
-                    client.active = False
-                    self.clients.discard(client)
+            timeout_clients = [
+                c for c in self.clients 
+                if now - c.last_pong > CLIENT_TIMEOUT
+            ]
+            for client in timeout_clients:
+                print(f"⏱️  Client timeout, removing")
+                client.active = False
+                self.clients.discard(client)
 
 
 client_manager = ClientManager()
 
 
 # ============ UDP 接收器 ============
-class UDPReceiver:
-    def __init__(self):
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.bind(('0.0.0.0', UDP_PORT))
-        self.running = True
-        
-    def start(self):
-        thread = threading.Thread(target=self.run, daemon=True)
-        thread.start()
+class ReceiverMetrics:
+    """接收与写日志统计（只在事件循环中更新，无需加锁）"""
+    def __init__(self, window=LATENCY_WINDOW):
+        self.packets_received = 0
+        self.parse_errors = 0
+        self.log_drops = 0          # 写日志队列满而丢弃的条数
+        self.log_written = 0
+        self.log_batches = 0
+        self.max_queue_depth = 0
+        self.receive_latency = deque(maxlen=window)  # 单包处理耗时（秒）
+        self.log_latency = deque(maxlen=window)      # 入队到写入完成（秒）
+    
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return {"avg_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(samples)
+        return {
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+    
+    def to_dict(self, queue_depth):
+        kernel_drops, rx_queue = read_udp_drops(UDP_PORT)
+        return {
+            "packets_received": self.packets_received,
+            "parse_errors": self.parse_errors,
+            "kernel_drops": kernel_drops,
+            "rx_queue_bytes": rx_queue,
+            "receive_latency": self._summary(self.receive_latency),
+            "log_queue_depth": queue_depth,
+            "log_queue_max_depth": self.max_queue_depth,
+            "log_queue_capacity": LOG_QUEUE_SIZE,
+            "log_drops": self.log_drops,
+            "log_written": self.log_written,
+            "log_batches": self.log_batches,
+            "log_latency": self._summary(self.log_latency),
+        }
+
+
+metrics = ReceiverMetrics()
+log_queue: asyncio.Queue = None  # 在 lifespan 中创建（需要运行中的事件循环）
+
+
+class UDPReceiver(asyncio.DatagramProtocol):
+    """运行在 uvicorn 事件循环上的 UDP 接收器
+    
+    状态表、遥测和比赛信息都只在事件循环中修改，与 API 处理函数之间没有跨线程竞争；
+    磁盘写入交给 log_writer_worker 批量完成。
+    """
+    def connection_made(self, transport):
+        self.transport = transport
+        sock = transport.get_extra_info('socket')
+        if UDP_RCVBUF:
+            set_receive_buffer(sock, UDP_RCVBUF)
         print(f"✅ UDP Receiver started on port {UDP_PORT}")
-        
-    def run(self):
-        while self.running:
-            try:
-                data, addr = self.sock.recvfrom(4096)
-                self.handle_packet(data.decode('utf-8'))
-            except Exception as e:
-                print(f"❌ UDP Error: {e}")
-                
-    def handle_packet(self, data: str):
+    
+    def datagram_received(self, data, addr):
+        start = time.perf_counter()
         try:
-            msg = json.loads(data)
+            self.handle_packet(data)
+        except Exception as e:
+            print(f"❌ UDP Error: {e}")
+        metrics.receive_latency.append(time.perf_counter() - start)
+    
+    def error_received(self, exc):
+        print(f"❌ UDP Error: {exc}")
+    
+    def handle_packet(self, data: bytes):
+        metrics.packets_received += 1
+        try:
+            msg = loads(data)
             robot_id = msg.get('robot_id')
             
             if not robot_id:
@@ -249,22 +365,27 @@ class UDPReceiver:
                 
             # 更新状态表（Layer 1）
             msg['last_update'] = time.time()
+            if robot_id not in robot_states:
+                print(f"📦 Received from {robot_id}, total robots: {len(robot_states) + 1}")
             robot_states[robot_id] = msg
             
-            # 调试输出
-            if len(robot_states) <= 10:
-                print(f"📦 Received from {robot_id}, total robots: {len(robot_states)}")
+            # 写入日志（入队，由 log_writer_worker 批量写盘）
+            record_log(robot_id, msg)
             
-            # 写入日志（异步，不阻塞）
-            write_log(robot_id, msg)
+            # 遥测列只是辅助存储，数值放不进列（如超出 int64）时只丢弃这一行
+            try:
+                telemetry.append(robot_id, row_from_json(msg), msg['last_update'])
+            except (TypeError, ValueError, OverflowError) as e:
+                print(f"⚠️  Telemetry row dropped for {robot_id}: {e}")
             
-        except json.JSONDecodeError as e:
+        except DecodeError as e:
+            metrics.parse_errors += 1
             print(f"❌ JSON decode error: {e}, data: {data[:100]}")
 
 
-def write_log(robot_id: str, data: dict):
-    """写入日志文件"""
-    global current_match_id, log_files, active_match
+def record_log(robot_id: str, data: dict):
+    """登记一条日志：更新比赛信息、计数和尾部缓存，并放入写日志队列"""
+    global current_match_id, active_match
     
     if current_match_id is None:
         current_match_id = f"match_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -277,46 +398,96 @@ def write_log(robot_id: str, data: dict):
     # 添加机器人到 ActiveMatch
     active_match.add_robot(robot_id)
     
-    if robot_id not in log_files:
-        log_path = LOG_DIR / current_match_id / f"robot_{robot_id}.jsonl"
-        log_files[robot_id] = open(log_path, 'a')
+    try:
+        log_queue.put_nowait((robot_id, data, time.perf_counter()))
+    except asyncio.QueueFull:
+        metrics.log_drops += 1
+        return
+    metrics.max_queue_depth = max(metrics.max_queue_depth, log_queue.qsize())
     
-    log_files[robot_id].write(json.dumps(data) + '\n')
-    log_files[robot_id].flush()
+    if robot_id not in log_tails:
+        packet_counts[robot_id] = 0
+        log_tails[robot_id] = deque(maxlen=LOG_TAIL_SIZE)
+    
+    # 计数和尾部缓存（与写入文件的记录一致）供 current_match API 直接从内存读取
+    log_tails[robot_id].append(data)
+    packet_counts[robot_id] += 1
+
+
+def write_log_batch(batch):
+    """编码一批日志并交给写入器（在线程池中执行）
+    
+    未压缩日志交给组提交写入器，按 50 ms / 256 KB 合并提交；压缩日志块满或超时后落盘。
+    """
+    touched = set()
+    for robot_id, data, _ in batch:
+        if robot_id not in log_files:
+            log_path = LOG_DIR / current_match_id / f"robot_{robot_id}.jsonl"
+            if LOG_COMPRESSION:
+                log_files[robot_id] = ChunkedLogWriter(str(log_path) + CHUNKS_SUFFIX, codec=LOG_COMPRESSION)
+            else:
+                log_files[robot_id] = str(log_path)
+        
+        line = dumps_bytes(data)
+        if LOG_COMPRESSION:
+            log_files[robot_id].write_record(line, int(time.time() * 1000))
+            touched.add(robot_id)
+        else:
+            group_writer.write(log_files[robot_id], line + b'\n')
+        written_counts[robot_id] = written_counts.get(robot_id, 0) + 1
+    
+    for robot_id in touched:
+        log_files[robot_id].flush()
+
+
+async def log_writer_worker():
+    """批量写日志：取出队列中已有的全部记录，交给线程池一次写完"""
+    loop = asyncio.get_running_loop()
+    print("✅ Log writer started")
+    
+    while True:
+        batch = [await log_queue.get()]
+        while len(batch) < LOG_BATCH_SIZE and not log_queue.empty():
+            batch.append(log_queue.get_nowait())
+        
+        try:
+            await loop.run_in_executor(log_executor, write_log_batch, batch)
+        except Exception as e:
+            print(f"❌ Log write error: {e}")
+        
+        now = time.perf_counter()
+        for _, _, queued_at in batch:
+            metrics.log_latency.append(now - queued_at)
+        metrics.log_written += len(batch)
+        metrics.log_batches += 1
 
 
 # ============ 广播任务（Layer 2 + 3）============
 async def broadcast_worker():
-    """定期广播机器人状态快照（2 Hz）"""
-    print("✅ Broadcast worker started (2 Hz)")
+    """定期广播机器人状态（关键帧 + 增量帧）"""
+    print(f"✅ Broadcast worker started ({1/BROADCAST_INTERVAL:.0f} Hz)")
     
     while True:
         try:
             await asyncio.sleep(BROADCAST_INTERVAL)
             
             # 收集所有机器人最新状态
-            snapshot = []
+            snapshot = {}
             now = time.time()
             
             for robot_id, state in list(robot_states.items()):
                 is_online = (now - state.get('last_update', 0)) < ROBOT_TIMEOUT
-                snapshot.append({
-                    "robot_id": robot_id,
-                    "online": is_online,
-                    **state
-                })
+                snapshot[robot_id] = {"online": is_online, **state}
             
             if not snapshot:
                 continue
             
-            # 批量推送
-            message = json.dumps({
-                "type": "snapshot",
-                "timestamp": now,
-                "robots": snapshot
-            })
+            # 每个周期只编码一次，没有变化时不推送
+            message = snapshot_encoder.encode(snapshot, now)
+            if message is None:
+                continue
             
-            await client_manager.broadcast(message)
+            client_manager.broadcast(message, resync=snapshot_encoder.keyframe)
             
         except Exception as e:
             print(f"❌ Broadcast error: {e}")
@@ -326,10 +497,31 @@ async def broadcast_worker():
 # ============ FastAPI 应用 ============
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global log_queue
+    loop = asyncio.get_running_loop()
+    log_queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
+    
+    # UDP 接收器与 HTTP/WebSocket 共用同一个事件循环
+    transport, _ = await loop.create_datagram_endpoint(
+        UDPReceiver, local_addr=('0.0.0.0', UDP_PORT))
+    
     # 启动后台任务
+    writer_task = asyncio.create_task(log_writer_worker())
     asyncio.create_task(broadcast_worker())
     asyncio.create_task(client_manager.heartbeat_loop())
     yield
+    
+    transport.close()
+    writer_task.cancel()
+    # 写完队列中剩余的日志再关闭文件
+    remaining = []
+    while not log_queue.empty():
+        remaining.append(log_queue.get_nowait())
+    await loop.run_in_executor(log_executor, write_log_batch, remaining)
+    for f in log_files.values():
+        if LOG_COMPRESSION:
+            f.close()
+    group_writer.close()
 
 app = FastAPI(title="Robot Monitor API (Stable)", lifespan=lifespan)
 
@@ -365,6 +557,40 @@ async def get_robots():
     return {"robots": robots}
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """获取 UDP 接收延迟、写日志队列深度和丢包统计"""
+    return {
+        **metrics.to_dict(log_queue.qsize() if log_queue is not None else 0),
+        "log_writer": group_writer.stats(),
+        "json_backend": JSON_BACKEND,
+        "clients": len(client_manager.clients),
+    }
+
+
+@app.get("/api/clients")
+async def get_clients():
+    """获取每个 WebSocket 客户端的发送延迟和丢弃统计"""
+    return {"clients": client_manager.stats()}
+
+
+@app.get("/api/telemetry/{robot_id}")
+async def get_telemetry(robot_id: str, fields: str = "timestamp_ms,battery", seconds: float = 60.0):
+    """获取机器人遥测时间序列（默认最近 60 秒的电量）"""
+    try:
+        columns = telemetry.last(robot_id, fields.split(","), seconds)
+    except KeyError as e:
+        return {"error": str(e)}
+    if columns is None:
+        return {"error": "Robot not found"}
+    
+    return {
+        "robot_id": robot_id,
+        "seconds": seconds,
+        "data": {name: column_to_list(column) for name, column in columns.items()}
+    }
+
+
 # ============ ActiveMatch API ============
 
 @app.get("/api/current_match")
@@ -381,13 +607,10 @@ async def get_current_match_robots():
         return {"error": "No active match"}
     
     robots = []
-    for robot_id in active_match.robots:
-        log_file = active_match.log_dir / f"robot_{robot_id}.jsonl"
-        packet_count = sum(1 for _ in open(log_file)) if log_file.exists() else 0
-        
+    for robot_id in list(active_match.robots):
         robots.append({
             "robot_id": robot_id,
-            "packet_count": packet_count,
+            "packet_count": packet_counts.get(robot_id, 0),
             "last_update": robot_states.get(robot_id, {}).get('last_update', 0),
             "online": robot_id in robot_states
         })
@@ -401,22 +624,18 @@ async def get_current_match_logs(robot_id: str, limit: int = 50):
     if not active_match.is_active:
         return {"error": "No active match"}
     
-    log_file = active_match.log_dir / f"robot_{robot_id}.jsonl"
-    
-    if not log_file.exists():
+    if robot_id not in log_tails:
         return {"error": "Robot not found"}
     
-    # 读取最新 N 条
-    data = []
-    with open(log_file, 'r') as f:
-        lines = f.readlines()
-        for line in lines[-limit:]:
-            try:
-                data.append(json.loads(line))
-            except:
-                pass
-    
-    total_packets = len(lines)
+    # 最近 LOG_TAIL_SIZE 条直接取内存，更早的从日志文件尾部反向读取
+    recent = list(log_tails[robot_id])
+    data = recent[-limit:] if limit > 0 else []
+    total_packets = packet_counts[robot_id]
+    if len(data) < min(limit, total_packets):
+        # 在写日志线程中读取，与写入串行，不阻塞事件循环
+        log_file = active_match.log_dir / f"robot_{robot_id}.jsonl"
+        data = await asyncio.get_running_loop().run_in_executor(
+            log_executor, read_log_history, robot_id, log_file, limit, recent, total_packets)
     
     return {
         "match_id": active_match.match_id,
@@ -427,35 +646,59 @@ async def get_current_match_logs(robot_id: str, limit: int = 50):
     }
 
 
+def read_log_history(robot_id: str, log_file: Path, limit: int, recent: list, total_packets: int):
+    """读取最后 limit 条日志（只读文件尾部，耗时与比赛时长无关）
+    
+    在 log_executor 中执行。还在写日志队列中的记录取自内存尾部缓存 recent。
+    """
+    unwritten = min(max(total_packets - written_counts.get(robot_id, 0), 0), len(recent), limit)
+    queued = recent[len(recent) - unwritten:]
+    limit -= unwritten
+    
+    if limit <= 0:
+        lines = []
+    elif LOG_COMPRESSION:
+        # 分块压缩日志：只解压最后几个块，再拼上尚未落盘的记录
+        writer = log_files.get(robot_id)
+        records = writer.pending_records()[-limit:] if writer is not None else []
+        chunks_file = Path(str(log_file) + CHUNKS_SUFFIX)
+        if len(records) < limit and chunks_file.exists():
+            records = ChunkedLogReader(chunks_file).tail(limit - len(records)) + records
+        lines = [payload for _, payload in records]
+    else:
+        # 先提交组提交写入器中的数据，文件尾部才包含所有已交给它的记录
+        group_writer.flush()
+        lines = read_tail_lines(log_file, limit) if log_file.exists() else []
+    
+    data = []
+    for line in lines:
+        try:
+            data.append(loads(line))
+        except DecodeError:
+            pass
+    return data + queued
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     
     client = WebSocketClient(websocket)
-    await client_manager.add(client)
+    client_manager.add(client)
     
     # 启动发送循环
     sender_task = asyncio.create_task(client.sender_loop())
     
     try:
-        # 发送初始快照
-        snapshot = []
-        now = time.time()
-        for robot_id, state in robot_states.items():
-            is_online = (now - state.get('last_update', 0)) < ROBOT_TIMEOUT
-            snapshot.append({"robot_id": robot_id, "online": is_online, **state})
-        
-        if snapshot:
-            await client.send_safe(json.dumps({
-                "type": "snapshot",
-                "robots": snapshot
-            }))
+        # 发送初始关键帧（与上一次广播同一 seq，之后的增量帧可直接应用）
+        if snapshot_encoder.robots:
+            client.offer(snapshot_encoder.keyframe())
         
         # 接收循环（处理 pong 和 heartbeat）
         while client.active:
             try:
                 data = await asyncio.wait_for(websocket.receive_text(), timeout=5.0)
-                msg = json.loads(data)
+                msg = loads(data)
                 
                 msg_type = msg.get("type")
                 if msg_type == "pong":
@@ -463,12 +706,15 @@ async def websocket_endpoint(websocket: WebSocket):
                 elif msg_type == "heartbeat":
                     # 客户端主动心跳，更新时间
                     client.last_pong = time.time()
+                elif msg_type == "resync":
+                    # 客户端检测到 seq 缺口，重发关键帧
+                    client.offer(snapshot_encoder.keyframe())
                 # 忽略其他消息类型
                     
             except asyncio.TimeoutError:
                 # 正常超时，继续等待
                 continue
-            except json.JSONDecodeError as e:
+            except DecodeError as e:
                 print(f"⚠️  JSON decode error: {e}")
                 continue
                 
@@ -477,7 +723,7 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         print(f"⚠️  WebSocket error: {e}")
     finally:
-        await client_manager.remove(client)
+        client_manager.remove(client)
         sender_task.cancel()
 
 
@@ -488,12 +734,10 @@ def main():
     
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     
-    udp_receiver = UDPReceiver()
-    udp_receiver.start()
-    
     print(f"🌐 Web Server: http://localhost:{HTTP_PORT}")
-    print(f"📊 Broadcast: {1/BROADCAST_INTERVAL} Hz")
+    print(f"📊 Broadcast: {1/BROADCAST_INTERVAL:.0f} Hz (keyframe every {KEYFRAME_INTERVAL:.0f}s)")
     print(f"💓 Heartbeat: every {HEARTBEAT_INTERVAL}s")
+    print(f"🧾 JSON backend: {JSON_BACKEND}")
     print("=" * 60)
     
     uvicorn.run(app, host="0.0.0.0", port=HTTP_PORT, log_level="warning")
@@ -14,6 +14,11 @@ import json
 import threading
 from google.protobuf.json_format import MessageToDict
 
+from telemetry_store import column_to_list
+
+# get_history 单次最多返回的帧数
+HISTORY_MAX_FRAMES = 1000
+
 
 class WebSocketServer:
     """WebSocket 服务器"""
@@ -98,24 +103,70 @@ class WebSocketServer:
                     'message': f'No state for robot {robot_id}'
                 }))
                 
+        elif msg_type == 'get_history':
+            # 获取指定机器人最近 N 帧状态
+            robot_id = data.get('robot_id')
+            count = min(int(data.get('count', 100)), HISTORY_MAX_FRAMES)
+            states = self.daemon.get_recent_states(robot_id, count)
+            await websocket.send(json.dumps({
+                'type': 'robot_history',
+                'robot_id': robot_id,
+                'data': [MessageToDict(state, preserving_proto_field_name=True) for state in states]
+            }))
+            
+        elif msg_type == 'get_telemetry':
+            # 获取指定机器人若干遥测列（如最近 60 秒的电量）
+            robot_id = data.get('robot_id')
+            fields = data.get('fields', ['timestamp_ms', 'battery'])
+            try:
+                columns = self.daemon.get_telemetry(robot_id, fields, data.get('seconds'))
+            except KeyError as e:
+                await websocket.send(json.dumps({'type': 'error', 'message': str(e)}))
+                return
+            await websocket.send(json.dumps({
+                'type': 'robot_telemetry',
+                'robot_id': robot_id,
+                'data': {name: column_to_list(column) for name, column in (columns or {}).items()}
+            }))
+                
     def broadcast_state(self, robot_id, state):
         """广播状态更新到所有客户端"""
+        self.broadcast_states([(robot_id, state)])
+        
+    def broadcast_states(self, batch):
+        """批量广播状态更新，batch 为 [(robot_id, state), ...]
+
+        整批只调度一次到事件循环，避免每包一次跨线程调用。
+        """
         if not self.clients or self.loop is None:
             return
             
-        state_dict = MessageToDict(state, preserving_proto_field_name=True)
-        message = json.dumps({
-            'type': 'robot_state',
-            'robot_id': robot_id,
-            'data': state_dict
-        })
+        messages = []
+        for robot_id, state in batch:
+            state_dict = MessageToDict(state, preserving_proto_field_name=True)
+            messages.append(json.dumps({
+                'type': 'robot_state',
+                'robot_id': robot_id,
+                'data': state_dict
+            }))
+        self.broadcast_messages(messages)
         
+    def broadcast_messages(self, messages):
+        """广播已编码的消息（接收子进程已完成编码时使用）"""
+        if not self.clients or self.loop is None:
+            return
+            
         # 在事件循环中异步发送
         asyncio.run_coroutine_threadsafe(
-            self._broadcast(message),
+            self._broadcast_many(messages),
             self.loop
         )
         
+    async def _broadcast_many(self, messages):
+        """按顺序异步广播多条消息"""
+        for message in messages:
+            await self._broadcast(message)
+            
     async def _broadcast(self, message):
         """异步广播消息"""
         if self.clients:
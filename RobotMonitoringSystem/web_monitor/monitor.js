@@ -4,9 +4,12 @@
 // 2. 批量处理快照
 // 3. 性能优化
 // 4. 异常容错
+// 5. 增量协议：关键帧（snapshot）+ 字段级增量（delta），按 seq 检测缺口
 
 const robotStates = new Map();
 let robustWS = null;
+let lastSeq = null;           // 最近应用的消息序号
+let resyncPending = false;    // 已请求关键帧，等待中
 
 // 初始化
 document.addEventListener('DOMContentLoaded', () => {
@@ -31,6 +34,8 @@ function connectWebSocket() {
     // 断开连接回调
     robustWS.onDisconnected = () => {
         console.log('🔴 Disconnected from server');
+        lastSeq = null;
+        resyncPending = false;
         updateConnectionStatus(false);
     };
     
@@ -52,10 +57,18 @@ function connectWebSocket() {
 function handleMessage(msg) {
     switch (msg.type) {
         case 'snapshot':
-            // 批量更新（核心优化）
+            // 关键帧：完整状态（核心优化：批量更新）
+            if (msg.seq !== undefined) {
+                lastSeq = msg.seq;
+                resyncPending = false;
+            }
             handleSnapshot(msg.robots);
             break;
             
+        case 'delta':
+            handleDelta(msg);
+            break;
+            
         case 'robot_update':
             // 单个更新（兼容旧版）
             updateRobot(msg.data);
@@ -72,6 +85,11 @@ function handleSnapshot(robots) {
         return;
     }
     
+    // 状态同步更新，后续增量帧以此为基准
+    robots.forEach(robot => {
+        robotStates.set(robot.robot_id, { ...robot, lastUpdate: Date.now() });
+    });
+    
     // 使用 requestAnimationFrame 批量更新 DOM
     requestAnimationFrame(() => {
         robots.forEach(robot => {
@@ -81,6 +99,53 @@ function handleSnapshot(robots) {
     });
 }
 
+// 处理增量帧（只包含变化的字段）
+function handleDelta(msg) {
+    if (lastSeq === null || msg.seq !== lastSeq + 1) {
+        // 丢帧或尚未收到关键帧：丢弃增量，请求重新同步
+        if (!resyncPending) {
+            console.warn(`⚠️ Delta gap (expected ${lastSeq === null ? '?' : lastSeq + 1}, got ${msg.seq}), requesting resync`);
+            resyncPending = robustWS.send({ type: 'resync' });
+        }
+        return;
+    }
+    lastSeq = msg.seq;
+    
+    // 先同步合并状态（下一条增量可能在 DOM 刷新前到达），再批量更新 DOM
+    const merged = new Map();
+    const base = (robotId) => {
+        if (!merged.has(robotId)) {
+            const { lastUpdate, ...previous } = robotStates.get(robotId) || { robot_id: robotId };
+            merged.set(robotId, previous);
+        }
+        return merged.get(robotId);
+    };
+    Object.entries(msg.changed || {}).forEach(([robotId, fields]) => {
+        Object.assign(base(robotId), fields);
+    });
+    Object.entries(msg.unset || {}).forEach(([robotId, fields]) => {
+        const robot = base(robotId);
+        fields.forEach(field => delete robot[field]);
+    });
+    merged.forEach((robot, robotId) => {
+        robotStates.set(robotId, { ...robot, lastUpdate: Date.now() });
+    });
+    (msg.removed || []).forEach(robotId => robotStates.delete(robotId));
+    
+    requestAnimationFrame(() => {
+        merged.forEach(robot => {
+            updateRobot(robot);
+        });
+        (msg.removed || []).forEach(robotId => {
+            const card = document.getElementById(`robot-${robotId}`);
+            if (card) {
+                card.remove();
+            }
+        });
+        updateRobotCount();
+    });
+}
+
 // 更新连接状态
 function updateConnectionStatus(connected) {
     const statusEl = document.getElementById('connection-status');
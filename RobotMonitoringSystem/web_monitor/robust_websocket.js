@@ -15,6 +15,7 @@ class RobustWebSocket {
         this.lastPongTime = Date.now();
         this.isIntentionallyClosed = false;
         this.reconnectTimer = null;
+        this.decoder = new TextDecoder();
         
         // 回调函数
         this.onConnected = null;
@@ -33,6 +34,7 @@ class RobustWebSocket {
         try {
             console.log(`🔌 Connecting to ${this.url}...`);
             this.ws = new WebSocket(this.url);
+            this.ws.binaryType = 'arraybuffer';  // 服务器以二进制帧发送 UTF-8 JSON
             
             this.ws.onopen = () => {
                 console.log('✅ WebSocket connected');
@@ -47,7 +49,10 @@ class RobustWebSocket {
             
             this.ws.onmessage = (event) => {
                 try {
-                    const msg = JSON.parse(event.data);
+                    const text = typeof event.data === 'string'
+                        ? event.data
+                        : this.decoder.decode(event.data);
+                    const msg = JSON.parse(text);
                     
                     if (msg.type === 'ping') {
                         // 响应 ping
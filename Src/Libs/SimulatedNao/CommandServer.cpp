@@ -42,9 +42,10 @@ void CommandServer::stop()
     
   running = false;
   
-  // Close server socket to unblock accept()
+  // Shut down server socket to unblock accept() (closing it alone does not on Linux)
   if (serverSocket >= 0)
   {
+    shutdown(serverSocket, SHUT_RDWR);
     close(serverSocket);
     serverSocket = -1;
   }
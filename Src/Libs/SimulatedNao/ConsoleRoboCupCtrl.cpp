@@ -33,6 +33,7 @@
 
 #include <algorithm>
 #include <cctype>
+#include <cstdlib>
 #include <functional>
 #include <iostream>
 #include <regex>
@@ -53,8 +54,15 @@ ConsoleRoboCupCtrl::ConsoleRoboCupCtrl(SimRobot::Application& application) :
   addView(new ConsoleView("Console.Pad", *this, true), consoleView, SimRobot::Flag::verticalTitleBar);
   
   // Start command server for external GUI control
-  commandServer = std::make_unique<CommandServer>(this, 12345);
+  // The port can be overridden, e.g. by the test runner, which runs several SimRobot instances.
+  const char* commandPort = std::getenv("SIMROBOT_COMMAND_PORT");
+  commandServer = std::make_unique<CommandServer>(this, commandPort ? std::atoi(commandPort) : 12345);
   commandServer->start();
+
+  // update() is not called while the simulation is stopped, e.g. after a test has finished.
+  commandTimer = std::make_unique<QTimer>();
+  QObject::connect(commandTimer.get(), &QTimer::timeout, commandTimer.get(), [this] { commandServer->processCommands(); });
+  commandTimer->start(100);
 }
 
 bool ConsoleRoboCupCtrl::compile()
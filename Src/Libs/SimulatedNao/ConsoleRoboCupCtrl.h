@@ -12,6 +12,7 @@
 #include <memory>
 #include <QDir>
 #include <QString>
+#include <QTimer>
 
 #include "BHToolBar.h"
 #include "RoboCupCtrl.h"
@@ -53,6 +54,7 @@ private:
   BHToolBar toolBar; /**< The toolbar shown for this controller. */
   QString statusText; /**< The text to be printed in the status bar. */
   std::unique_ptr<CommandServer> commandServer; /**< TCP server for external commands. */
+  std::unique_ptr<QTimer> commandTimer; /**< Executes external commands while the simulation is not running. */
 
 public:
   /**
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import math
 import multiprocessing as mp
 import re
+import time
 from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from io import StringIO
+from itertools import repeat
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import click
 import numpy as np
-import pybh.logs as bhlogs
 from rich.console import Console
 from rich.progress import track
 
+from .columns import FORMATS, LogColumns, pa
+from .engine import Engine, extract_range, frame_ranges, run_statistics, run_statistics_parallel
+from .frame_index import FrameIndex, IndexBuilder
+from .report_cache import ReportCache, fingerprint
 from .statistics.annotation import Annotation
 from .statistics.behavior_oscillation import BehaviorOscillation
 from .statistics.motion_oscillation import MotionOscillation
@@ -28,6 +35,33 @@ stat_classes: list[type[Statistic]] = [
     TargetOscillation,
 ]
 
+# Statistics selectable with `run --stat`, by command name.
+stat_registry: dict[str, type[Statistic]] = {
+    "annotation": Annotation,
+    "behavior": BehaviorOscillation,
+    "motion": MotionOscillation,
+    "target": TargetOscillation,
+    "walking": WalkingOscillation,
+}
+
+# Parameters `run` creates each statistic with, matching the defaults of the respective command.
+stat_parameters: dict[str, dict[str, Any]] = {
+    "annotation": {},
+    "behavior": {"threshold": 10, "grouping_threshold": 120},
+    "motion": {"threshold": 10, "grouping_threshold": 120},
+    "target": {"buffer_length": 60, "threshold": np.deg2rad(10.0), "grouping_threshold": 120},
+    "walking": {"buffer_length": 80, "threshold": np.deg2rad(45.0)},
+}
+
+
+index_option = click.option(
+    "--index/--no-index",
+    "use_index",
+    default=True,
+    show_default=True,
+    help="Use (and create) a frame index next to each log to skip frames statistics do not need.",
+)
+
 
 def prepare_paths(path: Path, exclude_invisibles: bool = True) -> list[Path]:
     if path.is_file():
@@ -83,7 +117,17 @@ def cli() -> None:
     show_default=True,
     help="Number of processes to use. Set to 0 to use all available CPUs.",
 )
-def report(path: Path, include_invisibles: bool, n_processes: int) -> None:
+@click.option(
+    "--cache/--no-cache",
+    "use_cache",
+    default=True,
+    show_default=True,
+    help="Skip statistics whose reports for a log are up to date.",
+)
+@index_option
+def report(
+    path: Path, include_invisibles: bool, n_processes: int, use_cache: bool, use_index: bool
+) -> None:
     """Generate a report for all available statistics.
 
     The following statistics are available:
@@ -111,10 +155,19 @@ def report(path: Path, include_invisibles: bool, n_processes: int) -> None:
 
     The number of processes to use can be adjusted with the `--n-processes` parameter. Set it to 0
     to use all available CPUs. To avoid overloading the system of an unsuspecting user, the
-    default has been set to 1.
+    default has been set to 1. Work is balanced by file size: logs are processed largest first and
+    a log larger than its fair share of the total size is split into frame ranges that are read by
+    several processes.
 
     The `--include-invisibles` flag can be used to include logs against the Invisibles team (a.k.a.
     a testgame).
+
+    Unless `--no-index` is given, a frame index is stored next to each log on the first run. Later
+    runs only read the frames the statistics need.
+
+    Unless `--no-cache` is given, results are recorded in a SQLite database in PATH (or next to the
+    log). A statistic is only run again on a log if the content of the log, the parameters or the
+    version of the statistic changed or its report was deleted. Outdated reports are removed.
     """
     logs = prepare_paths(path, exclude_invisibles=not include_invisibles)
 
@@ -122,17 +175,131 @@ def report(path: Path, include_invisibles: bool, n_processes: int) -> None:
     if n_processes < 1:
         n_processes = mp.cpu_count()
 
+    cache = ReportCache(path if path.is_dir() else path.parent) if use_cache else None
+    fingerprints = {log_path: fingerprint(log_path) for log_path in logs} if cache else {}
+    cached, pending = report_lookup(cache, logs, fingerprints)
+
+    work, split = report_plan(pending, n_processes, use_index)
+
     with ProcessPoolExecutor(max_workers=n_processes) as executor:
-        for log_path, stats in executor.map(report_worker, logs):
-            cli_console.rule(str(log_path.relative_to(path)))
-            if len(stats) > 0:
-                for name, hits in stats.items():
-                    cli_console.print(f"{name}: {hits}")
+        futures: dict[Path, list] = {log_path: [] for log_path in pending}
+        for log_path, frame_range in work:
+            if frame_range is None:
+                futures[log_path].append(
+                    executor.submit(report_worker, log_path, use_index, pending[log_path])
+                )
+            else:
+                futures[log_path].append(
+                    executor.submit(
+                        extract_range, log_path, split[log_path], *frame_range, use_index=use_index
+                    )
+                )
+
+        for log_path in logs:
+            fresh = report_result(log_path, pending, split, futures.get(log_path, []))
+            if cache is not None and fresh:
+                report_store(cache, log_path, fingerprints[log_path], pending[log_path], fresh)
+            merged = {**cached.get(log_path, {}), **fresh}
+            hits: dict[str, int] = {}
+            if fresh or log_path not in pending:
+                hits = {cls.__name__: merged[cls.__name__] for cls in stat_classes}
+            cli_console.rule(str(log_path.relative_to(path)) if log_path != path else path.name)
+            if len(hits) > 0:
+                for name, count in hits.items():
+                    cli_console.print(f"{name}: {count}")
             else:
                 cli_console.print("could not parse")
 
+    if cache is not None:
+        cli_console.print(
+            f"Report cache: {len(logs) - len(pending)} of {len(logs)} logs unchanged, "
+            f"{cache.hits} hits, {cache.misses} misses"
+        )
+        cache.close()
+
 
-def report_worker(log_path: Path) -> tuple[Path, dict[str, int]]:
+def report_lookup(
+    cache: ReportCache | None, logs: list[Path], fingerprints: dict[Path, str]
+) -> tuple[dict[Path, dict[str, int]], dict[Path, list[type[Statistic]]]]:
+    """Split the work of the report command into cached hits and statistics to run per log."""
+    cached: dict[Path, dict[str, int]] = {}
+    pending: dict[Path, list[type[Statistic]]] = {}
+    probes = report_stats(stat_classes)
+    for log_path in logs:
+        for stat in probes:
+            hits = None if cache is None else cache.lookup(log_path, fingerprints[log_path], stat)
+            if hits is None:
+                pending.setdefault(log_path, []).append(stat.__class__)
+            else:
+                cached.setdefault(log_path, {})[stat.__class__.__name__] = hits
+    return cached, pending
+
+
+def report_plan(
+    pending: dict[Path, list[type[Statistic]]], n_processes: int, use_index: bool
+) -> tuple[list[tuple[Path, tuple[int, int] | None]], dict[Path, list[Statistic]]]:
+    """Plan the work items of the report command, largest first.
+
+    Logs larger than a fair share of the total size are split into frame ranges, so a single large
+    log does not keep one process busy while the others are idle. Returns the work items (a log and
+    a frame range, or None for the whole log) and the statistics the ranges of split logs are
+    replayed through.
+    """
+    sizes = {log_path: log_path.stat().st_size for log_path in pending}
+    share = sum(sizes.values()) / n_processes
+    work: list[tuple[int, Path, tuple[int, int] | None]] = []
+    split: dict[Path, list[Statistic]] = {}
+    for log_path, classes in pending.items():
+        n_ranges = min(n_processes, math.ceil(sizes[log_path] / share)) if share else 1
+        if n_ranges > 1:
+            split[log_path] = report_stats(classes)
+            try:
+                ranges = frame_ranges(log_path, split[log_path], n_ranges, use_index=use_index)
+            except RuntimeError:
+                ranges = []
+                split[log_path] = []
+            work += [(sizes[log_path] // len(ranges), log_path, r) for r in ranges]
+        else:
+            work.append((sizes[log_path], log_path, None))
+    work.sort(key=lambda item: item[0], reverse=True)
+    return [(log_path, frame_range) for _, log_path, frame_range in work], split
+
+
+def report_result(
+    log_path: Path,
+    pending: dict[Path, list[type[Statistic]]],
+    split: dict[Path, list[Statistic]],
+    futures: list,
+) -> dict[str, int]:
+    """Wait for the statistics run on a log and return their hits.
+
+    The result is empty if no statistic had to be run on the log or it could not be parsed.
+    """
+    if log_path in split:
+        return report_merge(log_path, split[log_path], futures)
+    if log_path in pending:
+        _, fresh = futures[0].result()
+        return fresh
+    return {}
+
+
+def report_store(
+    cache: ReportCache,
+    log_path: Path,
+    log_fingerprint: str,
+    classes: list[type[Statistic]],
+    fresh: dict[str, int],
+) -> None:
+    """Record the hits and reports of the statistics just run on a log in the report cache."""
+    for stat in report_stats(classes):
+        name = stat.__class__.__name__
+        report_path = report_path_for(log_path, name, fresh[name])
+        cache.store(log_path, log_fingerprint, stat, fresh[name], report_path)
+
+
+def report_worker(
+    log_path: Path, use_index: bool = True, classes: list[type[Statistic]] | None = None
+) -> tuple[Path, dict[str, int]]:
     """Worker function for the report command.
 
     This function is responsible for processing a single log file and generating reports for all
@@ -140,27 +307,51 @@ def report_worker(log_path: Path) -> tuple[Path, dict[str, int]]:
 
     Args:
         log_path (Path): The path to the log file to process.
+        use_index (bool): Whether to use and create the frame index of the log.
+        classes (list[type[Statistic]] | None): The statistics to run. Defaults to all of them.
     """
-    stats: list[Statistic] = []
-    for stat_class in stat_classes:
-        console = Console(file=StringIO(), record=True)
-        stat = stat_class(console=console, quiet=False)
-        stats.append(stat)
+    stats = report_stats(stat_classes if classes is None else classes)
     try:
-        log = bhlogs.Log(str(log_path))
-        for frame_idx, frame in enumerate(log):
-            for stat in stats:
-                stat.update(frame=frame, frame_idx=frame_idx)
-        for stat in stats:
-            save_path = log_path.with_suffix(".html").with_stem(
-                log_path.stem + "-" + stat.__class__.__name__ + "-" + str(stat.hits)
-            )
-            stat.console.save_html(str(save_path))
-        return log_path, {stat.__class__.__name__: stat.hits for stat in stats}
+        run_statistics(log_path, stats, use_index=use_index)
+        return log_path, save_reports(log_path, stats)
     except RuntimeError:
         return log_path, {}
 
 
+def report_merge(log_path: Path, stats: list[Statistic], futures: list) -> dict[str, int]:
+    """Replay the frame ranges of a log that was split for the report command and save it.
+
+    Returns the hits per statistic, or an empty dict if the log could not be parsed.
+    """
+    if not stats:
+        return {}
+    try:
+        parts = [future.result() for future in futures]
+    except RuntimeError:
+        return {}
+    Engine(stats).replay(parts)
+    return save_reports(log_path, stats)
+
+
+def report_stats(classes: list[type[Statistic]]) -> list[Statistic]:
+    """Create statistics for the report command, each recording to its own console."""
+    return [
+        stat_class(console=Console(file=StringIO(), record=True), quiet=False)
+        for stat_class in classes
+    ]
+
+
+def report_path_for(log_path: Path, name: str, hits: int) -> Path:
+    return log_path.with_suffix(".html").with_stem(log_path.stem + "-" + name + "-" + str(hits))
+
+
+def save_reports(log_path: Path, stats: list[Statistic]) -> dict[str, int]:
+    """Save the console output of each statistic next to the log and return the hits."""
+    for stat in stats:
+        stat.console.save_html(str(report_path_for(log_path, stat.__class__.__name__, stat.hits)))
+    return {stat.__class__.__name__: stat.hits for stat in stats}
+
+
 @cli.command(hidden=True)
 @click.argument(
     "path",
@@ -204,12 +395,14 @@ def report_worker(log_path: Path) -> tuple[Path, dict[str, int]]:
     show_default=True,
     help="Threshold in frames to group hits together.",
 )
-def motion(
+@index_option
+def motion(  # noqa: PLR0913
     path: Path,
     threshold: int,
     grouping_threshold: int,
     quiet: bool,
     include_invisibles: bool,
+    use_index: bool,
 ) -> None:
     """Print potential oscillations in motion status.
 
@@ -228,7 +421,6 @@ def motion(
     logs = prepare_paths(path, exclude_invisibles=not include_invisibles)
 
     for log_path in logs:
-        log = bhlogs.Log(str(log_path))
         stats = MotionOscillation(
             console=console,
             threshold=threshold,
@@ -241,8 +433,12 @@ def motion(
             msg = f"Log path {log_path} is not a subpath of {path}. This should not happen."
             raise ValueError(msg) from None
         try:
-            for frame_idx, frame in enumerate(track(log, transient=True, console=console)):
-                stats.update(frame=frame, frame_idx=frame_idx)
+            run_statistics(
+                log_path,
+                [stats],
+                use_index=use_index,
+                wrap=lambda frames: track(frames, transient=True, console=console),
+            )
             console.print(f"{rel_path}: {stats.hits} hits")
         except RuntimeError:
             console.print(f"{rel_path}: could not parse.")
@@ -291,12 +487,14 @@ def motion(
     show_default=True,
     help="Threshold in frames to group hits together.",
 )
-def behavior(
+@index_option
+def behavior(  # noqa: PLR0913
     path: Path,
     threshold: int,
     grouping_threshold: int,
     quiet: bool,
     include_invisibles: bool,
+    use_index: bool,
 ) -> None:
     """Print potential oscillations in behavior status.
 
@@ -318,7 +516,6 @@ def behavior(
     logs = prepare_paths(path, exclude_invisibles=not include_invisibles)
 
     for log_path in logs:
-        log = bhlogs.Log(str(log_path))
         stats = BehaviorOscillation(
             console=console,
             threshold=threshold,
@@ -331,8 +528,12 @@ def behavior(
             msg = f"Log path {log_path} is not a subpath of {path}. This should not happen."
             raise ValueError(msg) from None
         try:
-            for frame_idx, frame in enumerate(track(log, transient=True, console=console)):
-                stats.update(frame=frame, frame_idx=frame_idx)
+            run_statistics(
+                log_path,
+                [stats],
+                use_index=use_index,
+                wrap=lambda frames: track(frames, transient=True, console=console),
+            )
             console.print(f"{rel_path}: {stats.hits} hits")
         except RuntimeError:
             console.print(f"{rel_path}: could not parse.")
@@ -381,12 +582,14 @@ def behavior(
     show_default=True,
     help="Threshold in degrees for the mean angle between walking directions.",
 )
-def walking(
+@index_option
+def walking(  # noqa: PLR0913
     path: Path,
     buffer_size: int,
     threshold: float,
     quiet: bool,
     include_invisibles: bool,
+    use_index: bool,
 ) -> None:
     """Print potential oscillations in walking direction.
 
@@ -411,7 +614,6 @@ def walking(
     rad_threshold = np.deg2rad(threshold)
 
     for log_path in logs:
-        log = bhlogs.Log(str(log_path))
         stats = WalkingOscillation(
             buffer_length=buffer_size,
             threshold=rad_threshold,
@@ -424,8 +626,12 @@ def walking(
             msg = f"Log path {log_path} is not a subpath of {path}. This should not happen."
             raise ValueError(msg) from None
         try:
-            for frame_idx, frame in enumerate(track(log, transient=True, console=console)):
-                stats.update(frame=frame, frame_idx=frame_idx)
+            run_statistics(
+                log_path,
+                [stats],
+                use_index=use_index,
+                wrap=lambda frames: track(frames, transient=True, console=console),
+            )
             console.print(f"{rel_path}: {stats.hits}")
         except RuntimeError:
             console.print(f"{rel_path}: could not parse.")
@@ -482,6 +688,7 @@ def walking(
     show_default=True,
     help="Threshold in frames to group hits together.",
 )
+@index_option
 def target(  # noqa: PLR0913
     path: Path,
     buffer_size: int,
@@ -489,6 +696,7 @@ def target(  # noqa: PLR0913
     grouping_threshold: int,
     quiet: bool,
     include_invisibles: bool,
+    use_index: bool,
 ) -> None:
     """Print potential oscillations in ball target vectors.
 
@@ -513,7 +721,6 @@ def target(  # noqa: PLR0913
     rad_threshold = np.deg2rad(threshold)
 
     for log_path in logs:
-        log = bhlogs.Log(str(log_path))
         stats = TargetOscillation(
             buffer_length=buffer_size,
             threshold=rad_threshold,
@@ -527,8 +734,12 @@ def target(  # noqa: PLR0913
             msg = f"Log path {log_path} is not a subpath of {path}. This should not happen."
             raise ValueError(msg) from None
         try:
-            for frame_idx, frame in enumerate(track(log, transient=True, console=console)):
-                stats.update(frame=frame, frame_idx=frame_idx)
+            run_statistics(
+                log_path,
+                [stats],
+                use_index=use_index,
+                wrap=lambda frames: track(frames, transient=True, console=console),
+            )
             console.print(f"{rel_path}: {stats.hits}")
         except RuntimeError:
             console.print(f"{rel_path}: could not parse.")
@@ -558,10 +769,12 @@ def target(  # noqa: PLR0913
     show_default=True,
     help="Include matching logs against the Invisibles team (a.k.a. a testgame).",
 )
+@index_option
 def annotation(
     path: Path,
     quiet: bool,
     include_invisibles: bool,
+    use_index: bool,
 ) -> None:
     """Print annotations from logs.
 
@@ -578,7 +791,6 @@ def annotation(
 
     logs = prepare_paths(path, exclude_invisibles=not include_invisibles)
     for log_path in logs:
-        log = bhlogs.Log(str(log_path))
 
         stats = Annotation(console=console, quiet=quiet)
         try:
@@ -587,8 +799,317 @@ def annotation(
             msg = f"Log path {log_path} is not a subpath of {path}. This should not happen."
             raise ValueError(msg) from None
         try:
-            for frame_idx, frame in enumerate(track(log, transient=True, console=console)):
-                stats.update(frame=frame, frame_idx=frame_idx)
+            run_statistics(
+                log_path,
+                [stats],
+                use_index=use_index,
+                wrap=lambda frames: track(frames, transient=True, console=console),
+            )
             console.print(f"{rel_path}: {stats.hits}")
         except RuntimeError:
             console.print(f"{rel_path}: could not parse.")
+
+
+@cli.command()
+@click.argument(
+    "path",
+    type=click.Path(
+        exists=True,
+        file_okay=True,
+        dir_okay=True,
+        writable=False,
+        readable=True,
+        resolve_path=True,
+        path_type=Path,
+    ),
+)
+@click.option(
+    "-i",
+    "--include-invisibles/--exclude-invisibles",
+    "include_invisibles",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Include matching logs against the Invisibles team (a.k.a. a testgame).",
+)
+@click.option(
+    "-n",
+    "--n-processes",
+    "n_processes",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of processes to use. Set to 0 to use all available CPUs.",
+)
+@click.option(
+    "-f", "--force", is_flag=True, default=False, help="Rebuild indices that are up to date."
+)
+def index(path: Path, include_invisibles: bool, n_processes: int, force: bool) -> None:
+    """Build frame indices for logs.
+
+    PATH may be a directory containing log files or a single log file.
+
+    The index of a log records the thread, the representations and whether there are annotations
+    for every frame. It is saved next to the log with the suffix `.index.npz` and is rebuilt
+    automatically when the log changes. The other commands create indices on their first run as
+    well; this command only allows doing so ahead of time.
+    """
+    logs = prepare_paths(path, exclude_invisibles=not include_invisibles)
+
+    cli_console = Console()
+    if n_processes < 1:
+        n_processes = mp.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=n_processes) as executor:
+        for log_path, n_frames in executor.map(index_worker, logs, repeat(force)):
+            rel_path = log_path.relative_to(path) if log_path != path else log_path.name
+            if n_frames is None:
+                cli_console.print(f"{rel_path}: could not parse.")
+            else:
+                cli_console.print(f"{rel_path}: {n_frames} frames")
+
+
+def index_worker(log_path: Path, force: bool = False) -> tuple[Path, int | None]:
+    """Worker function for the index command.
+
+    Args:
+        log_path (Path): The path to the log file to index.
+        force (bool): Whether to rebuild an index that is up to date.
+    """
+    try:
+        frame_index = None if force else FrameIndex.load(log_path)
+        if frame_index is None:
+            frame_index = FrameIndex.build(log_path)
+            frame_index.save(log_path)
+        return log_path, len(frame_index)
+    except RuntimeError:
+        return log_path, None
+
+
+@cli.command()
+@click.argument(
+    "path",
+    type=click.Path(
+        exists=True,
+        file_okay=True,
+        dir_okay=True,
+        writable=False,
+        readable=True,
+        resolve_path=True,
+        path_type=Path,
+    ),
+)
+@click.option(
+    "-i",
+    "--include-invisibles/--exclude-invisibles",
+    "include_invisibles",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Include matching logs against the Invisibles team (a.k.a. a testgame).",
+)
+@click.option(
+    "-n",
+    "--n-processes",
+    "n_processes",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of processes to use. Set to 0 to use all available CPUs.",
+)
+@click.option(
+    "--format",
+    "table_format",
+    type=click.Choice(FORMATS),
+    default="npy",
+    show_default=True,
+    help="Storage format. arrow and parquet require pyarrow.",
+)
+@click.option(
+    "-f", "--force", is_flag=True, default=False, help="Extract logs that are up to date."
+)
+@index_option
+def extract(  # noqa: PLR0913
+    path: Path,
+    include_invisibles: bool,
+    n_processes: int,
+    table_format: str,
+    force: bool,
+    use_index: bool,
+) -> None:
+    """Extract commonly used fields of logs into columnar files.
+
+    PATH may be a directory containing log files or a single log file.
+
+    Each log is read once. MotionRequest (motion, targetDirection), RobotPose (rotation,
+    translation), BehaviorStatus (walkingTo), the option path of the ActivationGraph and the
+    annotations are decoded and saved in the directory `<log>.columns`, with the frame index and
+    the thread of each row. The files can be loaded, memory-mapped, with `LogColumns.load` for
+    analyses with NumPy (e.g. `TargetOscillation.batch_hits`) without decoding frames again.
+
+    Columns are stored as `.npy` files by default, or as Arrow or Parquet files. Unless
+    `--no-index` is given, the frame index of a log is built on the way if it is missing.
+    """
+    if table_format != "npy" and pa is None:
+        msg = f"The {table_format} format requires the 'pyarrow' package."
+        raise click.UsageError(msg)
+    logs = prepare_paths(path, exclude_invisibles=not include_invisibles)
+
+    cli_console = Console()
+    if n_processes < 1:
+        n_processes = mp.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=n_processes) as executor:
+        for log_path, n_rows in executor.map(
+            extract_worker, logs, repeat(table_format), repeat(force), repeat(use_index)
+        ):
+            rel_path = log_path.relative_to(path) if log_path != path else log_path.name
+            if n_rows is None:
+                cli_console.print(f"{rel_path}: could not parse.")
+            else:
+                cli_console.print(f"{rel_path}: {n_rows} rows")
+
+
+def extract_worker(
+    log_path: Path, table_format: str = "npy", force: bool = False, use_index: bool = True
+) -> tuple[Path, int | None]:
+    """Worker function for the extract command.
+
+    Args:
+        log_path (Path): The path to the log file to extract.
+        table_format (str): The storage format of the columns.
+        force (bool): Whether to extract the log if its columns are up to date.
+        use_index (bool): Whether to build the frame index of the log if it is missing.
+    """
+    try:
+        columns = None if force else LogColumns.load(log_path)
+        if columns is None:
+            index_builder = None
+            if use_index and FrameIndex.load(log_path) is None:
+                index_builder = IndexBuilder()
+            columns = LogColumns.build(log_path, index_builder)
+            columns.save(log_path, table_format)
+            if index_builder is not None:
+                index_builder.finish().save(log_path)
+        return log_path, len(columns)
+    except RuntimeError:
+        return log_path, None
+
+
+@cli.command()
+@click.argument(
+    "path",
+    type=click.Path(
+        exists=True,
+        file_okay=True,
+        dir_okay=True,
+        writable=False,
+        readable=True,
+        resolve_path=True,
+        path_type=Path,
+    ),
+)
+@click.option(
+    "-s",
+    "--stat",
+    "stat_names",
+    type=click.Choice(list(stat_registry), case_sensitive=False),
+    multiple=True,
+    help="Statistic to run (repeat for several). Defaults to all of them.",
+)
+@click.option(
+    "-q", "--quiet", is_flag=True, default=False, help="Reduce output to a hit count per file."
+)
+@click.option(
+    "-i",
+    "--include-invisibles/--exclude-invisibles",
+    "include_invisibles",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Include matching logs against the Invisibles team (a.k.a. a testgame).",
+)
+@click.option(
+    "-T",
+    "--timing",
+    is_flag=True,
+    default=False,
+    help="Print the time spent per statistic and per decoded representation.",
+)
+@click.option(
+    "-n",
+    "--n-processes",
+    "n_processes",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of processes to split each log across. Set to 0 to use all available CPUs.",
+)
+@index_option
+def run(  # noqa: PLR0913
+    path: Path,
+    stat_names: tuple[str, ...],
+    quiet: bool,
+    include_invisibles: bool,
+    timing: bool,
+    n_processes: int,
+    use_index: bool,
+) -> None:
+    """Run several statistics in a single pass over each log.
+
+    PATH may be a directory containing log files or a single log file.
+
+    Statistics are selected with `--stat` (e.g. `-s motion -s target`) and use the default
+    parameters of the respective commands. Each frame is read once, each representation it
+    contains is deserialized at most once and then handed to every selected statistic that
+    depends on it.
+
+    With `--timing`, a breakdown of the time spent in each statistic, in deserializing each
+    representation and in reading the log is printed after each log and for all logs combined.
+
+    With `--n-processes`, each log is split into frame ranges that are read in parallel. The
+    results are replayed in frame order, so hits and output are the same as in a single process.
+    """
+    console = Console()
+    logs = prepare_paths(path, exclude_invisibles=not include_invisibles)
+    selected = [name.lower() for name in stat_names] or list(stat_registry)
+    if n_processes < 1:
+        n_processes = mp.cpu_count()
+
+    total_engine = Engine([], timing=timing)
+    total_seconds = 0.0
+    with ProcessPoolExecutor(max_workers=n_processes) if n_processes > 1 else nullcontext() as pool:
+        for log_path in logs:
+            stats = [
+                stat_registry[name](console=console, quiet=quiet, **stat_parameters[name])
+                for name in selected
+            ]
+            engine = Engine(stats, timing=timing)
+            rel_path = log_path.relative_to(path) if log_path != path else log_path.name
+            start = time.perf_counter()
+            try:
+                if pool is None:
+                    run_statistics(
+                        log_path,
+                        stats,
+                        use_index=use_index,
+                        wrap=lambda frames: track(frames, transient=True, console=console),
+                        engine=engine,
+                    )
+                else:
+                    run_statistics_parallel(
+                        log_path, stats, pool, n_processes, use_index=use_index, engine=engine
+                    )
+            except RuntimeError:
+                console.print(f"{rel_path}: could not parse.")
+                continue
+            seconds = time.perf_counter() - start
+            hits = ", ".join(f"{stat.__class__.__name__} {stat.hits}" for stat in stats)
+            console.print(f"{rel_path}: {hits}")
+            if timing:
+                console.print(engine.timing_table(seconds))
+                total_engine.merge(engine)
+                total_seconds += seconds
+
+    if timing and len(logs) > 1:
+        console.print(total_engine.timing_table(total_seconds))
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import json
+import shutil
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+import pybh.logs as bhlogs
+
+from .statistics.util.motion import Motion
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather, parquet
+except ImportError:
+    pa = feather = parquet = None
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from .frame_index import IndexBuilder
+
+COLUMNS_SUFFIX = ".columns"
+COLUMNS_VERSION = 1
+FORMATS = ("npy", "arrow", "parquet")
+
+# Representations of which fields are extracted. Frames containing none of them are skipped.
+REPRESENTATIONS = ("MotionRequest", "RobotPose", "BehaviorStatus", "ActivationGraph")
+
+
+class LogColumns:
+    """Commonly used fields of a log, one row per frame, decoded once and stored next to the log.
+
+    Table `frames` has a row for every frame containing one of `REPRESENTATIONS`:
+
+        frame             int64    index of the frame in the log
+        thread            str
+        motion            int16    `MotionRequest.motion` (-1: missing)
+        target_direction  float64  `MotionRequest.targetDirection` (NaN: missing)
+        rotation          float64  `RobotPose.rotation`
+        translation_x     float64  `RobotPose.translation`
+        translation_y     float64
+        walking_to_x      float64  `BehaviorStatus.walkingTo`
+        walking_to_y      float64
+        option_path       str      options of the `ActivationGraph`, joined by "/" ("": missing)
+
+    Table `annotations` has a row per annotation (`frame`, `thread`, `name`, `description`).
+
+    The tables are stored in the directory `<log>.columns` as one `.npy` file per column, or as
+    Arrow (Feather) or Parquet files (requires `pyarrow`). `.npy` and Arrow files are memory-mapped
+    when loaded. They are invalidated when the log's size or modification time changes.
+    """
+
+    FRAME_COLUMNS = (
+        "frame",
+        "thread",
+        "motion",
+        "target_direction",
+        "rotation",
+        "translation_x",
+        "translation_y",
+        "walking_to_x",
+        "walking_to_y",
+        "option_path",
+    )
+    ANNOTATION_COLUMNS = ("frame", "thread", "name", "description")
+
+    def __init__(self, frames: dict[str, np.ndarray], annotations: dict[str, np.ndarray]) -> None:
+        self.frames = frames
+        self.annotations = annotations
+
+    def __len__(self) -> int:
+        return len(self.frames["frame"])
+
+    @staticmethod
+    def path_for(log_path: Path) -> Path:
+        return log_path.with_name(log_path.name + COLUMNS_SUFFIX)
+
+    @staticmethod
+    def _fingerprint(log_path: Path) -> list[int]:
+        stat = log_path.stat()
+        return [COLUMNS_VERSION, stat.st_size, stat.st_mtime_ns]
+
+    @classmethod
+    def build(cls, log_path: Path, index_builder: IndexBuilder | None = None) -> LogColumns:
+        """Extract the columns by iterating over the log once, feeding `index_builder` as well."""
+        builder = ColumnBuilder()
+        for frame_idx, frame in enumerate(bhlogs.Log(str(log_path))):
+            builder.add(frame, frame_idx)
+            if index_builder is not None:
+                index_builder.add(frame)
+        return builder.finish()
+
+    def save(self, log_path: Path, table_format: str = "npy") -> Path:
+        """Save the tables next to the log, replacing those saved before, and return the path."""
+        if table_format not in FORMATS:
+            msg = f"Unknown format {table_format}, expected one of {', '.join(FORMATS)}"
+            raise ValueError(msg)
+        if table_format != "npy" and pa is None:
+            msg = f"The {table_format} format requires the 'pyarrow' package"
+            raise ValueError(msg)
+        path = self.path_for(log_path)
+        if path.exists():
+            shutil.rmtree(path)
+        path.mkdir()
+
+        for name, table in (("frames", self.frames), ("annotations", self.annotations)):
+            if table_format == "npy":
+                (path / name).mkdir()
+                for column, values in table.items():
+                    np.save(path / name / f"{column}.npy", values)
+            elif table_format == "arrow":
+                # Uncompressed, so that the file can be memory-mapped.
+                feather.write_feather(
+                    pa.table(table), path / f"{name}.arrow", compression="uncompressed"
+                )
+            else:
+                parquet.write_table(pa.table(table), path / f"{name}.parquet")
+
+        # Written last: a directory without it (e.g. after an interruption) is not loaded.
+        with (path / "fingerprint.json").open("w") as f:
+            json.dump({"fingerprint": self._fingerprint(log_path), "format": table_format}, f)
+        return path
+
+    @classmethod
+    def load(cls, log_path: Path) -> LogColumns | None:
+        """Load the columns of a log, or return None if they are missing or stale."""
+        path = cls.path_for(log_path)
+        try:
+            with (path / "fingerprint.json").open() as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta["fingerprint"] != cls._fingerprint(log_path):
+            return None
+
+        tables = []
+        tables_columns = (("frames", cls.FRAME_COLUMNS), ("annotations", cls.ANNOTATION_COLUMNS))
+        for name, columns in tables_columns:
+            if meta["format"] == "npy":
+                tables.append(
+                    {
+                        column: np.load(path / name / f"{column}.npy", mmap_mode="r")
+                        for column in columns
+                    }
+                )
+                continue
+            if pa is None:
+                return None
+            if meta["format"] == "arrow":
+                table = feather.read_table(path / f"{name}.arrow", memory_map=True)
+            else:
+                table = parquet.read_table(path / f"{name}.parquet", memory_map=True)
+            tables.append({column: table[column].to_numpy() for column in columns})
+        return cls(*tables)
+
+    @classmethod
+    def load_or_build(cls, log_path: Path, table_format: str = "npy") -> LogColumns:
+        columns = cls.load(log_path)
+        if columns is None:
+            columns = cls.build(log_path)
+            columns.save(log_path, table_format)
+        return columns
+
+
+class ColumnBuilder:
+    """Collects the columns while frames are iterated anyway."""
+
+    def __init__(self) -> None:
+        self._frames: dict[str, list] = {column: [] for column in LogColumns.FRAME_COLUMNS}
+        self._annotations: dict[str, list] = {
+            column: [] for column in LogColumns.ANNOTATION_COLUMNS
+        }
+        # Functions filling a row with the fields of a record, per representation.
+        self._readers: dict[str, Callable[[bhlogs.Record, dict[str, object]], None]] = {
+            "MotionRequest": self._read_motion_request,
+            "RobotPose": self._read_robot_pose,
+            "BehaviorStatus": self._read_behavior_status,
+            "ActivationGraph": self._read_activation_graph,
+        }
+
+    def add(self, frame: bhlogs.Frame, frame_idx: int) -> None:
+        thread = frame.thread
+        for annotation in frame.annotations:
+            if isinstance(annotation, bhlogs.Annotation):
+                self._annotations["frame"].append(frame_idx)
+                self._annotations["thread"].append(thread)
+                self._annotations["name"].append(annotation.name)
+                self._annotations["description"].append(annotation.description)
+
+        present = [name for name in REPRESENTATIONS if name in frame]
+        if not present:
+            return
+        row: dict[str, object] = dict.fromkeys(LogColumns.FRAME_COLUMNS, np.nan)
+        row.update(frame=frame_idx, thread=thread, motion=-1, option_path="")
+        for name in present:
+            self._readers[name](frame[name], row)
+        for column, value in row.items():
+            self._frames[column].append(value)
+
+    @staticmethod
+    def _read_motion_request(record: bhlogs.Record, row: dict[str, object]) -> None:
+        if hasattr(record, "motion"):
+            row["motion"] = Motion(record.motion).value  # pyright: ignore[reportAttributeAccessIssue]
+        if hasattr(record, "targetDirection"):
+            row["target_direction"] = record.targetDirection  # pyright: ignore[reportAttributeAccessIssue]
+
+    @staticmethod
+    def _read_robot_pose(record: bhlogs.Record, row: dict[str, object]) -> None:
+        if hasattr(record, "rotation"):
+            row["rotation"] = record.rotation  # pyright: ignore[reportAttributeAccessIssue]
+        if hasattr(record, "translation"):
+            row["translation_x"] = record.translation.x  # pyright: ignore[reportAttributeAccessIssue]
+            row["translation_y"] = record.translation.y  # pyright: ignore[reportAttributeAccessIssue]
+
+    @staticmethod
+    def _read_behavior_status(record: bhlogs.Record, row: dict[str, object]) -> None:
+        if hasattr(record, "walkingTo"):
+            row["walking_to_x"] = record.walkingTo.x  # pyright: ignore[reportAttributeAccessIssue]
+            row["walking_to_y"] = record.walkingTo.y  # pyright: ignore[reportAttributeAccessIssue]
+
+    @staticmethod
+    def _read_activation_graph(record: bhlogs.Record, row: dict[str, object]) -> None:
+        if hasattr(record, "graph"):
+            row["option_path"] = "/".join(node.option for node in record.graph)  # pyright: ignore[reportAttributeAccessIssue]
+
+    def finish(self) -> LogColumns:
+        frames = self._frames
+        annotations = self._annotations
+        return LogColumns(
+            frames={
+                "frame": np.array(frames["frame"], dtype=np.int64),
+                "thread": np.array(frames["thread"], dtype=np.str_),
+                "motion": np.array(frames["motion"], dtype=np.int16),
+                **{
+                    column: np.array(frames[column], dtype=np.float64)
+                    for column in LogColumns.FRAME_COLUMNS[3:-1]
+                },
+                "option_path": np.array(frames["option_path"], dtype=np.str_),
+            },
+            annotations={
+                "frame": np.array(annotations["frame"], dtype=np.int64),
+                "thread": np.array(annotations["thread"], dtype=np.str_),
+                "name": np.array(annotations["name"], dtype=np.str_),
+                "description": np.array(annotations["description"], dtype=np.str_),
+            },
+        )
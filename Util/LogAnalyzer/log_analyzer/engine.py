@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import heapq
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable
+
+import numpy as np
+import pybh.logs as bhlogs
+from rich.table import Table
+
+from .frame_index import FrameIndex, IndexBuilder
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from concurrent.futures import Executor
+    from pathlib import Path
+
+    from .statistics.statistic import Statistic
+
+
+class Engine:
+    """Runs several statistics in a single pass over the frames of a log.
+
+    Statistics declare the threads and representations they depend on. For every frame, the engine
+    checks the thread and the presence of each representation once, deserializes every needed
+    representation once and hands the decoded records to all statistics subscribed to them.
+
+    With `collect`, the engine does not advance the statistics but collects the records returned by
+    their `extract` methods in `records` (one list of `(frame_idx, record)` per statistic), to be
+    replayed later. This is how frame ranges of a log are processed in parallel.
+    """
+
+    def __init__(
+        self, stats: Sequence[Statistic], *, timing: bool = False, collect: bool = False
+    ) -> None:
+        self.stats = list(stats)
+        self.timing = timing
+        self.records: list[list[tuple[int, Any]]] | None = (
+            [[] for _ in self.stats] if collect else None
+        )
+        self.frames = 0
+        # Seconds spent iterating over frames (including the steps below), per statistic, per
+        # decoded representation and replaying collected records.
+        self.loop_seconds = 0.0
+        self.stat_seconds: dict[str, float] = defaultdict(float)
+        self.decode_seconds: dict[str, float] = defaultdict(float)
+        self.decode_counts: dict[str, int] = defaultdict(int)
+        self.replay_seconds = 0.0
+
+    def feed(
+        self, frame: bhlogs.Frame, frame_idx: int, positions: Iterable[int] | None = None
+    ) -> None:
+        """Dispatch a frame to the statistics (by default all of them) whose dependencies it meets.
+
+        `positions` restricts the dispatch to the statistics at these positions in `stats`.
+        """
+        self.frames += 1
+        thread = frame.thread
+        present: dict[str, bool] = {}
+        decoded: dict[str, bhlogs.Record] = {}
+        annotated: bool | None = None
+
+        for pos in range(len(self.stats)) if positions is None else positions:
+            stat = self.stats[pos]
+            if stat.required_threads is not None and thread not in stat.required_threads:
+                continue
+            if stat.requires_annotations:
+                if annotated is None:
+                    annotated = bool(frame.annotations)
+                if not annotated:
+                    continue
+            names = stat.required_representations
+            if not self._contains(frame, names, present):
+                continue
+            for name in names:
+                if name not in decoded:
+                    decoded[name] = self._decode(frame, name)
+            self._dispatch(pos, frame, frame_idx, decoded)
+
+    @staticmethod
+    def _contains(frame: bhlogs.Frame, names: Iterable[str], present: dict[str, bool]) -> bool:
+        """Whether the frame contains all representations, caching lookups in `present`."""
+        for name in names:
+            if name not in present:
+                present[name] = name in frame
+            if not present[name]:
+                return False
+        return True
+
+    def _dispatch(
+        self, pos: int, frame: bhlogs.Frame, frame_idx: int, decoded: dict[str, bhlogs.Record]
+    ) -> None:
+        """Process the frame with the statistic at `pos`, or collect its record."""
+        stat = self.stats[pos]
+        start = time.perf_counter() if self.timing else 0.0
+        if self.records is None:
+            stat.process(frame, frame_idx, decoded)
+        else:
+            record = stat.extract(frame, frame_idx, decoded)
+            if record is not None:
+                self.records[pos].append((frame_idx, record))
+        if self.timing:
+            self.stat_seconds[stat.__class__.__name__] += time.perf_counter() - start
+
+    def _decode(self, frame: bhlogs.Frame, name: str) -> bhlogs.Record:
+        self.decode_counts[name] += 1
+        if not self.timing:
+            return frame[name]
+        start = time.perf_counter()
+        record = frame[name]
+        self.decode_seconds[name] += time.perf_counter() - start
+        return record
+
+    def replay(self, parts: Sequence[Engine]) -> None:
+        """Advance the statistics with the records collected by engines for consecutive ranges.
+
+        Records are replayed frame by frame and, within a frame, in the order of `stats`, so output
+        of statistics sharing a console is interleaved as in a sequential run.
+        """
+        start = time.perf_counter()
+        streams = [
+            [(frame_idx, pos, record) for frame_idx, record in records]
+            for part in parts
+            for pos, records in enumerate(part.records or [])
+        ]
+        for frame_idx, pos, record in heapq.merge(*streams, key=lambda item: item[:2]):
+            self.stats[pos].replay(frame_idx, record)
+        self.replay_seconds += time.perf_counter() - start
+
+    def merge(self, other: Engine) -> None:
+        """Add the counters of another engine (e.g. to sum timings over several logs)."""
+        self.frames += other.frames
+        self.loop_seconds += other.loop_seconds
+        self.replay_seconds += other.replay_seconds
+        for name, seconds in other.stat_seconds.items():
+            self.stat_seconds[name] += seconds
+        for name, seconds in other.decode_seconds.items():
+            self.decode_seconds[name] += seconds
+        for name, count in other.decode_counts.items():
+            self.decode_counts[name] += count
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Engines returned from range workers only carry records and counters back.
+        state = self.__dict__.copy()
+        state["stats"] = []
+        return state
+
+    def timing_table(self, wall_seconds: float) -> Table:
+        """Per-statistic and per-representation time; the rest is reading frames from the log.
+
+        Times of parallel frame ranges are summed, so they may add up to more than `wall_seconds`.
+        """
+        total = self.loop_seconds + self.replay_seconds
+        table = Table(title=f"Timing ({self.frames} frames dispatched)")
+        table.add_column("Step")
+        table.add_column("Calls", justify="right")
+        table.add_column("Seconds", justify="right")
+        table.add_column("Share", justify="right")
+
+        def add(step: str, calls: str, seconds: float) -> None:
+            share = f"{seconds / total:.1%}" if total > 0 else "-"
+            table.add_row(step, calls, f"{seconds:.3f}", share)
+
+        for name, seconds in sorted(self.decode_seconds.items(), key=lambda item: -item[1]):
+            add(f"decode {name}", str(self.decode_counts[name]), seconds)
+        for name, seconds in sorted(self.stat_seconds.items(), key=lambda item: -item[1]):
+            add(name, "", seconds)
+        accounted = sum(self.decode_seconds.values()) + sum(self.stat_seconds.values())
+        add("read frames / dispatch", "", max(self.loop_seconds - accounted, 0.0))
+        if self.replay_seconds:
+            add("replay ranges", "", self.replay_seconds)
+        add("total", "", total)
+        table.add_row("wall clock", "", f"{wall_seconds:.3f}", "")
+        return table
+
+
+def run_statistics(
+    log_path: Path,
+    stats: Sequence[Statistic],
+    *,
+    use_index: bool = True,
+    wrap: Callable[[Iterable[bhlogs.Frame]], Iterable[bhlogs.Frame]] | None = None,
+    engine: Engine | None = None,
+) -> Engine:
+    """Feed the frames of a log to the statistics in a single pass.
+
+    With an up-to-date frame index, each statistic only receives the frames matching its declared
+    thread and representations, logs without any matching frame are not opened at all and
+    iteration stops after the last matching frame. Without one, every frame is offered to every
+    statistic and the index is built on the way (and saved if `use_index` is set).
+
+    `wrap` may wrap the frame iterator, e.g. with a progress bar. Returns the engine (pass one in to
+    choose its options). Raises `RuntimeError` if the log cannot be parsed.
+    """
+    if engine is None:
+        engine = Engine(stats)
+    start = time.perf_counter()
+    try:
+        index = FrameIndex.load(log_path) if use_index else None
+
+        if index is None:
+            builder = IndexBuilder() if use_index else None
+            log = bhlogs.Log(str(log_path))
+            for frame_idx, frame in enumerate(wrap(log) if wrap else log):
+                if builder is not None:
+                    builder.add(frame)
+                engine.feed(frame, frame_idx)
+            if builder is not None:
+                builder.finish().save(log_path)
+            return engine
+
+        masks = [index.mask_for(stat) for stat in engine.stats]
+        wanted = np.logical_or.reduce(masks) if masks else np.zeros(len(index), dtype=bool)
+        if not wanted.any():
+            return engine
+        _feed_range(engine, log_path, masks, 0, int(np.flatnonzero(wanted)[-1]) + 1, wrap)
+        return engine
+    finally:
+        engine.loop_seconds += time.perf_counter() - start
+
+
+def _feed_range(  # noqa: PLR0913
+    engine: Engine,
+    log_path: Path,
+    masks: list[np.ndarray] | None,
+    start: int,
+    stop: int,
+    wrap: Callable[[Iterable[bhlogs.Frame]], Iterable[bhlogs.Frame]] | None = None,
+) -> None:
+    """Feed frames `start` to `stop` (exclusive), restricted to `masks` if given."""
+    log = bhlogs.Log(str(log_path))
+    for frame_idx, frame in enumerate(wrap(log) if wrap else log):
+        # Frames before the range only have their message headers read.
+        if frame_idx < start:
+            continue
+        if frame_idx >= stop:
+            break
+        if masks is None:
+            engine.feed(frame, frame_idx)
+            continue
+        positions = [pos for pos, mask in enumerate(masks) if mask[frame_idx]]
+        if positions:
+            engine.feed(frame, frame_idx, positions)
+
+
+def frame_ranges(
+    log_path: Path, stats: Sequence[Statistic], n_ranges: int, *, use_index: bool = True
+) -> list[tuple[int, int]]:
+    """Split a log into at most `n_ranges` consecutive frame ranges of similar work.
+
+    With a frame index, the frames the statistics need are split evenly (frames nobody needs are
+    not counted). Otherwise, the frames are split evenly, which requires loading the log once.
+    """
+    index = FrameIndex.load(log_path) if use_index else None
+    if index is None:
+        n_frames = len(bhlogs.Log(str(log_path)))
+        bounds = np.linspace(0, n_frames, n_ranges + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    masks = [index.mask_for(stat) for stat in stats]
+    wanted = np.flatnonzero(np.logical_or.reduce(masks)) if masks else np.array([], dtype=int)
+    chunks = [chunk for chunk in np.array_split(wanted, n_ranges) if len(chunk)]
+    if not chunks:
+        return []
+    # Ranges are contiguous; each one ends where the next one's first needed frame is.
+    starts = [0] + [int(chunk[0]) for chunk in chunks[1:]]
+    stops = [*starts[1:], int(wanted[-1]) + 1]
+    return list(zip(starts, stops))
+
+
+def extract_range(  # noqa: PLR0913
+    log_path: Path,
+    stats: Sequence[Statistic],
+    start: int,
+    stop: int,
+    *,
+    use_index: bool = True,
+    timing: bool = False,
+) -> Engine:
+    """Worker function: collect the records of the statistics for frames `start` to `stop`."""
+    engine = Engine(stats, timing=timing, collect=True)
+    begin = time.perf_counter()
+    index = FrameIndex.load(log_path) if use_index else None
+    masks = None if index is None else [index.mask_for(stat) for stat in stats]
+    _feed_range(engine, log_path, masks, start, stop)
+    engine.loop_seconds += time.perf_counter() - begin
+    return engine
+
+
+def run_statistics_parallel(  # noqa: PLR0913
+    log_path: Path,
+    stats: Sequence[Statistic],
+    executor: Executor,
+    n_ranges: int,
+    *,
+    use_index: bool = True,
+    engine: Engine | None = None,
+) -> Engine:
+    """Feed the frames of a log to the statistics, extracting frame ranges in parallel.
+
+    Each worker opens the log, skips to its range and collects the records the statistics'
+    `extract` methods return. The records are then replayed in frame order through the statistics
+    in this process, so the state carried across range boundaries (previous motion, behavior graph,
+    angle buffer, ...) and thus hits and console output are exactly those of a sequential run.
+
+    Raises `RuntimeError` if the log cannot be parsed.
+    """
+    if engine is None:
+        engine = Engine(stats)
+    ranges = frame_ranges(log_path, engine.stats, n_ranges, use_index=use_index)
+    futures = [
+        executor.submit(
+            extract_range,
+            log_path,
+            engine.stats,
+            start,
+            stop,
+            use_index=use_index,
+            timing=engine.timing,
+        )
+        for start, stop in ranges
+    ]
+    parts = [future.result() for future in futures]
+    for part in parts:
+        engine.merge(part)
+    engine.replay(parts)
+    return engine
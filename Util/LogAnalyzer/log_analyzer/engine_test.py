@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from io import StringIO
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+from rich.console import Console
+
+from .engine import Engine
+from .statistics.motion_oscillation import MotionOscillation
+from .statistics.walking_oscillation import WalkingOscillation
+
+
+class _Frame:
+    """Stand-in for a log frame holding already decoded records."""
+
+    def __init__(self, thread: str, records: dict[str, Any]) -> None:
+        self.thread = thread
+        self.annotations = []
+        self._records = records
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._records
+
+    def __getitem__(self, name: str) -> Any:  # noqa: ANN401
+        return self._records[name]
+
+
+def _synthetic_frames(n: int) -> list[_Frame]:
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(n):
+        records: dict[str, Any] = {}
+        if rng.random() < 0.8:
+            records["MotionRequest"] = SimpleNamespace(motion=int(rng.integers(1, 4)))
+        if rng.random() < 0.7:
+            walking_to = SimpleNamespace(x=float(rng.normal()), y=float(rng.normal()))
+            records["BehaviorStatus"] = SimpleNamespace(walkingTo=walking_to)
+        frames.append(_Frame("Cognition" if rng.random() < 0.9 else "Motion", records))
+    return frames
+
+
+def _stats() -> tuple[Console, list[Any]]:
+    console = Console(file=StringIO(), record=True, width=200)
+    stats = [
+        MotionOscillation(console=console, threshold=10, grouping_threshold=20, quiet=False),
+        WalkingOscillation(console=console, buffer_length=8, quiet=False),
+    ]
+    return console, stats
+
+
+def test_replay_equivalence() -> None:
+    frames = _synthetic_frames(3000)
+
+    console, stats = _stats()
+    engine = Engine(stats)
+    for frame_idx, frame in enumerate(frames):
+        engine.feed(frame, frame_idx)  # pyright: ignore[reportArgumentType]
+    expected_hits = [stat.hits for stat in stats]
+    expected_output = console.export_text()
+    assert all(expected_hits)
+
+    for bounds in ([0, 3000], [0, 1, 1500, 3000], [0, 7, 100, 101, 2999, 3000]):
+        console, stats = _stats()
+        parts = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            part = Engine(stats, collect=True)
+            for frame_idx in range(start, stop):
+                part.feed(frames[frame_idx], frame_idx)  # pyright: ignore[reportArgumentType]
+            parts.append(part)
+        Engine(stats).replay(parts)
+        assert [stat.hits for stat in stats] == expected_hits
+        assert console.export_text() == expected_output
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pybh.logs as bhlogs
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+    from .statistics.statistic import Statistic
+
+INDEX_SUFFIX = ".index.npz"
+INDEX_VERSION = 1
+
+
+class FrameIndex:
+    """Per-frame thread and representation membership of a log.
+
+    Iterating a `pybh.logs.Log` only reads message headers; the expensive part is deserializing
+    representations and calling into every statistic for every frame. The index records for every
+    frame its thread, which representations it contains and whether it carries annotations, so
+    statistics can be handed only the frames they declared interest in. It is stored next to the
+    log (`<log>.index.npz`) and invalidated when the log's size or modification time changes.
+    """
+
+    def __init__(
+        self,
+        threads: Sequence[str],
+        representations: Sequence[str],
+        frame_threads: np.ndarray,
+        frame_representations: np.ndarray,
+        annotated: np.ndarray,
+    ) -> None:
+        self.threads = list(threads)
+        self.representations = list(representations)
+        self.frame_threads = frame_threads
+        self.frame_representations = frame_representations
+        self.annotated = annotated
+
+    def __len__(self) -> int:
+        return len(self.frame_threads)
+
+    @staticmethod
+    def path_for(log_path: Path) -> Path:
+        return log_path.with_name(log_path.name + INDEX_SUFFIX)
+
+    @staticmethod
+    def _fingerprint(log_path: Path) -> list[int]:
+        stat = log_path.stat()
+        return [INDEX_VERSION, stat.st_size, stat.st_mtime_ns]
+
+    @classmethod
+    def load(cls, log_path: Path) -> FrameIndex | None:
+        """Load the index of a log, or return None if it is missing or stale."""
+        index_path = cls.path_for(log_path)
+        if not index_path.exists():
+            return None
+        with np.load(index_path) as data:
+            if data["fingerprint"].tolist() != cls._fingerprint(log_path):
+                return None
+            n_frames = len(data["frame_threads"])
+            return cls(
+                threads=data["threads"].tolist(),
+                representations=data["representations"].tolist(),
+                frame_threads=data["frame_threads"],
+                frame_representations=np.unpackbits(data["frame_representations"], axis=1)[
+                    :n_frames, : len(data["representations"])
+                ].astype(bool),
+                annotated=data["annotated"],
+            )
+
+    def save(self, log_path: Path) -> None:
+        np.savez(
+            self.path_for(log_path),
+            fingerprint=np.array(self._fingerprint(log_path), dtype=np.int64),
+            threads=np.array(self.threads, dtype=np.str_),
+            representations=np.array(self.representations, dtype=np.str_),
+            frame_threads=self.frame_threads,
+            frame_representations=np.packbits(self.frame_representations, axis=1),
+            annotated=self.annotated,
+        )
+
+    @classmethod
+    def build(cls, log_path: Path) -> FrameIndex:
+        """Build the index by iterating over the log once (no representation is deserialized)."""
+        builder = IndexBuilder()
+        for frame in bhlogs.Log(str(log_path)):
+            builder.add(frame)
+        return builder.finish()
+
+    @classmethod
+    def load_or_build(cls, log_path: Path) -> FrameIndex:
+        index = cls.load(log_path)
+        if index is None:
+            index = cls.build(log_path)
+            index.save(log_path)
+        return index
+
+    def mask(
+        self,
+        threads: Sequence[str] | None = None,
+        representations: Sequence[str] = (),
+        annotations: bool = False,
+    ) -> np.ndarray:
+        """Boolean mask of frames in one of `threads` that contain all `representations`."""
+        mask = np.ones(len(self), dtype=bool)
+        if threads is not None:
+            ids = [self.threads.index(t) for t in threads if t in self.threads]
+            mask &= np.isin(self.frame_threads, ids)
+        for representation in representations:
+            if representation not in self.representations:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.frame_representations[:, self.representations.index(representation)]
+        if annotations:
+            mask &= self.annotated
+        return mask
+
+    def mask_for(self, stat: Statistic) -> np.ndarray:
+        return self.mask(
+            threads=stat.required_threads,
+            representations=stat.required_representations,
+            annotations=stat.requires_annotations,
+        )
+
+
+class IndexBuilder:
+    """Collects the index while frames are iterated anyway."""
+
+    def __init__(self) -> None:
+        self._threads: dict[str, int] = {}
+        self._representations: dict[str, int] = {}
+        self._frame_threads: list[int] = []
+        self._rows: list[int] = []
+        self._cols: list[int] = []
+        self._annotated: list[bool] = []
+
+    def add(self, frame: bhlogs.Frame) -> None:
+        frame_idx = len(self._frame_threads)
+        self._frame_threads.append(self._threads.setdefault(frame.thread, len(self._threads)))
+        for representation in frame.representations:
+            self._rows.append(frame_idx)
+            self._cols.append(
+                self._representations.setdefault(representation, len(self._representations))
+            )
+        self._annotated.append(bool(frame.annotations))
+
+    def finish(self) -> FrameIndex:
+        frame_representations = np.zeros(
+            (len(self._frame_threads), len(self._representations)), dtype=bool
+        )
+        frame_representations[self._rows, self._cols] = True
+        return FrameIndex(
+            threads=list(self._threads),
+            representations=list(self._representations),
+            frame_threads=np.array(self._frame_threads, dtype=np.uint8),
+            frame_representations=frame_representations,
+            annotated=np.array(self._annotated, dtype=bool),
+        )
+
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from typing_extensions import Self
+
+    from .statistics.statistic import Statistic
+
+CACHE_NAME = ".log_analyzer_reports.sqlite"
+CACHE_VERSION = 1
+# Bytes hashed at the start and at the end of a log for its fingerprint.
+SAMPLE_SIZE = 1 << 20
+
+
+def fingerprint(log_path: Path) -> str:
+    """Fingerprint of the content of a log: its size and a hash of its first and last MiB.
+
+    Unlike the modification time, this survives copying an archive of logs. Hashing whole logs
+    would take as long as reading them, which is what the cache is meant to avoid.
+    """
+    size = log_path.stat().st_size
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with log_path.open("rb") as f:
+        digest.update(f.read(SAMPLE_SIZE))
+        if size > SAMPLE_SIZE:
+            f.seek(max(size - SAMPLE_SIZE, SAMPLE_SIZE))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """Results of the report command, stored in a SQLite database in the log root.
+
+    There is one entry per log and statistic. It is valid as long as the fingerprint of the log,
+    the version and the parameters of the statistic are unchanged and the report it refers to
+    still exists. Paths are stored relative to the root, so the archive can be moved.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.path = root / CACHE_NAME
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(self.path)
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_VERSION:
+            self._db.execute("DROP TABLE IF EXISTS reports")
+            self._db.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            " log TEXT, statistic TEXT, fingerprint TEXT, key TEXT, hits INTEGER, report TEXT,"
+            " PRIMARY KEY (log, statistic))"
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    @staticmethod
+    def key(stat: Statistic) -> str:
+        return json.dumps(
+            {"version": stat.version, "parameters": stat.parameters()}, sort_keys=True
+        )
+
+    def _relative(self, path: Path) -> str:
+        return str(path.relative_to(self.root)) if path != self.root else path.name
+
+    def lookup(self, log_path: Path, log_fingerprint: str, stat: Statistic) -> int | None:
+        """Return the cached hits of a statistic on a log, or None if there is no valid entry."""
+        row = self._db.execute(
+            "SELECT fingerprint, key, hits, report FROM reports WHERE log = ? AND statistic = ?",
+            (self._relative(log_path), stat.__class__.__name__),
+        ).fetchone()
+        if (
+            row is None
+            or row[0] != log_fingerprint
+            or row[1] != self.key(stat)
+            or not (self.root / row[3]).exists()
+        ):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[2]
+
+    def store(
+        self, log_path: Path, log_fingerprint: str, stat: Statistic, hits: int, report: Path
+    ) -> None:
+        """Record the result of a statistic on a log and remove its previous, outdated report."""
+        log = self._relative(log_path)
+        name = stat.__class__.__name__
+        row = self._db.execute(
+            "SELECT report FROM reports WHERE log = ? AND statistic = ?", (log, name)
+        ).fetchone()
+        if row is not None and row[0] != self._relative(report):
+            (self.root / row[0]).unlink(missing_ok=True)
+        self._db.execute(
+            "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)",
+            (log, name, log_fingerprint, self.key(stat), hits, self._relative(report)),
+        )
+        self._db.commit()
@@ -17,3 +17,66 @@ class Angle(Statistic):
         if angle < -np.pi:
             return angle + 2 * np.pi
         return angle
+
+    @staticmethod
+    def _normalize_array(angles: np.ndarray) -> np.ndarray:
+        """Apply `_normalize` to each element of `angles`, rounding exactly like it.
+
+        `_normalize` combines NumPy scalars with Python floats. Since NumPy 2, this keeps float32
+        scalars in float32; before, they were promoted to float64. The same dtype is used here.
+        """
+        dtype = (angles.dtype.type(0) - 0.0).dtype
+        angle = angles.astype(dtype)
+        pi = dtype.type(np.pi)
+        two_pi = dtype.type(2 * np.pi)
+        outside = ~((-pi <= angle) & (angle < pi))
+        if not outside.any():
+            return angle
+
+        wrapped = angle[outside]
+        turns = np.trunc(wrapped / two_pi).astype(np.float64) * 2 * np.pi
+        wrapped = wrapped - turns.astype(dtype)
+        wrapped = np.where(
+            wrapped >= pi, wrapped - two_pi, np.where(wrapped < -pi, wrapped + two_pi, wrapped)
+        )
+        angle[outside] = wrapped
+        return angle
+
+    @staticmethod
+    def _rolling_hits(
+        values: np.ndarray,
+        buffer_length: int,
+        threshold: float,
+        restarts: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Indices of the updates after which the mean of a ring buffer exceeds `threshold`.
+
+        This is the batch counterpart of writing each value into a float32 ring buffer of
+        `buffer_length` zeros and comparing `np.mean` of the buffer to `threshold`. The buffer is
+        zeroed again before updates marked in `restarts`. Means are computed from float64 running
+        sums. The few means that are within rounding error of `threshold` are recomputed with
+        `np.mean` over the reconstructed buffer, so the result is identical.
+        """
+        n = len(values)
+        updates = np.arange(n)
+        start = (
+            np.zeros(n, dtype=np.int64)
+            if restarts is None
+            else np.maximum.accumulate(np.where(restarts, updates, 0))
+        )
+        first = np.maximum(start, updates - buffer_length + 1)
+        sums = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+        means = (sums[updates + 1] - sums[first]) / buffer_length
+
+        # Bound on the rounding errors of the float32 mean and of the running sums (values <= pi).
+        tolerance = np.pi * (
+            2 * buffer_length * np.finfo(np.float32).eps
+            + n * n * np.finfo(np.float64).eps / buffer_length
+        )
+        hits = means > threshold + tolerance
+        for update in np.flatnonzero(np.abs(means - threshold) <= tolerance):
+            buffer = np.zeros(buffer_length, dtype=np.float32)
+            written = np.arange(first[update], update + 1)
+            buffer[written % buffer_length] = values[written]
+            hits[update] = np.mean(buffer) > threshold
+        return np.flatnonzero(hits)
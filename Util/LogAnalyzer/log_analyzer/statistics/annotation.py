@@ -1,17 +1,21 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import pybh.logs
 
 from .statistic import Statistic
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     import pybh.logs as bhlogs
     from rich.console import Console
 
 
 class Annotation(Statistic):
+    requires_annotations = True
+
     def __init__(
         self,
         console: Console,
@@ -24,20 +28,33 @@ class Annotation(Statistic):
         self._ellipsis: bool = False
         self._grouping_threshold: int = grouping_threshold
 
-    def update(self, frame: bhlogs.Frame, frame_idx: int) -> None:
+    def parameters(self) -> dict[str, Any]:
+        return {"grouping_threshold": self._grouping_threshold}
+
+    def extract(
+        self, frame: bhlogs.Frame, frame_idx: int, representations: Mapping[str, bhlogs.Record]  # noqa: ARG002
+    ) -> tuple[str, list[tuple[str, str]]] | None:
+        if not hasattr(frame, "annotations") or not frame.annotations:
+            return None
+        annotations = [
+            (el.name, el.description)
+            for el in frame.annotations
+            if isinstance(el, pybh.logs.Annotation)
+        ]
+        return frame.thread, annotations
+
+    def replay(self, frame_idx: int, record: tuple[str, list[tuple[str, str]]]) -> None:
+        thread, annotations = record
         if (frame_idx - self._last_changed_frame) > self._grouping_threshold:
             self._ellipsis = True
-        if not hasattr(frame, "annotations") or not frame.annotations:
-            return
-
-        for el in frame.annotations:
-            if isinstance(el, pybh.logs.Annotation):
-                if not self.quiet:
-                    if self._ellipsis:
-                        self.console.print("...")
-                        self._ellipsis = False
-                    self.console.print(
-                        f"(frame {frame_idx:07} thread {frame.thread:9}): {el.name} - {el.description}"
-                    )
-                self.hits += 1
-                self._last_changed_frame = frame_idx
+
+        for name, description in annotations:
+            if not self.quiet:
+                if self._ellipsis:
+                    self.console.print("...")
+                    self._ellipsis = False
+                self.console.print(
+                    f"(frame {frame_idx:07} thread {thread:9}): {name} - {description}"
+                )
+            self.hits += 1
+            self._last_changed_frame = frame_idx
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from .statistic import Statistic
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     import pybh.logs as bhlogs
     from rich.console import Console
 
@@ -25,6 +27,9 @@ class _Node:
 
 
 class BehaviorOscillation(Statistic):
+    required_threads = ("Cognition",)
+    required_representations = ("ActivationGraph",)
+
     def __init__(
         self,
         console: Console,
@@ -41,6 +46,9 @@ class BehaviorOscillation(Statistic):
         self._threshold: int = threshold
         self._grouping_threshold = grouping_threshold
 
+    def parameters(self) -> dict[str, Any]:
+        return {"threshold": self._threshold, "grouping_threshold": self._grouping_threshold}
+
     def _update(self, graph: list[_Node], frame_idx: int) -> None:
         for node, last_node in zip(graph, self._last_graph):
             if last_node != node:
@@ -61,12 +69,14 @@ class BehaviorOscillation(Statistic):
         self._n_updates += 1
         self._last_graph = graph
 
-    def update(self, frame: bhlogs.Frame, frame_idx: int) -> None:
-        if frame.thread != "Cognition" or "ActivationGraph" not in frame:
-            return
-        activation_graph = frame["ActivationGraph"]
+    def extract(
+        self, frame: bhlogs.Frame, frame_idx: int, representations: Mapping[str, bhlogs.Record]  # noqa: ARG002
+    ) -> list[_Node] | None:
+        activation_graph = representations["ActivationGraph"]
         if not hasattr(activation_graph, "graph"):
-            return
+            return None
+
+        return [_Node(node) for node in activation_graph.graph]  # pyright: ignore[reportGeneralTypeIssues]
 
-        graph: list[_Node] = [_Node(node) for node in activation_graph.graph]  # pyright: ignore[reportGeneralTypeIssues]
-        self._update(graph=graph, frame_idx=frame_idx)
+    def replay(self, frame_idx: int, record: list[_Node]) -> None:
+        self._update(graph=record, frame_idx=frame_idx)
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from .statistic import Statistic
 from .util.motion import Motion
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     import pybh.logs as bhlogs
     from rich.console import Console
 
 
 class MotionOscillation(Statistic):
+    required_threads = ("Cognition",)
+    required_representations = ("MotionRequest",)
+
     def __init__(
         self,
         console: Console,
@@ -27,6 +32,9 @@ class MotionOscillation(Statistic):
         self._threshold: int = threshold
         self._grouping_threshold = grouping_threshold
 
+    def parameters(self) -> dict[str, Any]:
+        return {"threshold": self._threshold, "grouping_threshold": self._grouping_threshold}
+
     def _update(self, motion_type: Motion, frame_idx: int) -> None:
         if self._last_motion_type != motion_type:
             if (self._n_updates - self._last_changed_update) < self._threshold:
@@ -44,12 +52,14 @@ class MotionOscillation(Statistic):
         self._last_motion_type = motion_type
         self._n_updates += 1
 
-    def update(self, frame: bhlogs.Frame, frame_idx: int) -> None:
-        if frame.thread != "Cognition" or "MotionRequest" not in frame:
-            return
-        motion_request = frame["MotionRequest"]
+    def extract(
+        self, frame: bhlogs.Frame, frame_idx: int, representations: Mapping[str, bhlogs.Record]  # noqa: ARG002
+    ) -> Motion | None:
+        motion_request = representations["MotionRequest"]
         if not hasattr(motion_request, "motion"):
-            return
+            return None
+
+        return Motion(motion_request.motion)
 
-        motion_type: Motion = Motion(motion_request.motion)
-        self._update(motion_type=motion_type, frame_idx=frame_idx)
+    def replay(self, frame_idx: int, record: Motion) -> None:
+        self._update(motion_type=record, frame_idx=frame_idx)
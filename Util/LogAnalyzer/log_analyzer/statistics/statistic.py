@@ -1,21 +1,82 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, ClassVar
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     import pybh.logs as bhlogs
     from rich.console import Console
 
 
 class Statistic:
+    # Declared inputs. The frame index only hands `update` frames of one of these threads (None:
+    # all threads) that contain all of these representations and, if required, annotations.
+    required_threads: ClassVar[tuple[str, ...] | None] = None
+    required_representations: ClassVar[tuple[str, ...]] = ()
+    requires_annotations: ClassVar[bool] = False
+    # Increment when a change alters the results, so that cached reports are recomputed.
+    version: ClassVar[int] = 1
+
     def __init__(self, console: Console, *args, quiet: bool = True, **kwargs) -> None:
         self.console = console
         self.hits = 0
         self.quiet = quiet
 
+    def parameters(self) -> dict[str, Any]:
+        """The constructor parameters that affect the results (part of the report cache key)."""
+        return {}
+
+    def accepts(self, frame: bhlogs.Frame) -> bool:
+        """Whether the frame meets the declared dependencies of this statistic."""
+        if self.required_threads is not None and frame.thread not in self.required_threads:
+            return False
+        if self.requires_annotations and not frame.annotations:
+            return False
+        return all(name in frame for name in self.required_representations)
+
     def update(self, frame: bhlogs.Frame, frame_idx: int) -> None:
+        """Process a frame on its own (the engine calls `process` with shared decoded records)."""
+        if self.accepts(frame):
+            self.process(
+                frame, frame_idx, {name: frame[name] for name in self.required_representations}
+            )
+
+    def process(
+        self, frame: bhlogs.Frame, frame_idx: int, representations: Mapping[str, bhlogs.Record]
+    ) -> None:
+        """Process a frame that meets the declared dependencies.
+
+        Args:
+            frame (bhlogs.Frame): The frame.
+            frame_idx (int): The index of the frame in the log.
+            representations (Mapping[str, bhlogs.Record]): Decoded records, containing at least
+                the required representations.
+        """
+        record = self.extract(frame, frame_idx, representations)
+        if record is not None:
+            self.replay(frame_idx, record)
+
+    def extract(
+        self, frame: bhlogs.Frame, frame_idx: int, representations: Mapping[str, bhlogs.Record]
+    ) -> Any:  # noqa: ANN401
+        """Reduce a frame to the picklable data `replay` needs (None: nothing to replay).
+
+        Must not depend on the state of the statistic, so that frame ranges of a log can be
+        extracted in parallel and replayed in order afterwards.
+        """
         raise NotImplementedError
 
+    def replay(self, frame_idx: int, record: Any) -> None:  # noqa: ANN401
+        """Advance the state of the statistic with a record returned by `extract`."""
+        raise NotImplementedError
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Consoles cannot be pickled; workers extracting frame ranges do not print.
+        state = self.__dict__.copy()
+        state["console"] = None
+        return state
+
     def update_hits(self) -> int:
         self.hits += 1
         return self.hits
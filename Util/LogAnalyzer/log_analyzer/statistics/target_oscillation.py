@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
@@ -8,11 +8,19 @@ from .angle import Angle
 from .util.motion import Motion
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     import pybh.logs as bhlogs
     from rich.console import Console
 
+# Record of a frame in which the robot is not walking to the ball.
+_RESET = "reset"
+
 
 class TargetOscillation(Angle):
+    required_threads = ("Cognition",)
+    required_representations = ("MotionRequest", "RobotPose")
+
     def __init__(
         self,
         console: Console,
@@ -32,6 +40,13 @@ class TargetOscillation(Angle):
         self._last_hit_update: int = -1
         self._last_target_angle: float = 0.0
 
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "buffer_length": self._buffer_length,
+            "threshold": float(self.threshold),
+            "grouping_threshold": self._grouping_threshold,
+        }
+
     def _update(self, target_direction: float, rotation: float, frame_idx: int) -> None:
         target_angle = self._normalize(target_direction + rotation)
         self._buffer[self._n_updates % self._buffer_length] = np.abs(
@@ -58,19 +73,50 @@ class TargetOscillation(Angle):
         self._buffer = np.zeros((self._buffer_length), dtype=np.float32)
         self._last_target_angle = 0.0
 
-    def update(self, frame: bhlogs.Frame, frame_idx: int) -> None:
-        if frame.thread != "Cognition" or "MotionRequest" not in frame or "RobotPose" not in frame:
-            return
-
-        motion_request = frame["MotionRequest"]
-        robot_pose = frame["RobotPose"]
+    def batch_hits(
+        self,
+        target_direction: np.ndarray,
+        rotation: np.ndarray,
+        walking_to_ball: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Vectorized `_update` and `reset` over all frames of a log.
+
+        Args:
+            target_direction (np.ndarray): `MotionRequest.targetDirection` per frame.
+            rotation (np.ndarray): `RobotPose.rotation` per frame.
+            walking_to_ball (np.ndarray | None): Whether the motion request of a frame is
+                `WALK_TO_BALL_AND_KICK`. Other frames reset the statistic. Defaults to all frames.
+
+        Returns:
+            np.ndarray: The indices of the frames that are hits, as counted on a new statistic.
+        """
+        target_direction = np.asarray(target_direction, dtype=np.float64)
+        rotation = np.asarray(rotation, dtype=np.float64)
+        frames = (
+            np.arange(len(target_direction))
+            if walking_to_ball is None
+            else np.flatnonzero(walking_to_ball)
+        )
+        target_angle = self._normalize_array(target_direction[frames] + rotation[frames])
+        # The previous angle is 0 initially and after a reset.
+        restarts = np.diff(frames, prepend=-1) > 1
+        previous = np.concatenate(([0.0], target_angle[:-1]))
+        previous[restarts] = 0.0
+        values = np.abs(self._normalize_array(previous - target_angle)).astype(np.float32)
+        return frames[self._rolling_hits(values, self._buffer_length, self.threshold, restarts)]
+
+    def extract(
+        self, frame: bhlogs.Frame, frame_idx: int, representations: Mapping[str, bhlogs.Record]  # noqa: ARG002
+    ) -> tuple[float, float] | str | None:
+        motion_request = representations["MotionRequest"]
+        robot_pose = representations["RobotPose"]
 
         if not (
             hasattr(motion_request, "targetDirection")
             and hasattr(motion_request, "motion")
             and hasattr(robot_pose, "rotation")
         ):
-            return
+            return None
 
         target_direction = motion_request.targetDirection
         if not isinstance(target_direction, float):
@@ -83,7 +129,13 @@ class TargetOscillation(Angle):
             raise TypeError(msg)
 
         if motion_type != Motion.WALK_TO_BALL_AND_KICK:
+            return _RESET
+
+        return target_direction, rotation
+
+    def replay(self, frame_idx: int, record: tuple[float, float] | str) -> None:
+        if record == _RESET:
             self.reset()
             return
-
+        target_direction, rotation = record
         self._update(target_direction=target_direction, rotation=rotation, frame_idx=frame_idx)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import numpy as np
+from rich.console import Console
+
+from .target_oscillation import TargetOscillation
+
+
+def _sequential_hits(
+    stats: TargetOscillation,
+    target_direction: np.ndarray,
+    rotation: np.ndarray,
+    walking_to_ball: np.ndarray,
+) -> list[int]:
+    hits = []
+    for i, (direction, angle, active) in enumerate(
+        zip(target_direction.tolist(), rotation.tolist(), walking_to_ball.tolist())
+    ):
+        if not active:
+            stats.reset()
+            continue
+        before = stats.hits
+        stats._update(direction, angle, i)
+        if stats.hits > before:
+            hits.append(i)
+    return hits
+
+
+def test_batch_equivalence() -> None:
+    console = Console()
+    rng = np.random.default_rng(0)
+    n = 5000
+    target_direction = rng.uniform(-np.pi, np.pi, n) * (rng.random(n) < 0.3)
+    rotation = rng.normal(scale=2 * np.pi, size=n)
+    walking_to_ball = rng.random(n) < 0.9
+    for buffer_length in (1, 2, 60):
+        for threshold in (0.0, np.deg2rad(10), np.deg2rad(90)):
+            stats = TargetOscillation(
+                buffer_length=buffer_length, threshold=threshold, console=console
+            )
+            batch = TargetOscillation(
+                buffer_length=buffer_length, threshold=threshold, console=console
+            )
+            expected = _sequential_hits(stats, target_direction, rotation, walking_to_ball)
+            assert (
+                batch.batch_hits(target_direction, rotation, walking_to_ball).tolist() == expected
+            )
+            assert stats.hits == len(expected)
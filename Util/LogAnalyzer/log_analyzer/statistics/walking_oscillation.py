@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
 from .angle import Angle
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     import pybh.logs as bhlogs
     from rich.console import Console
 
 
 class WalkingOscillation(Angle):
+    required_threads = ("Cognition",)
+    required_representations = ("BehaviorStatus",)
+
     def __init__(
         self,
         console: Console,
@@ -27,6 +32,9 @@ class WalkingOscillation(Angle):
         self._n_updates = 0
         self._last_walking_to = (0.0, 0.0)
 
+    def parameters(self) -> dict[str, Any]:
+        return {"buffer_length": self._buffer_length, "threshold": float(self.threshold)}
+
     def _update(self, walking_to: tuple[float, float], frame_idx: int) -> None:
         angles = np.arctan2(
             (self._last_walking_to[0], walking_to[0]),
@@ -46,11 +54,28 @@ class WalkingOscillation(Angle):
                 self.console.print(f"{frame_idx}: mean angular velocity: {np.rad2deg(mean):.3f}")
         self._n_updates += 1
 
-    def update(self, frame: bhlogs.Frame, frame_idx: int) -> None:
-        if frame.thread != "Cognition" or "BehaviorStatus" not in frame:
-            return
-        behavior_status = frame["BehaviorStatus"]
+    def batch_hits(self, walking_to: np.ndarray) -> np.ndarray:
+        """Vectorized `_update` over all updates of a log.
+
+        Args:
+            walking_to (np.ndarray): `BehaviorStatus.walkingTo` as `(y, x)` rows, one per update.
+
+        Returns:
+            np.ndarray: The indices of the updates that are hits, as counted on a new statistic.
+        """
+        walking_to = np.asarray(walking_to, dtype=np.float64).reshape(-1, 2)
+        points = np.concatenate(([(0.0, 0.0)], walking_to))
+        angles = np.arctan2(points[:, 0], points[:, 1], dtype=np.float32)
+        values = np.abs(self._normalize_array(angles[:-1] - angles[1:])).astype(np.float32)
+        return self._rolling_hits(values, self._buffer_length, self.threshold)
+
+    def extract(
+        self, frame: bhlogs.Frame, frame_idx: int, representations: Mapping[str, bhlogs.Record]  # noqa: ARG002
+    ) -> tuple[float, float] | None:
+        behavior_status = representations["BehaviorStatus"]
         if not hasattr(behavior_status, "walkingTo"):
-            return
-        walking_to = (behavior_status.walkingTo.y, behavior_status.walkingTo.x)  # pyright: ignore[reportAttributeAccessIssue]
-        self._update(walking_to=walking_to, frame_idx=frame_idx)
+            return None
+        return (behavior_status.walkingTo.y, behavior_status.walkingTo.x)  # pyright: ignore[reportAttributeAccessIssue]
+
+    def replay(self, frame_idx: int, record: tuple[float, float]) -> None:
+        self._update(walking_to=record, frame_idx=frame_idx)
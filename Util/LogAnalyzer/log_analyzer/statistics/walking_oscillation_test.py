@@ -32,3 +32,49 @@ def test_thresholds2() -> None:
         stats2._update((-i % 2, 1 - (i % 2) * 2), i)
     assert stats.hits == 3
     assert stats2.hits != 3
+
+
+def _sequential_hits(stats: WalkingOscillation, walking_to: np.ndarray) -> list[int]:
+    hits = []
+    for i, (y, x) in enumerate(walking_to.tolist()):
+        before = stats.hits
+        stats._update((y, x), i)
+        if stats.hits > before:
+            hits.append(i)
+    return hits
+
+
+def test_batch_thresholds() -> None:
+    console = Console()
+    cases = [
+        ([(i % 2, 1) for i in range(4)], np.deg2rad(45) / 2),
+        ([(-i % 2, 1 - (i % 2) * 2) for i in range(4)], np.deg2rad(135) / 2),
+    ]
+    for walking_to, threshold in cases:
+        for offset in (0, np.deg2rad(1) / 2):
+            stats = WalkingOscillation(
+                buffer_length=2, threshold=threshold + offset, console=console
+            )
+            batch = WalkingOscillation(
+                buffer_length=2, threshold=threshold + offset, console=console
+            )
+            points = np.array(walking_to, dtype=np.float64)
+            assert batch.batch_hits(points).tolist() == _sequential_hits(stats, points)
+
+
+def test_batch_equivalence() -> None:
+    console = Console()
+    rng = np.random.default_rng(0)
+    # Random walks mixed with jumps to the opposite side, so that angle differences wrap around.
+    points = rng.normal(size=(5000, 2)).cumsum(axis=0)
+    points[rng.random(5000) < 0.2] *= -1
+    points[rng.random(5000) < 0.05] = 0.0
+    for buffer_length in (1, 2, 20, 60):
+        for threshold in (0.0, np.deg2rad(10), np.deg2rad(45), np.deg2rad(90)):
+            stats = WalkingOscillation(
+                buffer_length=buffer_length, threshold=threshold, console=console
+            )
+            batch = WalkingOscillation(
+                buffer_length=buffer_length, threshold=threshold, console=console
+            )
+            assert batch.batch_hits(points).tolist() == _sequential_hits(stats, points)
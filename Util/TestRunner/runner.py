@@ -1,4 +1,5 @@
 import argparse
+import collections
 import math
 import os
 import multiprocessing
@@ -9,15 +10,34 @@ import platform
 import zlib
 import time
 import sys
-import psutil
 import csv
+import ctypes
 import logging
+import selectors
+import socket
+import struct
 from os.path import join as pjoin
 import signal
 from cmd_parser import parse_command, CommandParseError, unparse_command
 
-PROCESS_CHECK_DELAY = 3
+PROCESS_CHECK_DELAY = 3  # Polling interval where process and file events are not available
+TERMINATE_TIMEOUT = 10
+COMMAND_PORT_BASE = 12400  # SimRobot worker i listens for console commands on port COMMAND_PORT_BASE + i
+COMMAND_TIMEOUT = 10
+COMMAND_START_TIMEOUT = 10  # Time a SimRobot process has to start a test sent to it before it is restarted
+RESULTS_TIMEOUT = 10  # Time a SimRobot process has to write the results after its test has finished
+MAX_RESTARTS = 2  # Number of times a chunk is restarted after its SimRobot process crashed
 EXTRA_WAIT_TIME = 360
+DEFAULT_MEMORY_PER_SIM = 1024  # MiB of memory reserved for each SimRobot process
+
+STATE_FILE = "state.txt"
+RESULTS_FILE = "results.csv"  # Written by SimRobot after the state file says that the test has finished
+
+# inotify(7) flags
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_ONLYDIR = 0x01000000
 
 HALF_DURATION = 600
 HALF_BREAK_DURATION = 10
@@ -26,6 +46,7 @@ COLUMN_HEADERS = {
     "game": ("Game No", "Half", "Kickoff", "Score A", "Score B", "Budget A", "Budget B", "Winner"),
     "situation": ("Test Run", "Target Hit Code", "Success")
 }
+SUMMARY_HEADERS = ("Scene", "Command", "Runs", "Successful", "Results")
 
 
 def parse_arguments():
@@ -42,6 +63,12 @@ def parse_arguments():
     parser.add_argument("--testcmd", help="Test command enclosed in double quotes.")
     parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
                         help="Number of processes to run (default: number of CPU cores).")
+    parser.add_argument("--min-chunk", type=int, default=1,
+                        help="Minimum number of runs per SimRobot process (default: 1).")
+    parser.add_argument("--memory-per-sim", type=int, default=DEFAULT_MEMORY_PER_SIM,
+                        help="Memory in MiB to reserve for each SimRobot process. The number of workers is "
+                             "limited to the available memory divided by this (default: "
+                             f"{DEFAULT_MEMORY_PER_SIM}, 0: no limit).")
     parser.add_argument("--loglevel", choices=["debug", "info", "warning", "error", "critical"], default="warning",
                         help="Logging level (default: warning).")
     parser.add_argument("--gui", action="store_true",
@@ -49,6 +76,10 @@ def parse_arguments():
     args = parser.parse_args()
     if args.workers < 1:
         parser.error("Number of workers must be at least 1.")
+    if args.min_chunk < 1:
+        parser.error("Minimum chunk size must be at least 1.")
+    if args.memory_per_sim < 0:
+        parser.error("Memory per SimRobot process must not be negative.")
     args.loglevel = args.loglevel.upper()
     return args
 
@@ -66,6 +97,26 @@ def crc32hex(string):
     return f"{zlib.crc32(string.encode()):08x}"
 
 
+def get_available_memory():
+    """
+    Get the amount of memory available for starting new processes without swapping.
+
+    Returns:
+        int: The available memory in bytes, or None if it cannot be determined.
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
 def get_bhuman_root():
     """
     Get the path to the B-Human root directory by traversing the directory tree.
@@ -125,6 +176,8 @@ class TestConfig:
         env (str): Environment mode (debug, develop, release).
         testcmd (str): Test command to run.
         num_workers (int): Number of workers (processes).
+        min_chunk (int): Minimum number of runs per process.
+        memory_per_sim (int): Memory in MiB to reserve for each SimRobot process (0: no limit).
         simrobot_path (str): Path to the SimRobot executable.
         tempdir (str): Temporary directory for the tests.
         scene (str): Path to the scene file.
@@ -157,7 +210,8 @@ class TestConfig:
         self.num_runs = self.parsed_cmd["numRuns"]
         self.time_per_run = HALF_DURATION * 2 + \
             HALF_BREAK_DURATION if self.mode == "game" else self.parsed_cmd["runTimeout"]
-        self.num_workers = min(args.workers, self.num_runs)
+        self.min_chunk = args.min_chunk
+        self.memory_per_sim = args.memory_per_sim
 
     @staticmethod
     def get_simrobot_path(env):
@@ -215,15 +269,119 @@ class TestConfig:
         return os.path.normpath(scene if os.path.isabs(scene) else pjoin(BaseConfig.bhuman_root, scene))
 
 
+class Inotify:
+    """
+    Minimal inotify(7) binding (Linux only) to wait for files written by SimRobot.
+    """
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        """
+        Create a non-blocking inotify instance.
+
+        Raises:
+            OSError: If inotify is not available.
+        """
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def fileno(self):
+        return self.fd
+
+    def add_watch(self, path, mask):
+        """
+        Watch a path for events.
+
+        Args:
+            path (str): The path to watch.
+            mask (int): The events to watch for.
+
+        Returns:
+            int: The watch descriptor.
+
+        Raises:
+            OSError: If the path cannot be watched (e.g. it does not exist).
+        """
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read_events(self):
+        """
+        Read the pending events.
+
+        Returns:
+            list: Tuples of watch descriptor, event mask and file name.
+        """
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Chunk:
+    """
+    Consecutive runs of a test that are run by one SimRobot process.
+
+    Attributes:
+        runner (TestRunner): The test runner the runs belong to.
+        index (int): Position of the chunk among the chunks of the test.
+        runs (int): Number of runs.
+        restarts (int): Number of times the chunk was restarted after its process crashed.
+        results (list): Rows of the results file, or None while the chunk has not finished.
+    """
+
+    def __init__(self, runner, index, runs):
+        self.runner = runner
+        self.index = index
+        self.runs = runs
+        self.restarts = 0
+        self.results = None
+
+    def expected_rows(self):
+        """
+        Get the number of rows the results file of the chunk has once all runs have finished.
+
+        Returns:
+            int: The number of rows.
+        """
+        return self.runs * self.runner.rows_per_run()
+
+
 class TestRunner:
     """
-    A class that runs the tests by managing processes and collecting results.
+    A class that splits the runs of a test into chunks and collects their results.
 
     Attributes:
         config (TestConfig): The test configuration.
-        test_scenes (list): List of test scenes to run.
-        results_dirs (dict): Dictionary of process IDs and their result directories.
-        active_pids (list): List of process IDs for running tests.
+        scene_key (tuple): Directory and checksum of the scene and its configuration. SimRobot
+            processes that opened a scene with the same key can run the test as well.
+        test_scenes (dict): Dictionary of run counts and worker slots and their test scenes.
+        pending_runs (int): Number of runs that have not been handed out yet.
+        chunks (list): The chunks handed out so far, in the order of the runs.
         aggregated_results (list): List of aggregated test results.
     """
 
@@ -235,14 +393,30 @@ class TestRunner:
             config (TestConfig): The test configuration.
         """
         self.config = config
-        self.test_scenes = []
-        self.results_dirs = {}
-        self.active_pids = []
+        self.scene_key = self.build_scene_key(config.scene)
+        self.test_scenes = {}
+        self.pending_runs = 0
+        self.chunks = []
         self.aggregated_results = []
         self.results_file = ""
 
-        signal.signal(signal.SIGINT, self.handle_termination)
-        signal.signal(signal.SIGTERM, self.handle_termination)
+    @staticmethod
+    def build_scene_key(scene_path):
+        """
+        Build the key of a scene from its directory (configuration files are called relative to
+        it) and the contents of the scene and its configuration.
+
+        Args:
+            scene_path (str): Path to the scene file.
+
+        Returns:
+            tuple: The directory and the checksum of the contents.
+        """
+        checksum = 0
+        for path in (scene_path, os.path.splitext(scene_path)[0] + ".con"):
+            with open(path, "rb") as f:
+                checksum = zlib.crc32(f.read(), checksum)
+        return os.path.dirname(scene_path), checksum
 
     def create_test_scene(self, scene_src, testcmd):
         """
@@ -275,114 +449,96 @@ class TestRunner:
 
     def prepare_test_scenes(self):
         """
-        Prepare the test scenes based on the distribution of runs across workers.
-        """
-        runs_distribution = self.distribute_runs(self.config.num_runs, self.config.num_workers)
-        worker_idx = 0
-        for runs, workers in runs_distribution.items():
-            for _ in range(workers):
-                updated_cmd = {
-                    **self.config.parsed_cmd,
-                    "numRuns": runs,
-                    "teamNums": (worker_idx * 2, worker_idx * 2 + 1),
-                }
-                scene_path = self.create_test_scene(self.config.scene, unparse_command(updated_cmd))
-                self.test_scenes.append(scene_path)
-                worker_idx += 1
+        Queue all runs. They are handed out in chunks, each run by one SimRobot process.
+        """
+        self.pending_runs = self.config.num_runs
 
-    def build_process_results_dir(self, scene_path, pid):
+    def build_test_command(self, runs, slot):
         """
-        Build the directory to store the results of a test process.
+        Build the test command for a chunk of runs in a worker slot.
 
         Args:
-            scene_path (str): Path to the scene file.
-            pid (int): Process ID.
+            runs (int): The number of runs.
+            slot (int): The worker slot, which determines the team numbers.
 
         Returns:
-            str: The path to the test results directory.
-        """
-        dir_id = crc32hex(f"{scene_path}:{pid}")
-        return pjoin(self.config.tempdir, f"test_{dir_id}")
-
-    def run_tests(self):
+            str: The test command.
         """
-        Run the tests by launching processes for each test scene.
+        updated_cmd = {
+            **self.config.parsed_cmd,
+            "numRuns": runs,
+            "teamNums": (slot * 2, slot * 2 + 1),
+        }
+        return unparse_command(updated_cmd)
+
+    def get_test_scene(self, runs, slot):
         """
-        with multiprocessing.Pool(processes=self.config.num_workers) as pool:
-            for pid, scene in zip(pool.map(self.run_single_test, self.test_scenes), self.test_scenes):
-                self.active_pids.append(pid)
-                self.results_dirs[pid] = self.build_process_results_dir(scene, pid)
-
-    def run_single_test(self, scene_path):
-        """
-        Run a single test in a subprocess.
+        Get the test scene for a chunk of runs in a worker slot, creating it if necessary.
 
         Args:
-            scene_path (str): Path to the scene file.
+            runs (int): The number of runs.
+            slot (int): The worker slot, which determines the team numbers.
 
         Returns:
-            int: The process ID of the started process.
+            str: The path to the test scene.
         """
-        try:
-            if self.config.gui:
-                proc = subprocess.Popen([self.config.simrobot_path, scene_path])
-            else:
-                proc = subprocess.Popen([self.config.simrobot_path, "-noWindow", scene_path])
-            logging.info(f"Started process {proc.pid}.")
-            return proc.pid
-        except OSError:
-            self.shutdown("Failed to start the SimRobot process.")
+        if (runs, slot) not in self.test_scenes:
+            testcmd = self.build_test_command(runs, slot)
+            self.test_scenes[runs, slot] = self.create_test_scene(self.config.scene, testcmd)
+        return self.test_scenes[runs, slot]
 
-    def run(self):
-        """
-        Run the entire testing process: prepare scenes, run tests, monitor processes, and collect results.
+    def next_chunk(self, num_workers):
         """
-        self.prepare_test_scenes()
-        self.run_tests()
-        self.monitor_processes()
-        self.collect_results(export_csv=True)
-        self.print_results()
-        self.evaluate_results()
+        Hand out the next chunk of the pending runs.
 
-    def monitor_processes(self):
+        Args:
+            num_workers (int): The number of workers the runs are shared by.
+
+        Returns:
+            Chunk: The chunk.
         """
-        Monitor the processes, checking their status and handling timeouts.
+        # A test never needs more workers than it has runs.
+        num_workers = min(self.config.num_workers, self.config.num_runs, num_workers)
+        runs = self.chunk_size(self.pending_runs, num_workers, self.config.min_chunk)
+        self.pending_runs -= runs
+        chunk = Chunk(self, len(self.chunks), runs)
+        self.chunks.append(chunk)
+        return chunk
+
+    def remaining_work(self):
         """
-        # runs_per_cpu = max(math.ceil(self.config.num_runs / multiprocessing.cpu_count()), 1)
-        # deadline = time.time() + runs_per_cpu * self.config.time_per_run + EXTRA_WAIT_TIME
-        deadline = time.time() + self.config.num_runs * self.config.time_per_run + EXTRA_WAIT_TIME
+        Estimate the time the runs that have not been handed out yet take on one worker.
 
-        while self.active_pids:
-            for pid in list(self.active_pids):
-                state_file = pjoin(self.results_dirs[pid], "state.txt")
-                test_status = self.fetch_test_status(state_file)
+        Returns:
+            int: The estimated time in seconds.
+        """
+        return self.pending_runs * self.config.time_per_run
 
-                if test_status == "finished":
-                    logging.info(f"Process {pid} has finished.")
-                    self.active_pids.remove(pid)
-                    self.terminate_processes(pid)
+    def rows_per_run(self):
+        """
+        Get the number of rows a run adds to the results file (a game has one row per half).
 
-                elif not psutil.pid_exists(pid):
-                    self.shutdown(f"Process {pid} has died unexpectedly.")
+        Returns:
+            int: The number of rows.
+        """
+        return 2 if self.config.mode == "game" else 1
 
-            if time.time() > deadline:
-                self.shutdown("Timeout reached.")
+    def is_finished(self):
+        """
+        Check whether all runs have been handed out and all chunks have finished.
 
-            time.sleep(PROCESS_CHECK_DELAY)
+        Returns:
+            bool: Whether the test has finished.
+        """
+        return self.pending_runs == 0 and all(chunk.results is not None for chunk in self.chunks)
 
     def collect_results(self, export_csv=False):
         """
-        Collect the results of the tests and save them to a CSV file.
+        Collect the results of the chunks in the order of the runs and save them to a CSV file.
         """
         collected = []
-        for results_dir in self.results_dirs.values():
-            try:
-                with open(pjoin(results_dir, "results.csv"), "r") as f:
-                    r = csv.reader(f)
-                    next(r, None)  # Skip header
-                    collected.extend(r)
-            except FileNotFoundError:
-                logging.warning(f"Results file not found in {results_dir}.")
+        for chunk in self.chunks:
+            collected.extend(chunk.results)
 
         if self.config.mode == "game":
             # First two lines belong to the same game
@@ -391,7 +547,9 @@ class TestRunner:
             self.aggregated_results = [[i] + row[1:] for i, row in enumerate(collected, start=1)]
                 
         if export_csv:
-            self.results_file = pjoin(self.config.tempdir, f"{time.strftime('%Y%m%d%H%M%S')}_results.csv")
+            # Several scenes can finish within a second, so the scene is part of the name.
+            scene_name = os.path.splitext(os.path.basename(self.config.scene))[0]
+            self.results_file = pjoin(self.config.tempdir, f"{time.strftime('%Y%m%d%H%M%S')}_{scene_name}_results.csv")
             with open(self.results_file, "w", newline="") as f:
                 writer = csv.writer(f)
                 writer.writerow(COLUMN_HEADERS[self.config.mode])
@@ -431,66 +589,589 @@ class TestRunner:
 
     def evaluate_results(self):
         """
-        Evaluate the results of the tests and exit with an error if not all runs were successful.
+        Evaluate the results of the tests.
+
+        Returns:
+            bool: Whether there are results for all runs and all runs were successful.
         """
+        expected_rows = self.config.num_runs * self.rows_per_run()
+        if len(self.aggregated_results) < expected_rows:
+            logging.error(f"Only {len(self.aggregated_results)} of {expected_rows} results rows were written.")
+            return False
         if self.config.mode == "situation":
-            for row in self.aggregated_results:
-                if row[2] != "true":
-                    self.shutdown("Test failed.")
+            return all(row[2] == "true" for row in self.aggregated_results)
+        return True
 
-    def handle_termination(self, signum, _):
+    def summarize(self):
         """
-        Handle termination signals (SIGINT, SIGTERM) by cleaning up processes.
+        Summarize the results of the test in one row.
+
+        Returns:
+            list: The scene, the test command, the number of runs, the number of successful runs
+            (empty for games) and the results file.
         """
-        self.shutdown(f"Received termination signal ({signum}).")
+        if self.config.mode == "situation":
+            successful = sum(row[2] == "true" for row in self.aggregated_results)
+        else:
+            successful = ""
+        return [get_bhuman_relpath(self.config.scene), self.config.testcmd, self.config.num_runs, successful,
+                self.results_file]
 
-    def shutdown(self, message):
+    @staticmethod
+    def chunk_size(pending_runs, num_workers, min_chunk):
         """
-        Clean up and shut down the program with an error message.
+        Determine the number of runs of the next chunk (guided self-scheduling).
+
+        Each chunk takes an equal share of the pending runs per worker, so chunks start as large as
+        with an even distribution, which keeps the number of SimRobot startups low, and shrink
+        towards the end, so workers finishing early take over the remaining runs.
 
         Args:
-            message (str): The error message to log.
+            pending_runs (int): The number of runs that have not been started yet.
+            num_workers (int): The number of workers.
+            min_chunk (int): The minimum number of runs per chunk.
+
+        Returns:
+            int: The number of runs of the next chunk.
         """
-        self.terminate_processes(*self.active_pids)
-        logging.error(message)
-        sys.exit(1)
+        return min(max(math.ceil(pending_runs / num_workers), min_chunk), pending_runs)
 
-    @staticmethod
-    def distribute_runs(num_runs, num_workers):
+
+class SimRobotWorker:
+    """
+    A SimRobot process that is kept running to run successive chunks.
+
+    SimRobot starts the test appended to the configuration of the scene it opens. Once that test
+    has finished, the next test for a scene with the same key is sent to SimRobot's command
+    server instead of starting a new process.
+
+    Attributes:
+        slot (int): Index of the worker, which determines the team numbers and the command port.
+        port (int): Port of the command server of the SimRobot process.
+        tempdir (str): Directory in which SimRobot creates the results directories.
+        proc (subprocess.Popen): The SimRobot process, or None if it has not been started.
+        scene_key (tuple): Key of the scene the process has opened.
+        results_dir (str): Directory the process writes the test state and results to.
+        chunk (Chunk): The chunk being run, or None if the worker is idle.
+        start_deadline (float): Time by which the process has to start the test sent to it, or None.
+        results_deadline (float): Time by which the process has to write the results of its
+            finished test, or None.
+    """
+
+    def __init__(self, slot, tempdir):
         """
-        Distribute the number of runs across the available workers.
+        Initialize an idle worker without a process.
 
         Args:
-            num_runs (int): The total number of runs.
-            num_workers (int): The number of workers.
+            slot (int): Index of the worker.
+            tempdir (str): Directory in which SimRobot creates the results directories.
+        """
+        self.slot = slot
+        self.port = COMMAND_PORT_BASE + slot
+        self.tempdir = tempdir
+        self.proc = None
+        self.scene_key = None
+        self.results_dir = None
+        self.chunk = None
+        self.start_deadline = None
+        self.results_deadline = None
+
+    def is_alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def next_deadline(self):
+        """
+        Get the time at which the worker has to be checked even if nothing happened.
 
         Returns:
-            dict: A dictionary with the number of runs per worker.
+            float: The time, or None if the worker only has to be checked when its files change.
         """
-        base, extra = divmod(num_runs, num_workers)
-        result = {}
-        if base > 0:
-            result[base] = num_workers - extra
-        if extra > 0:
-            result[base + 1] = extra
-        return result
+        deadlines = [t for t in (self.start_deadline, self.results_deadline) if t is not None]
+        return min(deadlines, default=None)
 
-    @staticmethod
-    def terminate_processes(*pids):
+    def start(self, simrobot_path, scene_path, scene_key, gui):
+        """
+        Start a SimRobot process for a scene, stopping the previous one.
+
+        Args:
+            simrobot_path (str): Path to the SimRobot executable.
+            scene_path (str): Path to the scene file.
+            scene_key (tuple): Key of the scene.
+            gui (bool): Whether to show the SimRobot GUI.
+
+        Raises:
+            OSError: If the process cannot be started.
         """
-        Terminate the specified SimRobot processes.
+        self.stop()
+        env = {**os.environ, "SIMROBOT_COMMAND_PORT": str(self.port)}
+        if gui:
+            self.proc = subprocess.Popen([simrobot_path, scene_path], env=env)
+        else:
+            self.proc = subprocess.Popen([simrobot_path, "-noWindow", scene_path], env=env)
+        self.scene_key = scene_key
+        self.results_dir = self.build_process_results_dir(scene_path, self.proc.pid)
+        logging.info(f"Started process {self.proc.pid}.")
+
+    def build_process_results_dir(self, scene_path, pid):
+        """
+        Build the directory to store the results of a test process.
 
         Args:
-            pids (int): The process IDs to terminate.
+            scene_path (str): Path to the scene file.
+            pid (int): Process ID.
+
+        Returns:
+            str: The path to the test results directory.
         """
-        for pid in pids:
+        dir_id = crc32hex(f"{scene_path}:{pid}")
+        return pjoin(self.tempdir, f"test_{dir_id}")
+
+    def send_command(self, command):
+        """
+        Send a console command to the command server of the SimRobot process.
+
+        Args:
+            command (str): The console command.
+
+        Returns:
+            bool: Whether the command server acknowledged the command.
+        """
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=COMMAND_TIMEOUT) as sock:
+                sock.sendall(f"{command}\n".encode())
+                return sock.recv(16).startswith(b"OK")
+        except OSError:
+            return False
+
+    def read_results(self):
+        """
+        Read the results of the test.
+
+        Returns:
+            list: The rows of the results file (without the header), or None if it does not exist.
+        """
+        try:
+            with open(pjoin(self.results_dir, RESULTS_FILE), "r") as f:
+                r = csv.reader(f)
+                next(r, None)  # Skip header
+                return list(r)
+        except FileNotFoundError:
+            return None
+
+    def clear_results(self):
+        """
+        Remove the results and the state file of a finished test whose results have been read, so
+        that the next test sent to the process is not mistaken for finished.
+        """
+        for name in (RESULTS_FILE, STATE_FILE):
             try:
-                proc = psutil.Process(pid)
-                if proc.name().removesuffix(".exe") == "SimRobot":
-                    proc.terminate()
-            except psutil.Error:
+                os.remove(pjoin(self.results_dir, name))
+            except FileNotFoundError:
                 pass
 
+    def terminate(self):
+        if self.is_alive():
+            self.proc.terminate()
+
+    def stop(self):
+        """
+        Terminate the process and wait for it to exit, killing it if it does not.
+        """
+        if self.proc is None:
+            return
+        self.terminate()
+        try:
+            self.proc.wait(timeout=TERMINATE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+        self.scene_key = None
+
+
+class WorkerPool:
+    """
+    Runs the tests of several scenes as one pipeline on a fixed set of SimRobot workers.
+
+    All runs of all tests form one queue. Whenever a worker is idle, it gets the next chunk,
+    preferably of a test whose scene it has already opened, so that SimRobot does not have to be
+    started and the scene does not have to be loaded again, and otherwise of the test with the most
+    remaining work. So tests with few runs share the workers with others instead of leaving them
+    idle. The number of workers is limited by the total number of runs and by the memory available
+    for SimRobot processes. A chunk whose process crashes is restarted in a new process up to
+    MAX_RESTARTS times. The results of the tests are reported in the order of the tests.
+
+    Attributes:
+        workers (list): The workers.
+        runners (list): The test runners, in the order in which their results are reported.
+        retry_chunks (collections.deque): Chunks to be restarted after their process crashed.
+        num_reported (int): Number of test runners whose results have been reported.
+        simrobot_path (str): Path to the SimRobot executable.
+        tempdir (str): Temporary directory for the tests.
+        gui (bool): Whether to show the SimRobot GUI.
+        failed (list): Test runners of which not all runs were successful.
+    """
+
+    def __init__(self, runners):
+        """
+        Initialize the pool for the given test runners.
+
+        Args:
+            runners (list): The test runners.
+        """
+        self.runners = runners
+        config = runners[0].config
+        self.simrobot_path = config.simrobot_path
+        self.tempdir = config.tempdir
+        self.gui = config.gui
+        # Scenes with few runs share the workers, so only the runs of all scenes together limit them.
+        num_workers = min(config.num_workers, sum(runner.config.num_runs for runner in runners))
+        num_workers = self.plan_num_workers(num_workers, config.memory_per_sim)
+        self.workers = [SimRobotWorker(slot, self.tempdir) for slot in range(num_workers)]
+        self.retry_chunks = collections.deque()
+        self.num_reported = 0
+        self.failed = []
+
+        signal.signal(signal.SIGINT, self.handle_termination)
+        signal.signal(signal.SIGTERM, self.handle_termination)
+
+    @staticmethod
+    def plan_num_workers(num_workers, memory_per_sim):
+        """
+        Limit the number of workers to the number of SimRobot processes that fit into the
+        available memory.
+
+        Args:
+            num_workers (int): The requested number of workers.
+            memory_per_sim (int): Memory in MiB to reserve for each SimRobot process (0: no limit).
+
+        Returns:
+            int: The number of workers (at least 1).
+        """
+        available = get_available_memory()
+        if memory_per_sim == 0 or available is None:
+            return num_workers
+        fitting = max(available // (memory_per_sim * 1024 * 1024), 1)
+        if fitting < num_workers:
+            logging.warning(f"Only {fitting} SimRobot processes fit into the available memory "
+                            f"({available // (1024 * 1024)} MiB), using {fitting} instead of {num_workers} workers.")
+            return fitting
+        return num_workers
+
+    def run(self):
+        """
+        Run all tests: hand out chunks, monitor the workers, report the results and the summary,
+        and exit with an error if not all runs were successful.
+        """
+        for runner in self.runners:
+            runner.prepare_test_scenes()
+        self.run_tests()
+        self.monitor_processes()
+        self.report_results()
+        if len(self.runners) > 1:
+            self.report_summary()
+        if self.failed:
+            self.shutdown("Test failed.")
+
+    def busy_workers(self):
+        return [worker for worker in self.workers if worker.chunk is not None]
+
+    def next_chunk(self, worker):
+        """
+        Get the next chunk for an idle worker.
+
+        Args:
+            worker (SimRobotWorker): The worker.
+
+        Returns:
+            Chunk: The chunk, or None if there are no pending runs.
+        """
+        if self.retry_chunks:
+            return self.retry_chunks.popleft()
+        pending = [runner for runner in self.runners if runner.pending_runs]
+        if not pending:
+            return None
+        # Prefer the scene the worker has opened. Otherwise, the test with the most remaining work
+        # goes first, so that long tests do not end up running alone at the end.
+        warm = [runner for runner in pending if runner.scene_key == worker.scene_key]
+        runner = max(warm or pending, key=TestRunner.remaining_work)
+        return runner.next_chunk(len(self.workers))
+
+    def run_tests(self):
+        """
+        Start chunks on the idle workers as long as there are pending runs. The processes of
+        workers that are left idle are terminated.
+        """
+        for worker in self.workers:
+            if worker.chunk is not None:
+                continue
+            chunk = self.next_chunk(worker)
+            if chunk is None:
+                worker.terminate()
+            else:
+                self.run_chunk(worker, chunk)
+
+    def run_chunk(self, worker, chunk):
+        """
+        Run a chunk on a worker, reusing its process if it has opened a scene with the same key.
+
+        Args:
+            worker (SimRobotWorker): The idle worker.
+            chunk (Chunk): The chunk to run.
+        """
+        runner = chunk.runner
+        worker.chunk = chunk
+        worker.start_deadline = None
+        worker.results_deadline = None
+        if worker.is_alive() and worker.scene_key == runner.scene_key and \
+                worker.send_command(runner.build_test_command(chunk.runs, worker.slot)):
+            # The command server only confirms that the command was queued, so the test has to
+            # show up in the results directory in time.
+            worker.start_deadline = time.time() + COMMAND_START_TIMEOUT
+            logging.info(f"Process {worker.proc.pid} continues with {get_bhuman_relpath(runner.config.scene)}.")
+            return
+        try:
+            worker.start(self.simrobot_path, runner.get_test_scene(chunk.runs, worker.slot), runner.scene_key, self.gui)
+        except OSError:
+            self.shutdown("Failed to start the SimRobot process.")
+
+    def monitor_processes(self):
+        """
+        Monitor the processes, checking their status and handling timeouts.
+
+        On Linux, this waits for the processes to exit (pidfd) and for their state and results
+        files to be written (inotify), so a finished test is noticed immediately. Elsewhere, the
+        files are polled every PROCESS_CHECK_DELAY seconds.
+        """
+        deadline = time.time() + sum(runner.config.num_runs * runner.config.time_per_run + EXTRA_WAIT_TIME
+                                     for runner in self.runners)
+
+        try:
+            inotify = Inotify() if hasattr(os, "pidfd_open") else None
+        except (OSError, AttributeError):
+            inotify = None
+        if inotify is None:
+            self.poll_processes(deadline)
+        else:
+            with inotify:
+                self.wait_for_processes(inotify, deadline)
+        for worker in self.workers:
+            worker.stop()
+
+    def poll_processes(self, deadline):
+        """
+        Monitor the processes by polling their state and results files.
+
+        Args:
+            deadline (float): The time at which the remaining processes are considered hung.
+        """
+        while self.busy_workers():
+            for worker in self.busy_workers():
+                self.check_process(worker)
+
+            if time.time() > deadline:
+                self.shutdown("Timeout reached.")
+
+            time.sleep(PROCESS_CHECK_DELAY)
+
+    def wait_for_processes(self, inotify, deadline):
+        """
+        Monitor the processes by waiting for them to exit and for their state and results files to
+        be written.
+
+        SimRobot recreates its results directory when a test starts, so the directories are
+        watched through their parent directory as well.
+
+        Args:
+            inotify (Inotify): The inotify instance to use.
+            deadline (float): The time at which the remaining processes are considered hung.
+        """
+        workers_by_pid = {}
+        workers_by_dir = {}
+        workers_by_watch = {}
+        os.makedirs(self.tempdir, exist_ok=True)
+        temp_watch = inotify.add_watch(self.tempdir, IN_CREATE | IN_MOVED_TO | IN_ONLYDIR)
+
+        def watch_results_dir(worker):
+            try:
+                workers_by_watch[inotify.add_watch(worker.results_dir, IN_CLOSE_WRITE | IN_MOVED_TO)] = worker
+            except FileNotFoundError:
+                return  # Not created yet
+            # The files may have been written before the watch was added.
+            self.check_process(worker)
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(inotify, selectors.EVENT_READ)
+
+            def track_new_processes():
+                # Finishing or restarting a chunk may start new processes, so repeat until nothing is new.
+                while new_workers := [worker for worker in self.busy_workers()
+                                      if worker.proc.pid not in workers_by_pid]:
+                    for worker in new_workers:
+                        workers_by_pid[worker.proc.pid] = worker
+                        workers_by_dir[os.path.basename(worker.results_dir)] = worker
+                        selector.register(os.pidfd_open(worker.proc.pid), selectors.EVENT_READ, worker.proc.pid)
+                    for worker in new_workers:
+                        if worker.chunk is not None:
+                            watch_results_dir(worker)
+
+            try:
+                track_new_processes()
+                while self.busy_workers():
+                    if deadline <= time.time():
+                        self.shutdown("Timeout reached.")
+                    timeout = min([deadline] + [worker.next_deadline() for worker in self.busy_workers()
+                                                if worker.next_deadline() is not None]) - time.time()
+                    for key, _ in selector.select(max(timeout, 0)):
+                        if key.data is not None:
+                            # The process exited
+                            selector.unregister(key.fileobj)
+                            os.close(key.fileobj)
+                            worker = workers_by_pid[key.data]
+                            if worker.proc is not None and worker.proc.pid == key.data and worker.chunk is not None:
+                                self.check_process(worker)
+                            continue
+                        for wd, _, name in inotify.read_events():
+                            if wd == temp_watch:
+                                worker = workers_by_dir.get(name)
+                                if worker is not None and worker.chunk is not None and \
+                                        os.path.basename(worker.results_dir) == name:
+                                    watch_results_dir(worker)
+                            elif name in (STATE_FILE, RESULTS_FILE) and wd in workers_by_watch and \
+                                    workers_by_watch[wd].chunk is not None:
+                                self.check_process(workers_by_watch[wd])
+                    for worker in self.busy_workers():
+                        if worker.chunk is not None and worker.next_deadline() is not None and \
+                                worker.next_deadline() <= time.time():
+                            self.check_process(worker)
+                    track_new_processes()
+            finally:
+                for key in list(selector.get_map().values()):
+                    if key.data is not None:
+                        os.close(key.fileobj)
+
+    def check_process(self, worker):
+        """
+        Check the state and results files and the status of a busy worker's process. Once its test
+        has finished and the results of all runs have been written, the results of the chunk are
+        collected and the worker gets the next chunk. If the process has died before or does not
+        write the results within RESULTS_TIMEOUT, the chunk is restarted. If the process does not
+        start a test sent to it within COMMAND_START_TIMEOUT, the chunk is run in a new process.
+
+        Args:
+            worker (SimRobotWorker): The worker.
+        """
+        pid = worker.proc.pid
+        chunk = worker.chunk
+        test_status = self.fetch_test_status(pjoin(worker.results_dir, STATE_FILE))
+
+        if test_status == "finished":
+            # SimRobot saves the state before it writes the results file.
+            rows = worker.read_results()
+            if rows is not None and len(rows) >= chunk.expected_rows():
+                logging.info(f"Process {pid} has finished.")
+                chunk.results = rows
+                worker.clear_results()
+                worker.chunk = None
+                self.report_results()
+                self.run_tests()
+                return
+            if worker.proc.poll() is not None:
+                self.restart_chunk(worker, f"Process {pid} has exited without writing the results of all runs")
+            elif worker.results_deadline is None:
+                worker.start_deadline = None
+                worker.results_deadline = time.time() + RESULTS_TIMEOUT
+            elif worker.results_deadline <= time.time():
+                self.restart_chunk(worker, f"Process {pid} has not written the results of all runs")
+
+        elif worker.proc.poll() is not None:
+            self.restart_chunk(worker, f"Process {pid} has died unexpectedly")
+
+        elif test_status is not None:
+            worker.start_deadline = None
+
+        elif worker.start_deadline is not None and worker.start_deadline <= time.time():
+            logging.warning(f"Process {pid} has not started the test sent to it, starting a new process.")
+            worker.chunk = None
+            worker.stop()
+            self.run_chunk(worker, chunk)
+
+    def restart_chunk(self, worker, reason):
+        """
+        Restart the chunk of a worker whose process failed in a new process, or shut down if it has
+        been restarted MAX_RESTARTS times.
+
+        Args:
+            worker (SimRobotWorker): The worker.
+            reason (str): What happened to the process.
+        """
+        chunk = worker.chunk
+        if chunk.restarts >= MAX_RESTARTS:
+            self.shutdown(f"{reason}.")
+        chunk.restarts += 1
+        logging.warning(f"{reason}, restarting its runs ({chunk.restarts}/{MAX_RESTARTS}).")
+        worker.chunk = None
+        worker.stop()
+        self.retry_chunks.append(chunk)
+        self.run_tests()
+
+    def report_results(self):
+        """
+        Collect, save, print and evaluate the results of the finished tests, in the order of the
+        tests.
+        """
+        while self.num_reported < len(self.runners) and self.runners[self.num_reported].is_finished():
+            runner = self.runners[self.num_reported]
+            self.num_reported += 1
+            runner.collect_results(export_csv=True)
+            runner.print_results()
+            if not runner.evaluate_results():
+                logging.error(f"Test failed: {get_bhuman_relpath(runner.config.scene)}.")
+                self.failed.append(runner)
+
+    def report_summary(self):
+        """
+        Save and print a summary of the results of all tests.
+        """
+        rows = [runner.summarize() for runner in self.runners]
+        summary_file = pjoin(self.tempdir, f"{time.strftime('%Y%m%d%H%M%S')}_summary.csv")
+        with open(summary_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(SUMMARY_HEADERS)
+            writer.writerows(rows)
+
+        columns = SUMMARY_HEADERS[:4]
+        col_widths = [max(len(str(value)) for value in col) for col in zip(columns, *rows)]
+
+        def format_row(row):
+            return " | ".join(f"{str(value):<{col_widths[i]}}" for i, value in enumerate(row[:4]))
+
+        print("=" * 80)
+        print("Summary:", summary_file)
+        print("=" * 80)
+        print(format_row(columns))
+        print("-+-".join("-" * width for width in col_widths))
+        for row in rows:
+            print(format_row(row))
+
+    def handle_termination(self, signum, _):
+        """
+        Handle termination signals (SIGINT, SIGTERM) by cleaning up processes.
+        """
+        self.shutdown(f"Received termination signal ({signum}).")
+
+    def shutdown(self, message):
+        """
+        Clean up and shut down the program with an error message.
+
+        Args:
+            message (str): The error message to log.
+        """
+        for worker in self.workers:
+            worker.terminate()
+        logging.error(message)
+        sys.exit(1)
+
     @staticmethod
     def fetch_test_status(state_file):
         """
@@ -605,11 +1286,13 @@ def main():
 
     logging.getLogger().setLevel(args.loglevel)
 
+    runners = []
     for scene, testcmd in resolve_test_scenes(args.scene, args.testcmd):
         logging.info(f"Running test for scene {get_bhuman_relpath(scene)}.")
         args.scene, args.testcmd = scene, testcmd
-        config = TestConfig(args)
-        TestRunner(config).run()
+        runners.append(TestRunner(TestConfig(args)))
+    if runners:
+        WorkerPool(runners).run()
 
 
 if __name__ == "__main__":
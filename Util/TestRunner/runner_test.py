@@ -0,0 +1,65 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def root(tmp_path_factory):
+    root = tmp_path_factory.mktemp("checkout") / "B-Human"
+    (root / "Build" / "Linux" / "SimRobot" / "Release").mkdir(parents=True)
+    (root / "Build" / "Linux" / "SimRobot" / "Release" / "SimRobot").touch()
+    (root / "Config" / "Scenes").mkdir(parents=True)
+    for name in ("Scene.ros2", "Scene.con"):
+        (root / "Config" / "Scenes" / name).touch()
+    return root
+
+
+@pytest.fixture(scope="module")
+def runner(root):
+    # The runner looks up the B-Human root directory from the working directory when it is imported.
+    cwd = os.getcwd()
+    os.chdir(root)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        import runner
+    finally:
+        os.chdir(cwd)
+    return runner
+
+
+def make_runner(runner, num_runs, workers, memory_per_sim=0):
+    args = SimpleNamespace(env="release", testcmd=f"test situation {num_runs} 30 goalTeamA", gui=False,
+                           workers=workers, min_chunk=1, memory_per_sim=memory_per_sim,
+                           scene="Config/Scenes/Scene.ros2")
+    return runner.TestRunner(runner.TestConfig(args))
+
+
+def test_plan_num_workers(runner, monkeypatch):
+    monkeypatch.setattr(runner, "get_available_memory", lambda: 5 * 1024 * 1024 * 1024 + 1)
+    assert runner.WorkerPool.plan_num_workers(32, 0) == 32
+    assert runner.WorkerPool.plan_num_workers(32, 1024) == 5
+    assert runner.WorkerPool.plan_num_workers(4, 1024) == 4
+    assert runner.WorkerPool.plan_num_workers(32, 8192) == 1
+    monkeypatch.setattr(runner, "get_available_memory", lambda: None)
+    assert runner.WorkerPool.plan_num_workers(32, 1024) == 32
+
+
+def test_pool_size_with_many_small_scenes(runner):
+    runners = [make_runner(runner, 2, 32) for _ in range(10)]
+    pool = runner.WorkerPool(runners)
+    for test_runner in runners:
+        test_runner.prepare_test_scenes()
+    assert len(pool.workers) == 20
+    # Every run gets its own worker, and no scene gets more workers than it has runs.
+    chunks = [pool.next_chunk(worker) for worker in pool.workers]
+    assert all(chunk.runs == 1 for chunk in chunks)
+    assert all(test_runner.pending_runs == 0 for test_runner in runners)
+
+
+def test_pool_size_limited_by_workers(runner):
+    pool = runner.WorkerPool([make_runner(runner, 16, 8), make_runner(runner, 2, 8)])
+    assert len(pool.workers) == 8
+    pool = runner.WorkerPool([make_runner(runner, 1, 8)])
+    assert len(pool.workers) == 1